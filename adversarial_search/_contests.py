@@ -4,35 +4,118 @@
     Each contests its arranged in a different way.
 """
 
+import asyncio
 import collections
+import concurrent.futures
+import copy
+import csv
+import gzip
+import io
 import itertools
+import json
+import math
 import random
+from abc import ABC, abstractmethod
 
-from _base import match
-from _utils import randgen
+from .agents import Agent, SearchStats
+from .core import async_match, match
+from .utils import process_pool
+
+
+class RunningStat(object):
+    """ Count, mean and variance of a series of values, updated online with
+        Welford's algorithm, which is numerically stable. Two accumulators of
+        different parts of a series can be merged.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of the squared differences with the mean.
+
+    def push(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other):
+        """ Adds the values of the other accumulator to this one.
+        """
+        count = self.count + other.count
+        if count:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+            self.count = count
+        return self
+
+    @property
+    def variance(self):
+        """ Sample variance, or NaN with less than two values.
+        """
+        return self.m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def confidence_interval(self, z=1.96):
+        """ Returns the normal approximation of the confidence interval for
+            the mean, 95% by default.
+        """
+        margin = z * math.sqrt(self.variance / self.count) if self.count > 1 else float('nan')
+        return (self.mean - margin, self.mean + margin)
+
+    def as_dict(self, z=1.96):
+        low, high = self.confidence_interval(z)
+        return {'count': self.count, 'mean': self.mean, 'variance': self.variance, 'ci_low': low, 'ci_high': high}
+
+    def __repr__(self):
+        return 'RunningStat(count=%d, mean=%r, variance=%r)' % (self.count, self.mean, self.variance)
 
 
 class Stats():
-    """ Statistics accumulator for Contest classes.
+    """ Statistics accumulator for Contest classes. Statistics of agents and
+        players are kept by agent and by player. Accumulators of different
+        runs of contests (e.g. shards of a large tournament, played in other
+        processes) can be merged, and ratings are computed from the merged
+        results.
     """
 
     def __init__(self):
-        lambda0 = lambda: 0
         self._stats = collections.OrderedDict([
             ('keys', {}),
-            ('matches_played', collections.defaultdict(lambda0)),
-            ('matches_won', collections.defaultdict(lambda0)),
-            ('matches_lost', collections.defaultdict(lambda0)),
-            ('result_sum', collections.defaultdict(lambda0)),
-            ('result_sum2', collections.defaultdict(lambda0))
+            ('matches_played', collections.defaultdict(int)),
+            ('matches_won', collections.defaultdict(int)),
+            ('matches_lost', collections.defaultdict(int)),
+            ('result_sum', collections.defaultdict(int)),
+            ('result_sum2', collections.defaultdict(int))
         ])
         self.__dict__.update(self._stats)
+        # Mean and variance of the results, by agent and by player.
+        self.result_stats = collections.defaultdict(RunningStat)
+        # Score of every agent against every other, as {(agent, opponent): score}. Each match counts
+        # as 1 for the agent with the better result, or 0.5 for each if their results are equal.
+        self.pairwise_scores = collections.defaultdict(float)
+        # Search statistics of the agents, accumulated over all their matches.
+        self.search_stats = {}
+        # Time taken by the agents' moves and their flag-falls, in timed matches (see core.TimeControl).
+        self.move_times = collections.defaultdict(RunningStat)
+        self.timeouts = collections.defaultdict(int)
+        self._strengths = {}
 
     def clear(self):
         """ Clears all statistics.
         """
         for stat in self._stats.values():
             stat.clear()
+        self.result_stats.clear()
+        self.pairwise_scores.clear()
+        self.search_stats.clear()
+        self.move_times.clear()
+        self.timeouts.clear()
+        self._strengths.clear()
 
     def inc(self, stat, key):
         return self.add(stat, key, 1)
@@ -42,8 +125,11 @@ class Stats():
         stat[key] = new_value
         return new_value
 
-    def process(self, agents, match_num, move_num, d, game):
+    def process(self, agents, match_num, move_num, d, game, match_stats=None):
         """ Accumulates statistics for each tuple generated by the contest.
+            The search statistics of the agents in a finished match are taken
+            from match_stats ({player: SearchStats}) if given, else from the
+            agents themselves.
         """
         if move_num is None:  # Finished match.
             results = d
@@ -64,6 +150,89 @@ class Stats():
                     self.add(self.result_sum2, agent, result ** 2)
                     self.add(self.result_sum, player, result)
                     self.add(self.result_sum2, player, result ** 2)
+                self.result_stats[agent].push(result)
+                self.result_stats[player].push(result)
+                agent_stats = getattr(agent, 'match_stats', None) if match_stats is None else match_stats.get(player)
+                if agent_stats is not None:
+                    self.search_stats.setdefault(agent, SearchStats()).add(agent_stats)
+            for player1, player2 in itertools.combinations(agents, 2):
+                agent1, agent2 = agents[player1], agents[player2]
+                if agent1 is not agent2:
+                    score = 0.5 if results[player1] == results[player2] else float(results[player1] > results[player2])
+                    self.pairwise_scores[(agent1, agent2)] += score
+                    self.pairwise_scores[(agent2, agent1)] += 1 - score
+
+    def process_timing(self, agent, timing):
+        """ Accumulates the timing of an agent's move (see core.MoveTiming).
+        """
+        self.move_times[agent].push(timing.elapsed)
+        if timing.timeout:
+            self.inc(self.timeouts, agent)
+
+    def merge(self, other):
+        """ Adds the statistics of another accumulator to this one. Keys of the
+            other accumulator are matched with the ones of this one if they
+            are equal, or else if they are agents with the same name, since
+            agents of other processes are copies.
+        """
+        names = {name: key for key, name in self.keys.items() if not isinstance(key, str)}
+        mapping = {}
+        for key, name in other.keys.items():
+            local = key if key in self.keys or isinstance(key, str) else names.get(name, key)
+            mapping[key] = local
+            self.keys.setdefault(local, name)
+        for stat_name, stat in other._stats.items():
+            if stat_name != 'keys':
+                for key, value in stat.items():
+                    self.add(self._stats[stat_name], mapping.get(key, key), value)
+        for key, running_stat in other.result_stats.items():
+            self.result_stats[mapping.get(key, key)].merge(running_stat)
+        for (agent, opponent), score in other.pairwise_scores.items():
+            self.pairwise_scores[(mapping.get(agent, agent), mapping.get(opponent, opponent))] += score
+        for agent, search_stats in other.search_stats.items():
+            self.search_stats.setdefault(mapping.get(agent, agent), SearchStats()).add(search_stats)
+        for agent, move_times in other.move_times.items():
+            self.move_times[mapping.get(agent, agent)].merge(move_times)
+        for agent, timeouts in other.timeouts.items():
+            self.add(self.timeouts, mapping.get(agent, agent), timeouts)
+        return self
+
+    def summary(self, z=1.96):
+        """ Returns the mean, variance and confidence interval of the results
+            of every agent and player, as a dict by name.
+        """
+        return {self.keys.get(key, str(key)): stat.as_dict(z) for key, stat in self.result_stats.items()}
+
+    def ratings(self, prior=0.5, iterations=1000, tolerance=1e-9):
+        """ Returns the Bradley-Terry ratings of the agents in the Elo scale
+            (1500 on average, 400 points for 10 to 1 odds), as a dict by agent.
+            They are fitted to the pairwise scores with the minorization-
+            maximization algorithm, starting from the last ratings computed,
+            so updating them after a few more matches takes few iterations.
+            Prior adds that score to both agents of every pair that played,
+            so agents that never won still get a finite rating.
+        """
+        wins = collections.defaultdict(float)
+        games = collections.defaultdict(lambda: collections.defaultdict(float))
+        for (agent, opponent), score in self.pairwise_scores.items():
+            wins[agent] += score + prior
+            games[agent][opponent] += score + prior
+            games[opponent][agent] += score + prior
+        if not games:
+            return {}
+        strengths = {agent: self._strengths.get(agent, 1.0) for agent in games}
+        for _ in range(iterations):
+            updated = {agent: wins[agent] / sum(count / (strengths[agent] + strengths[opponent])
+                                                for opponent, count in games[agent].items())
+                       for agent in games}
+            scale = math.exp(sum(math.log(strength) for strength in updated.values()) / len(updated))
+            updated = {agent: strength / scale for agent, strength in updated.items()}
+            change = max(abs(updated[agent] - strengths[agent]) for agent in updated)
+            strengths = updated
+            if change < tolerance:
+                break
+        self._strengths = strengths
+        return {agent: 1500 + 400 * math.log10(strength) for agent, strength in strengths.items()}
 
     def __str__(self):
         """ Prints the statistics gathered in tabular form.
@@ -74,15 +243,29 @@ class Stats():
             [','.join([str(stat[key]) for stat in self._stats.values()]) for key in keys])
 
 
-class Contest(object):
+class Contest(ABC):
     """ Base class for all contests. Defines a common statistics gathering and
-        contest's matches handling.
+        contest's matches handling. Subclasses must tell their matches (see
+        `matches`).
+        If workers is greater than one, matches are played in that many
+        processes. Their steps are returned in the same order as a serial run,
+        unless ordered is False, in which case each match is returned as soon
+        as it finishes. If a seed is given, agents' random generators are
+        seeded before each match, so the results do not depend on the number
+        of workers.
+        If a time control is given (see core.TimeControl), all matches are
+        timed, and the times of the agents' moves are added to the statistics.
     """
 
-    def __init__(self, game, agents, stats=None):
+    def __init__(self, game, agents, stats=None, workers=None, ordered=True, seed=None, time_control=None):
         self.game = game
         self.agents = list(agents)
         self.stats = Stats() if stats is None else stats
+        self.workers = workers
+        self.ordered = ordered
+        self.seed = seed
+        self.time_control = time_control
+        self._match_nums = itertools.count()  # Numbers of the matches played by _play_matches.
 
     def run(self, matches):
         """ Receives a list of matches, given as tuples (game, agents) where
@@ -92,47 +275,334 @@ class Contest(object):
             stats is a dict with the statistics gathered for each agent.
         """
         self.stats.clear()  # Erases previous statistics.
-        for match_num, (game, agents) in zip(range(10 ** 5), matches):
-            for move_num, d, g in match(game, **agents):
-                self.stats.process(agents, match_num, move_num, d, g)
+        numbered_matches = zip(range(10 ** 5), matches)
+        if self.workers and self.workers > 1:
+            steps = self._parallel_matches(numbered_matches)
+        else:
+            steps = self._serial_matches(numbered_matches)
+        for match_num, agents, move_num, d, g in steps:
+            self.stats.process(agents, match_num, move_num, d, g)
+            yield (match_num, move_num, d, g)
+        yield (None, None, self.stats, self.game)
+
+    @abstractmethod
+    def matches(self):
+        """ Returns the matches of the contest, as tuples (game, agents). Contests
+            that choose their matches depending on the results of the previous
+            ones return the matches of their first round.
+        """
+        pass
+
+    async def run_async(self, matches=None, concurrency=100, copy_agents=True):
+        """ Asynchronous version of `run`, as an async generator: up to
+            concurrency matches are played at the same time in the event loop
+            (see `core.async_match`), which is useful with agents that spend
+            their time waiting, like engines in other processes. Steps of
+            different matches are interleaved, in the order they happen. If
+            matches are not given, the contest's own are played (see
+            `matches`), which is only the first round for contests that choose
+            their matches depending on the results. Since agents keep the state
+            of their match, each match is played by copies of the agents, unless
+            copy_agents is False. Copies are seeded for their match (see
+            `seed_agents`), with a random seed if the contest has none, so they
+            do not all play the same way.
+        """
+        self.stats.clear()  # Erases previous statistics.
+        numbered_matches = enumerate(self.matches() if matches is None else matches)
+        seed = self.seed if self.seed is not None else random.getrandbits(64)
+        steps = asyncio.Queue(2 * concurrency)
+
+        async def play():
+            try:
+                for match_num, (game, agents) in numbered_matches:
+                    playing = {player: copy.deepcopy(agent) for player, agent in agents.items()} \
+                        if copy_agents else agents
+                    if copy_agents or self.seed is not None:
+                        seed_agents(playing, '%s/%d' % (seed, match_num))
+                    async for step in async_match(game, time_control=self.time_control, **playing):
+                        move_num, d, g = self._timed_step(agents, step)
+                        # Agents' search stats are sent with the step, since other matches may change the agents
+                        # before it is processed.
+                        match_stats = None if move_num is not None else \
+                            {player: agent.match_stats for player, agent in playing.items()
+                             if hasattr(agent, 'match_stats')}
+                        await steps.put((match_num, agents, move_num, agents if move_num == 0 else d, g, match_stats))
+            finally:
+                await steps.put(None)
+
+        tasks = [asyncio.ensure_future(play()) for _ in range(concurrency)]
+        try:
+            running = len(tasks)
+            while running:
+                step = await steps.get()
+                if step is None:  # A task has finished.
+                    running -= 1
+                    continue
+                match_num, agents, move_num, d, g, match_stats = step
+                self.stats.process(agents, match_num, move_num, d, g, match_stats)
                 yield (match_num, move_num, d, g)
+            await asyncio.gather(*tasks)  # Raises the errors of the tasks, if any.
+        finally:
+            for task in tasks:
+                task.cancel()
         yield (None, None, self.stats, self.game)
 
+    def _play_matches(self, matches, results):
+        """ Plays a list of matches (game, agents) together, in parallel if
+            there are many workers. Used by contests that choose matches
+            depending on the results of the previous ones. Matches are numbered
+            after the ones played before in the same run (see `_match_nums`).
+            Returns their steps, after they are processed by the statistics,
+            and sets results[i] to the results of the i-th match.
+        """
+        numbered_matches = [(next(self._match_nums), m) for m in matches]
+        first = numbered_matches[0][0] if numbered_matches else 0
+        if self.workers and self.workers > 1:
+            steps = self._parallel_matches(numbered_matches)
+        else:
+            steps = self._serial_matches(numbered_matches)
+        for match_num, agents, move_num, d, g in steps:
+            self.stats.process(agents, match_num, move_num, d, g)
+            if move_num is None:  # Finished match.
+                results[match_num - first] = d
+            yield (match_num, move_num, d, g)
+
+    def _serial_matches(self, numbered_matches):
+        for match_num, (game, agents) in numbered_matches:
+            if self.seed is not None:
+                seed_agents(agents, '%s/%d' % (self.seed, match_num))
+            for step in match(game, time_control=self.time_control, **agents):
+                move_num, d, g = self._timed_step(agents, step)
+                yield (match_num, agents, move_num, d, g)
+
+    def _timed_step(self, agents, step):
+        """ Returns a step of a match without its timing, which is added to
+            the statistics in timed matches.
+        """
+        if len(step) > 3 and step[3] is not None:
+            self.stats.process_timing(agents[step[3].player], step[3])
+        return step[:3]
+
+    def _parallel_matches(self, numbered_matches):
+        """ Plays the matches in the process pool, keeping at most two
+            matches per worker waiting, so matches can be generated lazily.
+        """
+        pool = process_pool(self.workers)
+        seed = self.seed if self.seed is not None else random.getrandbits(64)
+        numbered_matches = iter(numbered_matches)
+        pending = {}
+        finished = {}
+        submitted = collections.deque()  # Match numbers in the order they were submitted.
+        while True:
+            for match_num, (game, agents) in itertools.islice(numbered_matches, 2 * self.workers - len(pending)):
+                future = pool.submit(_play_match, game, agents, '%s/%d' % (seed, match_num), self.time_control)
+                pending[future] = (match_num, agents)
+                submitted.append(match_num)
+            if not pending:
+                break
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                match_num, agents = pending.pop(future)
+                finished[match_num] = (agents, future.result())
+            while finished:
+                if self.ordered:
+                    if submitted[0] not in finished:
+                        break
+                    match_num = submitted.popleft()
+                else:
+                    match_num = min(finished)
+                    submitted.remove(match_num)
+                agents, (steps, match_stats) = finished.pop(match_num)
+                for player, stats in match_stats.items():  # Agents' search stats come from the worker.
+                    agents[player].match_stats = stats
+                for step in steps:
+                    move_num, d, g = self._timed_step(agents, step)
+                    yield (match_num, agents, move_num, agents if move_num == 0 else d, g)
+
     def log(self, matches=None):
         """ Transforms a contest generator into a line generator, that
             can be used to display in the screen or write in a file.
         """
-        for n1, n2, a, _ in self.run(matches):
+        for n1, n2, a, _ in (self.run() if matches is None else self.run(matches)):
             if n1 is None:
-                yield 'Agent,' + ','.join([n for n in a.iterkeys()])
+                yield 'Agent,' + ','.join([n for n in a._stats.keys()])
                 for agent in self.agents:
-                    yield agent.name + ',' + ','.join([str(stat[agent]) for stat in a.itervalues()])
+                    yield agent.name + ',' + ','.join([str(stat[agent]) for stat in a._stats.values()])
             elif n2 == 0 or n2 is None:
-                yield '[%d]: %s' % (n1, ', '.join(['%s:%s' % i for i in a.iteritems()]))
+                yield '[%d]: %s' % (n1, ', '.join(['%s:%s' % i for i in a.items()]))
             else:
                 yield '[%d] #%d %s' % (n1, n2, a)
 
 
+class LogWriter(ABC):
+    """ Base class for writers that stream the steps of a contest (see
+        `Contest.run`) to a file as they are played, so memory does not grow
+        with the number of matches. The file may be a path or a text file
+        object, which is not closed. Paths ending in '.gz' are compressed with
+        gzip, unless compress says otherwise. In compact mode game states are
+        not written, only the agents, moves and results of each match.
+    """
+
+    def __init__(self, file, compact=False, compress=None, buffer_size=2 ** 16):
+        self.compact = compact
+        self._owned = isinstance(file, str)
+        if not self._owned:
+            self.file = file
+        elif compress if compress is not None else file.endswith('.gz'):
+            self.file = io.TextIOWrapper(io.BufferedWriter(gzip.open(file, 'wb'), buffer_size),
+                                         encoding='utf-8', newline='')
+        else:
+            self.file = open(file, 'w', buffering=buffer_size, encoding='utf-8', newline='')
+
+    def write(self, steps):
+        """ Writes all steps of a contest, and returns its statistics.
+        """
+        for match_num, move_num, d, game in steps:
+            if match_num is None:  # Contest is over.
+                self._write_stats(d)
+                return d
+            state = None if self.compact else repr(game)
+            if move_num == 0:
+                self._write_step(match_num, move_num, 'begin', {player: agent.name for player, agent in d.items()},
+                                 state)
+            elif move_num is None:
+                self._write_step(match_num, move_num, 'end', d, state)
+            else:
+                self._write_step(match_num, move_num, 'move', d, state)
+        return None
+
+    @abstractmethod
+    def _write_step(self, match_num, move_num, event, data, state):
+        """ Writes a step of a match. Data is a dict of agent names by player
+            for 'begin' events, the move for 'move' events and the results
+            for 'end' events.
+        """
+        pass
+
+    def _write_stats(self, stats):
+        """ Writes the statistics of the contest, if the format allows it.
+        """
+        pass
+
+    def close(self):
+        """ Flushes the file, and closes it if it was opened by the writer.
+        """
+        if self._owned:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JSONLogWriter(LogWriter):
+    """ Writes contests in JSON Lines format: an object for every step, with
+        the keys "match", "move", "event", "data" and "state" (unless compact),
+        and a last object with the statistics of the contest, keyed by "stats".
+    """
+
+    def _write_step(self, match_num, move_num, event, data, state):
+        step = {'match': match_num, 'move': move_num, 'event': event, 'data': _json_value(data)}
+        if state is not None:
+            step['state'] = state
+        self.file.write(json.dumps(step, separators=(',', ':')) + '\n')
+
+    def _write_stats(self, stats):
+        names = stats.keys
+        table = {stat_name: {names[key]: value for key, value in stat.items()}
+                 for stat_name, stat in stats._stats.items() if stat_name != 'keys'}
+        table['search_stats'] = {agent.name: search_stats.as_dict()
+                                 for agent, search_stats in stats.search_stats.items()}
+        self.file.write(json.dumps({'stats': table}, separators=(',', ':')) + '\n')
+
+
+class CSVLogWriter(LogWriter):
+    """ Writes contests in CSV format, with a header and a row for every step:
+        match, move, event, data and state (unless compact). Data dicts are
+        written as 'player:value' pairs separated by semicolons. Statistics
+        are not written (see `Stats.__str__`).
+    """
+
+    def __init__(self, file, compact=False, compress=None, buffer_size=2 ** 16):
+        LogWriter.__init__(self, file, compact, compress, buffer_size)
+        self._csv = csv.writer(self.file)
+        self._csv.writerow(['match', 'move', 'event', 'data'] + ([] if compact else ['state']))
+
+    def _write_step(self, match_num, move_num, event, data, state):
+        if isinstance(data, dict):
+            data = ';'.join('%s:%s' % item for item in data.items())
+        row = [match_num, '' if move_num is None else move_num, event, data]
+        if state is not None:
+            row.append(state)
+        self._csv.writerow(row)
+
+
+def _json_value(value):
+    """ Returns the value if JSON can serialize it, else its string.
+    """
+    if isinstance(value, dict):
+        return {str(key): _json_value(item) for key, item in value.items()}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def seed_agents(agents, seed):
+    """ Seeds the random generators of the agents (a dict {player:agent}),
+        deriving a different seed for each player.
+    """
+    for player, agent in agents.items():
+        rand = getattr(agent, 'random', None)
+        if isinstance(rand, random.Random):
+            rand.seed('%s/%s' % (seed, player))
+
+
+def _play_match(game, agents, seed, time_control=None):
+    """ Entry point of the worker processes of parallel contests. Returns
+        all steps of the match, without the agents, and the search statistics
+        of the agents in the match.
+    """
+    seed_agents(agents, seed)
+    steps = [(step[0], None if step[0] == 0 else step[1]) + step[2:]
+             for step in match(game, time_control=time_control, **agents)]
+    match_stats = {player: agent.match_stats for player, agent in agents.items() if hasattr(agent, 'match_stats')}
+    return steps, match_stats
+
+
 def complete(contest):
     for match_num, _, d, _ in contest.run():
         if match_num is None:  # Contest is over.
             return d
 
 
+async def complete_async(contest, concurrency=100, copy_agents=True):
+    """ Asynchronous version of `complete`, using `Contest.run_async`.
+    """
+    async for match_num, _, d, _ in contest.run_async(concurrency=concurrency, copy_agents=copy_agents):
+        if match_num is None:  # Contest is over.
+            return d
+
+
 class AllAgainstAll_Contest(Contest):
     """ All agents play count matches against all other agents, in all possible
         combinations. 
     """
 
-    def __init__(self, game, agents, count=1):
-        Contest.__init__(self, game, agents)
+    def __init__(self, game, agents, count=1, **options):
+        Contest.__init__(self, game, agents, **options)
         self.count = count
 
-    def run(self):
+    def matches(self):
         players = self.game.players
         arrays = itertools.permutations(self.agents, len(players))
-        matches = [(self.game, dict(zip(players, array))) for array in arrays for _ in range(self.count)]
-        return Contest.run(self, matches)
+        return [(self.game, dict(zip(players, array))) for array in arrays for _ in range(self.count)]
+
+    def run(self):
+        return Contest.run(self, self.matches())
 
 
 class Sampling_Contest(Contest):
@@ -141,9 +611,9 @@ class Sampling_Contest(Contest):
         some agents may play less matches that count.
     """
 
-    def __init__(self, game, agents, random=None, count=1):
-        Contest.__init__(self, game, agents)
-        self.random = randgen(random)
+    def __init__(self, game, agents, random=None, count=1, **options):
+        Contest.__init__(self, game, agents, **options)
+        self.random = Agent.rand_gen(random)
         self.count = count
 
     def matches(self):
@@ -151,7 +621,7 @@ class Sampling_Contest(Contest):
         players = self.game.players
         player_count = len(players)
         while len(control) > player_count:
-            agents = control.keys()
+            agents = list(control.keys())
             self.random.shuffle(agents)
             for array in itertools.cycle(itertools.permutations(agents, player_count)):
                 yield (self.game, dict(zip(players, array)))
@@ -174,59 +644,347 @@ class Sort_Contest(Contest):
         results. Which matches and how many times each agent plays depends on
         the sort algorithm. Shuffling the agents list is recommended.
         This is only usable with 2 player games.
+
+        Agents are sorted from worst to best with a merge sort, which merges
+        all pairs of runs of sorted agents at the same time, so comparisons
+        in different merges are independent and are played together (in
+        parallel if workers is greater than one). The results of comparisons
+        are cached, so no pair of agents plays twice, and matches are passed
+        to the statistics as they finish instead of being stored.
     """
 
-    def __init__(self, game, agents, count=1):
-        Contest.__init__(self, game, agents)
+    def __init__(self, game, agents, count=1, **options):
+        Contest.__init__(self, game, agents, **options)
         self.count = count
-        self.__matches__ = []
+        # Cached comparisons, as {(agent1, agent2): results of agent1 minus results of agent2}.
+        self.comparisons = {}
+
+    def comparison(self, agent1, agent2):
+        """ Returns the cached comparison of the agents, or None if they have
+            not played yet.
+        """
+        if (agent1, agent2) in self.comparisons:
+            return self.comparisons[(agent1, agent2)]
+        if (agent2, agent1) in self.comparisons:
+            return -self.comparisons[(agent2, agent1)]
+        return None
+
+    def matches(self):
+        """ Returns the matches of the first comparisons of the sort, between
+            consecutive pairs of agents.
+        """
+        return self._pair_matches(list(zip(self.agents[0::2], self.agents[1::2])))
+
+    def _pair_matches(self, pairs):
+        players = self.game.players
+        return [(self.game, dict(zip(players, pair))) for pair in pairs for _ in range(self.count)]
 
     def comp_fun(self, agent1, agent2):
+        """ Compares two agents, playing their matches if they have not been
+            compared yet. Positive if agent1 is better.
+        """
+        for _ in self._compare([(agent1, agent2)]):
+            pass
+        return self.comparison(agent1, agent2)
+
+    def run(self):
+        self.stats.clear()  # Erases previous statistics.
+        self.comparisons.clear()
+        self._match_nums = itertools.count()
+        runs = [[agent] for agent in self.agents]
+        while len(runs) > 1:
+            merges = [_Merge(left, right) for left, right in zip(runs[0::2], runs[1::2])]
+            while True:
+                pairs = [merge.pair() for merge in merges if not merge.finished()]
+                if not pairs:
+                    break
+                for step in self._compare(pairs):
+                    yield step
+                for merge in merges:
+                    if not merge.finished():
+                        merge.advance(self.comparison(*merge.pair()))
+            runs = [merge.result for merge in merges] + runs[2 * len(merges):]
+        self.agents[:] = runs[0] if runs else []
+        yield (None, None, self.stats, self.game)
+
+    def _compare(self, pairs):
+        """ Plays count matches for every pair of agents not compared yet, and
+            caches their comparisons. Returns the steps of the matches.
+        """
         players = self.game.players
-        agents = dict(zip(players, [agent1, agent2]))
-        results_agent1 = []
-        results_agent2 = []
-        for _ in range(self.count):
-            m = list(match(self.game, **agents))
-            self.__matches__.append((agents, m))
-            _, results, _ = m[-1]
-            results_agent1.append(results[players[0]])
-            results_agent2.append(results[players[1]])
-        return sum(results_agent1) - sum(results_agent2)
+        pairs = [pair for pair in dict.fromkeys(pairs) if self.comparison(*pair) is None]
+        matches = self._pair_matches(pairs)
+        results = [None] * len(matches)
+        for step in self._play_matches(matches, results):
+            yield step
+        for index, pair in enumerate(pairs):
+            self.comparisons[pair] = sum(result[players[0]] - result[players[1]]
+                                         for result in results[index * self.count:(index + 1) * self.count])
+
+
+class _Merge(object):
+    """ Merge of two sorted runs of agents, advanced one comparison at a time.
+    """
+
+    def __init__(self, left, right):
+        self.left, self.right = collections.deque(left), collections.deque(right)
+        self.result = []
+
+    def finished(self):
+        if not self.left or not self.right:
+            self.result.extend(self.left or self.right)
+            self.left.clear()
+            self.right.clear()
+            return True
+        return False
+
+    def pair(self):
+        return (self.left[0], self.right[0])
+
+    def advance(self, comparison):
+        """ Moves the worse agent of the pair to the result. Ties keep the
+            left one first, so the sort is stable.
+        """
+        if comparison > 0:
+            self.result.append(self.right.popleft())
+        else:
+            self.result.append(self.left.popleft())
+
+
+class Swiss_Contest(Contest):
+    """ Swiss-system tournament: in every round agents are paired with others
+        with similar scores, avoiding rematches, and play count matches
+        (alternating seats). Each match scores 1 for a victory, 0.5 for a
+        draw and 0 for a defeat. With an odd number of agents, the lowest one
+        that has not had a bye yet wins the round without playing. By default
+        there are as many rounds as a knockout would have, which is usually
+        enough to rank a large pool of agents with few matches.
+        This is only usable with 2 player games.
+
+        Pairing sorts the agents by score and pairs each one with the next
+        one it has not played, looking at most LOOKAHEAD agents ahead (else
+        it is a rematch), so it takes O(n log n) time. All matches of a round
+        are played together, in parallel if there are many workers.
+    """
+
+    LOOKAHEAD = 16
+
+    def __init__(self, game, agents, rounds=None, count=1, **options):
+        Contest.__init__(self, game, agents, **options)
+        self.rounds = rounds if rounds is not None else max(1, math.ceil(math.log2(max(len(self.agents), 1))))
+        self.count = count
+        self.scores = {}
+        self.opponents = {}
+        self.byes = set()
+        self.pairings_played = []  # List of (pairs, bye) for every round played.
 
     def run(self):
-        self.__matches__ = []
-        self.agents.sort(self.comp_fun)
         self.stats.clear()  # Erases previous statistics.
-        for match_num, (agents, moves) in zip(range(len(self.__matches__)), self.__matches__):
-            for move_num, d, g in moves:
-                self.stats.process(agents, match_num, move_num, d, g)
-                yield (match_num, move_num, d, g)
+        self._match_nums = itertools.count()
+        self.scores = {agent: 0.0 for agent in self.agents}
+        self.opponents = {agent: collections.Counter() for agent in self.agents}
+        self.byes = set()
+        self.pairings_played = []
+        players = self.game.players
+        for _ in range(self.rounds):
+            pairs, bye = self.pairings()
+            matches = self._round_matches(pairs)
+            results = [None] * len(matches)
+            for step in self._play_matches(matches, results):
+                yield step
+            for (_, agents), result in zip(matches, results):
+                for player, opponent in (players, players[::-1]):
+                    if result[player] == result[opponent]:
+                        self.scores[agents[player]] += 0.5
+                    elif result[player] > result[opponent]:
+                        self.scores[agents[player]] += 1
+            for agent1, agent2 in pairs:
+                self.opponents[agent1][agent2] += 1
+                self.opponents[agent2][agent1] += 1
+            if bye is not None:
+                self.scores[bye] += self.count
+                self.byes.add(bye)
+            self.pairings_played.append((pairs, bye))
         yield (None, None, self.stats, self.game)
 
+    def matches(self):
+        """ Returns the matches of the next round (see `pairings`).
+        """
+        return self._round_matches(self.pairings()[0])
+
+    def _round_matches(self, pairs):
+        players = self.game.players
+        return [(self.game, dict(zip(players, pair if index % 2 == 0 else pair[::-1])))
+                for pair in pairs for index in range(self.count)]
+
+    def pairings(self):
+        """ Returns the pairs of agents of the next round, the first one of
+            each pair playing first, and the agent that gets a bye, if any.
+        """
+        seeds = {agent: index for index, agent in enumerate(self.agents)}
+        order = sorted(self.agents, key=lambda agent: (-self.scores.get(agent, 0), seeds[agent]))
+        bye = None
+        if len(order) % 2:
+            index = next((index for index in reversed(range(len(order))) if order[index] not in self.byes),
+                         len(order) - 1)
+            bye = order.pop(index)
+        taken = [False] * len(order)
+        pairs = []
+        for index, agent in enumerate(order):
+            if taken[index]:
+                continue
+            taken[index] = True
+            opponents = self.opponents.get(agent, ())
+            candidate = None
+            looked = 0
+            for other in range(index + 1, len(order)):
+                if taken[other]:
+                    continue
+                if candidate is None:
+                    candidate = other  # A rematch, if no one else is found.
+                if order[other] not in opponents:
+                    candidate = other
+                    break
+                looked += 1
+                if looked >= self.LOOKAHEAD:
+                    break
+            taken[candidate] = True
+            pairs.append((agent, order[candidate]))
+        return pairs, bye
+
+    def standings(self):
+        """ Returns a list of tuples (agent, score, Buchholz score) from the
+            first to the last, ordered by score and then by Buchholz score
+            (the sum of the scores of the agent's opponents).
+        """
+        buchholz = {agent: sum(self.scores[opponent] * times for opponent, times in self.opponents[agent].items())
+                    for agent in self.scores}
+        return sorted(((agent, self.scores[agent], buchholz[agent]) for agent in self.scores),
+                      key=lambda standing: (-standing[1], -standing[2]))
+
 
 class Pyramid_Contest(Contest):
     """ Agents play count matches againts other. The winner gets to the next 
         round, and so on until the contest has one winner.
+
+        Every round groups the agents in order, as many as the game has
+        players, and the best one of each group advances. Agents at the
+        beginning of the list (the seeds) may advance without playing (a bye),
+        so later rounds are complete if possible. If fewer agents than players
+        remain, copies of them fill the other seats of the final, since an
+        agent can only play one seat, and their results count for the agents
+        they are copies of. In the count
+        matches of a group agents rotate seats. Their results are added, and
+        ties are broken by up to tie_breaks extra matches, and then by seed.
+        All matches of a round are played together, in parallel if there are
+        many workers. After running, `rounds` has a list for every round of
+        the groups (tuples of agents) and their winners, and `winner` is the
+        winner of the contest.
     """
 
-    def __init__(self, game, agents, count=1):
-        Contest.__init__(self, game, agents)
+    def __init__(self, game, agents, count=1, tie_breaks=1, **options):
+        Contest.__init__(self, game, agents, **options)
         self.count = count
+        self.tie_breaks = tie_breaks
+        self.rounds = []
+        self.winner = None
+        self._copies = {}  # Original agent of each copy filling a seat (see bracket).
 
     def run(self):
-        """ TODO
-        winners = list(self.agents)
-        iter_agents = itertools.cycle(winners)
-        matches = [[iter_agents.next() for _ in range(len(players))] for _ in range(round(len(winners) / 2.0))]
+        self.stats.clear()  # Erases previous statistics.
+        self._match_nums = itertools.count()
+        self.rounds = []
+        self._copies = {}
+        agents = list(self.agents)
+        while len(agents) > 1:
+            byes, groups = self.bracket(agents)
+            scores = [collections.defaultdict(int) for _ in groups]
+            for step in self._play_groups(groups, scores, range(self.count)):
+                yield step
+            for tie_break in range(self.tie_breaks):
+                tied = [index for index, group in enumerate(groups) if len(self._best(group, scores[index])) > 1]
+                if not tied:
+                    break
+                tied_scores = [scores[index] for index in tied]
+                for step in self._play_groups([groups[index] for index in tied], tied_scores,
+                                              [self.count + tie_break]):
+                    yield step
+            winners = [self._best(group, scores[index])[0] for index, group in enumerate(groups)]
+            self.rounds.append([(group, winner) for group, winner in zip(groups, winners)])
+            agents = byes + winners
+        self.winner = agents[0] if agents else None
+        yield (None, None, self.stats, self.game)
+
+    def bracket(self, agents):
+        """ Returns the agents that advance without playing and the groups
+            (tuples of agents) of the round. If possible, as many groups are
+            played as needed for the next round to have a power of the number
+            of players, else as many as possible. If there are fewer agents
+            than players, the group is filled with copies of the agents.
+        """
+        players = len(self.game.players)
+        if len(agents) <= players:
+            fillers = itertools.islice(itertools.cycle(agents), players - len(agents))
+            return [], [tuple(agents) + tuple(self._copy(agent, number) for number, agent in enumerate(fillers, 1))]
+        target = players
+        while target * players < len(agents):
+            target *= players
+        if (len(agents) - target) % (players - 1) == 0:
+            group_count = (len(agents) - target) // (players - 1)
+        else:  # The next round cannot be complete, so play as many groups as possible.
+            group_count = len(agents) // players
+        bye_count = len(agents) - group_count * players
+        return agents[:bye_count], [tuple(agents[bye_count + index * players:bye_count + (index + 1) * players])
+                                    for index in range(group_count)]
+
+    def _copy(self, agent, number):
+        """ Returns a copy of the agent to fill another seat, with a name of
+            its own so their statistics are told apart.
+        """
+        agent_copy = copy.deepcopy(agent)
+        if hasattr(agent_copy, 'name'):
+            agent_copy.name = '%s~%d' % (agent.name, number)
+        self._copies[agent_copy] = agent
+        return agent_copy
+
+    def matches(self):
+        """ Returns the matches of the first round (see `bracket`).
+        """
+        return [match for _, match in self._group_matches(self.bracket(self.agents)[1], range(self.count))]
+
+    def _group_matches(self, groups, rotations):
+        """ Returns a match for every group and rotation of its agents' seats,
+            as tuples (index of the group, match).
+        """
+        players = self.game.players
+        return [(index, (self.game, dict(zip(players, group[rotation % len(group):] + group[:rotation % len(group)]))))
+                for index, group in enumerate(groups) for rotation in rotations]
+
+    def _play_groups(self, groups, scores, rotations):
+        """ Plays a match for every group and rotation of its agents' seats,
+            adding the results of each agent to the scores of its group.
+        """
+        group_matches = self._group_matches(groups, rotations)
+        results = [None] * len(group_matches)
+        for step in self._play_matches([match for _, match in group_matches], results):
+            yield step
+        for (index, (_, agents)), result in zip(group_matches, results):
+            for player, agent in agents.items():
+                scores[index][self._copies.get(agent, agent)] += result[player]
+
+    def _best(self, group, scores):
+        """ Returns the agents of the group with the best score, by seed.
         """
+        agents = [agent for agent in group if agent not in self._copies]
+        best = max(scores[agent] for agent in agents)
+        return [agent for agent in agents if scores[agent] == best]
 
 
 if __name__ == '__main__':
-    from tictactoe import TicTacToe
-    from _agents import RandomAgent, MiniMaxAgent
+    from examples.tictactoe import TicTacToe
+    from adversarial_search.agents import RandomAgent, MiniMaxAgent
 
     rnd = random.Random()
-    agentes = [RandomAgent(rnd, 'RandomAgent_%05d' % i) for i in range(1)]
+    agentes = [RandomAgent('RandomAgent_%05d' % i, rnd) for i in range(1)]
     agentes.extend([MiniMaxAgent('MiniMaxAgent_%05d' % i, 3, rnd) for i in range(1)])
     print(complete(AllAgainstAll_Contest(TicTacToe(), agentes, 5)))
@@ -1,6 +1,13 @@
 from .agent import Agent
 from .alphabeta import AlphaBetaAgent
+from .book import BookAgent
 from .files import FileAgent
 from .mcts import MCTSAgent
 from .minimax import MiniMaxAgent
+from .negascout import NegaScoutAgent
+from .ordering import MoveOrdering, GameMoveOrdering, PVMoveOrdering, KillerMoveOrdering, HistoryMoveOrdering
 from .random import RandomAgent
+from .solved import SolvedAgent
+from .stats import SearchStats
+from .transposition import TranspositionTable
+from .uct import UCTAgent
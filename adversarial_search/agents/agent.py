@@ -1,7 +1,10 @@
 import random
+import time
 
 from abc import ABC, abstractmethod
 
+from .stats import SearchStats, ProfiledGame
+
 
 class Agent(ABC):
     """ Base class for agents participating in games.
@@ -10,15 +13,33 @@ class Agent(ABC):
     def __init__(self, name):
         self.name = name
         self.player_type = None
+        # Statistics of the last decision and of the current match.
+        self.search_stats = SearchStats()
+        self.match_stats = SearchStats()
+        # If set, the time spent in the game's methods is measured too, at some cost.
+        self.profile = False
+        # Time left for the current move (in seconds) in timed matches (see core.TimeControl).
+        self.time_left = None
 
-    def select_move(self, game, *moves):
-        """ Agents move choice. If no moves are provided, choices are retrieved from the game.
+    def select_move(self, game, *moves, time_left=None):
+        """ Agents move choice. If no moves are provided, choices are retrieved from the game. In
+            timed matches, time_left is the time the agent has for this move, kept in `time_left`
+            so the decision can budget its search.
         """
+        self.time_left = time_left
+        stats = self.search_stats = SearchStats()
+        if self.profile:
+            game = ProfiledGame(game, stats)
+        start = time.perf_counter()
         if not moves:
             moves = game.moves()
             if not moves:
                 return None
-        return self._decision(moves, game)
+        move = self._decision(moves, game)
+        stats.decisions += 1
+        stats.total_time += time.perf_counter() - start
+        self.match_stats.add(stats)
+        return move
 
     @abstractmethod
     def _decision(self, moves, game):
@@ -32,15 +53,17 @@ class Agent(ABC):
             called again until the match ends.
         """
         self.player_type = player
+        self.match_stats = SearchStats()
 
     def match_moves(self, before, move, after):
         """ Tells the agent the active player have moved in the match he is participating in.
         """
         pass
 
-    def match_ends(self, game):
+    def match_ends(self, game, results=None):
         """ Tells the agent the match he was participating in has finished. The game parameter holds
-            the final game state.
+            the final game state. Results are given if they are not the game's, because the match
+            was forfeited on time (see core.TimeControl).
         """
         pass
 
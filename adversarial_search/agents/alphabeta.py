@@ -1,6 +1,7 @@
 from math import inf
 
 from .minimax import MiniMaxAgent
+from .transposition import EXACT, LOWER, UPPER
 
 INFINITE = inf
 
@@ -10,28 +11,108 @@ class AlphaBetaAgent(MiniMaxAgent):
         <http://en.wikipedia.org/wiki/Alpha-beta_pruning>
     """
 
-    def __init__(self, name="AlphaBetaAgent", horizon=3, random=None, heuristic=None):
-        MiniMaxAgent.__init__(self, name, horizon, random, heuristic)
+    def __init__(self, name="AlphaBetaAgent", horizon=3, random=None, heuristic=None, transposition_table=None,
+                 time_limit=None, max_depth=None, move_ordering=None):
+        MiniMaxAgent.__init__(self, name, horizon, random, heuristic, transposition_table, time_limit, max_depth)
+        # A list of MoveOrdering strategies, from highest to lowest priority.
+        self.move_ordering = list(move_ordering) if move_ordering else []
+
+    def match_begins(self, player, game):
+        MiniMaxAgent.match_begins(self, player, game)
+        for ordering in self.move_ordering:
+            ordering.clear()
+
+    def _order_moves(self, game, moves, depth):
+        for ordering in reversed(self.move_ordering):  # Stable sorts, so the first strategy prevails.
+            moves = ordering.order(self, game, moves, depth)
+        return moves
+
+    def _cutoff(self, game, move, depth, index):
+        """ Called when the move at the given index in the search order caused a cutoff. The more
+            cutoffs happen on the first move searched, the better the move ordering.
+        """
+        self.search_stats.cutoffs += 1
+        if index == 0:
+            self.search_stats.first_move_cutoffs += 1
+        for ordering in self.move_ordering:
+            ordering.cutoff(self, game, move, depth)
+
+    def _root_search(self, moves, game):
+        """ When move ordering is enabled, the root moves are also searched in order, pruning with
+            the best value found so far. Moves with the same ordering are shuffled first, so ties
+            are still broken randomly. Values of moves that are not chosen are upper bounds.
+        """
+        if not self.move_ordering:
+            return MiniMaxAgent._root_search(self, moves, game)
+        moves = list(moves)
+        self.random.shuffle(moves)
+        alpha = -INFINITE
+        best_move = None
+        next_game_states = []
+        for move in self._order_moves(game, moves, 0):
+            value = self._minimax(self._next(game, move), 1, alpha, INFINITE)
+            self._undo(game)
+            next_game_states.append((move, value))
+            if best_move is None or alpha < value:
+                alpha = value
+                best_move = move
+        for ordering in self.move_ordering:
+            ordering.best(self, game, best_move, 0)
+        return next_game_states, best_move
 
     def _minimax(self, game, depth, alpha=-INFINITE, beta=INFINITE):
         result = self.terminal_value(game, depth)
         if result is not None:
             return result
         moves = game.moves()
+        ordered_moves = self._order_moves(game, moves, depth) if self.move_ordering else moves
+        table = self.transposition_table
+        if table is not None:
+            entry = table.probe(game)
+            if entry is not None:
+                self.search_stats.cache_hits += 1
+                if entry.depth >= self.horizon - depth:
+                    if entry.flag == EXACT:
+                        self._table_hit(entry)
+                        return entry.value
+                    if entry.flag == LOWER and entry.value >= beta:
+                        self._table_hit(entry)
+                        return beta
+                    if entry.flag == UPPER and entry.value <= alpha:
+                        self._table_hit(entry)
+                        return alpha
+                if entry.move in ordered_moves:  # The best move found before is tried first.
+                    ordered_moves = [entry.move] + [move for move in ordered_moves if move != entry.move]
+            reached = self._start_subtree()
+        alpha_0, beta_0 = alpha, beta
+        best_move = None
         active_player = game.active_player()
         if active_player == self.player_type:
-            for move in moves:
-                value = self._minimax(game.next(move), depth + 1, alpha, beta)
+            for index, move in enumerate(ordered_moves):
+                value = self._minimax(self._next(game, move), depth + 1, alpha, beta)
+                self._undo(game)
                 if alpha < value:
                     alpha = value
+                    best_move = move
                 if beta <= alpha:
+                    self._cutoff(game, move, depth, index)
                     break
-            return alpha
+            result = alpha
         else:
-            for move in moves:
-                value = self._minimax(game.next(move), depth + 1, alpha, beta)
+            for index, move in enumerate(ordered_moves):
+                value = self._minimax(self._next(game, move), depth + 1, alpha, beta)
+                self._undo(game)
                 if beta > value:
                     beta = value
+                    best_move = move
                 if beta <= alpha:
+                    self._cutoff(game, move, depth, index)
                     break
-            return beta
+            result = beta
+        if best_move is not None:
+            for ordering in self.move_ordering:
+                ordering.best(self, game, best_move, depth)
+        if table is not None:
+            flag = UPPER if result <= alpha_0 else LOWER if result >= beta_0 else EXACT
+            table.store(game, result, self._subtree_draft(reached, self.horizon - depth), flag, best_move)
+        return result
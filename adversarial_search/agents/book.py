@@ -0,0 +1,52 @@
+from .agent import Agent
+from ..tables import GameTable
+
+
+class BookAgent(Agent):
+    """ An agent that plays the moves of an opening book (see `adversarial_search.book`) while the
+        game states are in it, and lets the wrapped agent decide otherwise. The book may be given
+        as a GameTable or the path of its file, which is memory mapped. Book hits and misses are
+        counted, and the wrapped agent is told about all match events. The search statistics of
+        the wrapped agent's decisions are included in the book agent's.
+    """
+
+    def __init__(self, agent, book, name=None):
+        Agent.__init__(self, 'Book(%s)' % agent.name if name is None else name)
+        self.agent = agent
+        self.book = GameTable(book) if isinstance(book, str) else book
+        self.hits = 0
+        self.misses = 0
+
+    def _decision(self, moves, game):
+        entry = self.book.get(game.canonical_key())
+        if entry is not None and entry.move >= 0:
+            move = game.original_move(entry.move)
+            if move in moves:
+                self.hits += 1
+                return move
+        self.misses += 1
+        move = self.agent.select_move(game, *moves, time_left=self.time_left)
+        inner_stats = self.agent.search_stats
+        self.search_stats.add(inner_stats)
+        # The decision and its time are already counted by this agent.
+        self.search_stats.decisions -= inner_stats.decisions
+        self.search_stats.total_time -= inner_stats.total_time
+        return move
+
+    def counters(self):
+        """ Returns a dict with the book usage counters.
+        """
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def match_begins(self, player, game):
+        Agent.match_begins(self, player, game)
+        self.agent.match_begins(player, game)
+
+    def match_moves(self, before, move, after):
+        self.agent.match_moves(before, move, after)
+
+    def match_ends(self, game, results=None):
+        if results is None:
+            self.agent.match_ends(game)
+        else:
+            self.agent.match_ends(game, results)
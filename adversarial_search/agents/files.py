@@ -31,8 +31,8 @@ class FileAgent(Agent):
         self.__print_state__(after)
         self.out_file.flush()
 
-    def match_ends(self, game):
-        result = game.results()[self.player_type]
+    def match_ends(self, game, results=None):
+        result = (game.results() if results is None else results)[self.player_type]
         outcome = 'defeat' if result < 0 else 'victory' if result > 0 else 'draw'
         self.out_file.write('# %s ends the match with %s (%.4f).\n' % (self, outcome, result))
         self.out_file.flush()
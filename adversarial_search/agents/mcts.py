@@ -1,28 +1,115 @@
+import random
+
 from .agent import Agent
+from .stats import ProfiledGame, SearchStats
+from ..utils import process_pool
 
 
 class MCTSAgent(Agent):
     """ An agent implementing flat MonteCarlo Tree Search.
+
+        If `workers` is greater than one, the search is root parallel: that many processes search
+        the same game state independently, each with its own random seed, and the statistics of
+        the moves are added up before choosing.
+
+        If `batch` is set and the game supports it (see `Game.batch`), all the playouts of each
+        move are played at once with NumPy, which allows much larger simulation counts.
     """
 
-    def __init__(self, name="MCTSAgent", simulation_count=3, random=None, heuristic=None):
+    def __init__(self, name="MCTSAgent", simulation_count=3, random=None, heuristic=None, workers=None, batch=True):
         Agent.__init__(self, name)
         self.simulationCount = simulation_count
         self.random = self.rand_gen(random)
         self.__heuristic__ = heuristic
+        self.workers = workers
+        self.batch = batch
 
     def _decision(self, moves, game):
+        if self.workers and self.workers > 1:
+            statistics = self._parallel_root_statistics(moves, game)
+        else:
+            statistics = self._root_statistics(moves, game)
+        return self._final_move(moves, statistics)
+
+    def _root_statistics(self, moves, game):
+        """ Returns a list with a tuple `(playouts, results_sum)` for each move.
+        """
         next_game_states = [[move, game.next(move), 0, 0] for move in moves]
-        for s in range(self.simulationCount):
+        self.search_stats.nodes += len(next_game_states)
+        if self.batch and self.simulationCount:
             for game_state in next_game_states:
+                batch = game_state[1].batch(self.simulationCount)
+                if batch is not None:
+                    game_state[2] = self.simulationCount
+                    game_state[3] = self.batch_simulation(batch)
+        scalar_game_states = [game_state for game_state in next_game_states if not game_state[2]]
+        for s in range(self.simulationCount):
+            for game_state in scalar_game_states:
                 game_state[2] = game_state[2] + 1
                 game_state[3] = game_state[3] + self.simulation(game_state[1])
-        max_val = max(game_state[3] for game_state in next_game_states)
-        return self.random.choice([move for [move, _, _, v] in next_game_states if v == max_val])
+        return [(playouts, results_sum) for [_, _, playouts, results_sum] in next_game_states]
+
+    def _parallel_root_statistics(self, moves, game):
+        """ Runs `_root_statistics` in the shared process pool, once per worker, and adds up the
+            results.
+        """
+        moves = list(moves)
+        pool = process_pool(self.workers)
+        futures = [pool.submit(_worker_root_statistics, self, moves, game, self.random.getrandbits(64))
+                   for _ in range(self.workers)]
+        statistics = [(0, 0)] * len(moves)
+        for future in futures:
+            worker_statistics, worker_search_stats = future.result()
+            statistics = [(p1 + p2, s1 + s2) for ((p1, s1), (p2, s2)) in zip(statistics, worker_statistics)]
+            self.search_stats.add(worker_search_stats)
+        return statistics
+
+    def _final_move(self, moves, statistics):
+        """ Chooses the move with the best results sum.
+        """
+        max_val = max(results_sum for (_, results_sum) in statistics)
+        return self.random.choice([move for move, (_, v) in zip(moves, statistics) if v == max_val])
 
     def simulation(self, game):
+        return self.playout(game, 1)[self.player_type]
+
+    def batch_simulation(self, batch):
+        """ Plays all game states of the batch randomly, returning the sum of their results.
+        """
+        results = batch.playouts(self.random.getrandbits(64))
+        stats = self.search_stats
+        stats.nodes += int(batch.plies.sum())
+        stats.leaves += batch.count
+        stats.depth(1 + int(batch.plies.max()))
+        return float(results[:, batch.players.index(self.player_type)].sum())
+
+    def playout(self, game, depth=0):
+        """ Plays the game randomly until it ends, returning the results for all players. The depth
+            of the given game state below the decision's one is only used for statistics. If the game
+            supports it (see `Game.apply`), moves are applied in place to a copy of the game state.
+        """
+        stats = self.search_stats
+        in_place = game.supports_apply()
+        if in_place:
+            game = game.copy()
         results = game.results()
         while not results:
-            game = game.next(self.random.choice(game.moves()))
+            move = self.random.choice(game.moves())
+            game = game.apply(move) if in_place else game.next(move)
+            depth += 1
+            stats.nodes += 1
             results = game.results()
-        return results[self.player_type]
+        stats.leaves += 1
+        stats.depth(depth)
+        return results
+
+
+def _worker_root_statistics(agent, moves, game, seed):
+    """ Entry point of the worker processes of root parallel searches.
+    """
+    agent.random = random.Random(seed)
+    agent.workers = None
+    agent.search_stats = SearchStats()
+    if isinstance(game, ProfiledGame):  # Times are measured in the worker's search stats.
+        game = ProfiledGame(game.game, agent.search_stats)
+    return agent._root_statistics(moves, game), agent.search_stats
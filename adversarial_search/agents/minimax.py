@@ -1,41 +1,195 @@
+import itertools
+import time
+
 from .agent import Agent
+from .transposition import COMPLETE, EXACT
+
+
+class SearchTimeout(Exception):
+    """ Raised inside a search when its time limit has run out.
+    """
+    pass
 
 
 class MiniMaxAgent(Agent):
     """ An agent implementing simple heuristic MiniMax.
     """
+    TIME_LEFT_SHARE = 0.5  # Share of the time left for a move that iterative deepening may use.
 
-    def __init__(self, name="MiniMaxAgent", horizon=3, random=None, heuristic=None):
+    def __init__(self, name="MiniMaxAgent", horizon=3, random=None, heuristic=None, transposition_table=None,
+                 time_limit=None, max_depth=None):
         Agent.__init__(self, name)
         self.horizon = horizon
         # An instance of random.Random or equivalent is expected, else an 
         # integer seed or None to create a random.Random.
         self.random = self.rand_gen(random)
         self.__heuristic__ = heuristic
+        # An optional TranspositionTable, used to avoid searching transposed game states again.
+        self.transposition_table = transposition_table
+        # If a time limit (in seconds) is given, the horizon is ignored and the search deepens
+        # iteratively until the time runs out or max_depth (if any) is reached. In timed matches
+        # it is no more than TIME_LEFT_SHARE of the time left for the move.
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self._deadline = None
+        self._horizon_reached = False
+        # Set during decisions if moves are applied in place to a copy of the game state.
+        self._in_place = False
+
+    def match_begins(self, player, game):
+        Agent.match_begins(self, player, game)
+        if self.transposition_table is not None:  # Stored values depend on the player type.
+            self.transposition_table.clear()
 
     def _decision(self, moves, game):
-        next_game_states = [(move, self._minimax(game.next(move), 1)) for move in moves]
+        """ If the game supports it (see `Game.apply`), the search applies and undoes moves on a
+            copy of the game state instead of creating a new game state for each move.
+        """
+        self._in_place = game.supports_apply()
+        if self._in_place:
+            game = game.copy()
+        try:
+            if self.time_limit is not None:
+                return self._iterative_deepening(moves, game)
+            return self._root_search(moves, game)[1]
+        finally:
+            self._in_place = False
+
+    def _next(self, game, move):
+        """ Returns the game state after the given move. If moves are applied in place, it is the
+            same game state, and `_undo` must be called once it has been searched.
+        """
+        return game.apply(move) if self._in_place else game.next(move)
+
+    def _undo(self, game):
+        if self._in_place:
+            game.undo()
+
+    def _root_search(self, moves, game):
+        """ Searches all the given moves. Returns a list of tuples `(move, value)` and the chosen
+            move, randomly selected among the ones with maximum value.
+        """
+        next_game_states = []
+        for move in moves:
+            next_game_states.append((move, self._minimax(self._next(game, move), 1)))
+            self._undo(game)
         max_val = max([val for (_, val) in next_game_states])
-        return self.random.choice([move for (move, val) in next_game_states if val == max_val])
+        return next_game_states, self.random.choice([move for (move, val) in next_game_states if val == max_val])
+
+    def _iterative_deepening(self, moves, game):
+        """ Searches with horizons 1, 2, 3 and so on, until the time limit runs out or max_depth
+            is reached. Returns the best move of the deepest completed search. Each iteration
+            searches the moves in the order given by the values of the previous one. A
+            transposition table, if available, keeps the best moves found in inner nodes as well.
+        """
+        horizon = self.horizon
+        depths = itertools.count(1) if self.max_depth is None else range(1, self.max_depth + 1)
+        choice = None
+        moves = list(moves)
+        time_limit = self.time_limit
+        if self.time_left is not None:
+            time_limit = min(time_limit, self.time_left * self.TIME_LEFT_SHARE)
+        self._deadline = time.perf_counter() + time_limit
+        try:
+            for depth in depths:
+                self.horizon = depth
+                self._horizon_reached = False
+                next_game_states, choice = self._root_search(moves, game)
+                next_game_states.sort(key=lambda move_val: move_val[1], reverse=True)
+                moves = [move for (move, _) in next_game_states]
+                if not self._horizon_reached:  # The whole game tree has been searched.
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.horizon = horizon
+            self._deadline = None
+        return self.random.choice(moves) if choice is None else choice
 
     def terminal_value(self, game, depth):
         """ Returns a result if node is terminal or maximum depth has been reached; else returns 
-            None.
+            None. Raises SearchTimeout if the search's deadline has passed.
         """
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+        stats = self.search_stats
+        stats.nodes += 1
+        stats.depth(depth)
         results = game.results()
         if results:
+            stats.leaves += 1
             return results[self.player_type]
         if depth >= self.horizon:
+            self._horizon_reached = True
+            stats.leaves += 1
+            stats.heuristic_calls += 1
+            if self.profile:
+                start = time.perf_counter()
+                value = self.heuristic(game, depth)
+                stats.times['heuristic'] += time.perf_counter() - start
+                return value
             return self.heuristic(game, depth)
         return None
 
     def _minimax(self, game, depth):
         result = self.terminal_value(game, depth)
         if result is None:
-            result = (max if game.active_player() == self.player_type else min)(
-                [self._minimax(game.next(move), depth + 1) for move in game.moves()])
+            table = self.transposition_table
+            if table is None:
+                maximize = game.active_player() == self.player_type
+                result = (max if maximize else min)(self._children_values(game, game.moves(), depth))
+            else:
+                result = self._cached_minimax(game, depth, table)
+        return result
+
+    def _cached_minimax(self, game, depth, table):
+        """ MiniMax step for a non terminal game state, using the transposition table.
+        """
+        draft = self.horizon - depth
+        entry = table.probe(game)
+        if entry is not None:
+            self.search_stats.cache_hits += 1
+            if entry.flag == EXACT and entry.depth >= draft:
+                self._table_hit(entry)
+                return entry.value
+        reached = self._start_subtree()
+        maximize = game.active_player() == self.player_type
+        moves = game.moves()
+        values = self._children_values(game, moves, depth)
+        result = (max if maximize else min)(values)
+        table.store(game, result, self._subtree_draft(reached, draft), EXACT, moves[values.index(result)])
         return result
 
+    def _table_hit(self, entry):
+        """ Called when a transposition table entry is used instead of searching the game state.
+            Unless it is COMPLETE, the search it comes from reached the horizon, so iterative
+            deepening must go on.
+        """
+        if entry.depth != COMPLETE:
+            self._horizon_reached = True
+
+    def _start_subtree(self):
+        """ Starts to track if the search below a game state reaches the horizon. Returns what
+            `_subtree_draft` needs to restore the tracking of the enclosing search.
+        """
+        reached, self._horizon_reached = self._horizon_reached, False
+        return reached
+
+    def _subtree_draft(self, reached, draft):
+        """ Returns the draft to store for the game state searched since `_start_subtree`: COMPLETE
+            if the search below it never reached the horizon.
+        """
+        complete = not self._horizon_reached
+        self._horizon_reached = self._horizon_reached or reached
+        return COMPLETE if complete else draft
+
+    def _children_values(self, game, moves, depth):
+        values = []
+        for move in moves:
+            values.append(self._minimax(self._next(game, move), depth + 1))
+            self._undo(game)
+        return values
+
     def heuristic(self, game, depth):
         """ This method implements the heuristic for the minimax algorithm. If no implementation is
             provided it returns a random value in [-0.5,+0.5). This default behaviour usually should
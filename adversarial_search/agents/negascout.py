@@ -0,0 +1,118 @@
+from .alphabeta import AlphaBetaAgent, INFINITE
+from .transposition import EXACT, LOWER, UPPER
+from ..utils import next_float
+
+
+class NegaScoutAgent(AlphaBetaAgent):
+    """ An agent implementing Principal Variation Search (NegaScout), in negamax form.
+        <https://en.wikipedia.org/wiki/Principal_variation_search>
+
+        The first move of every node is searched with the full window. The others are searched with
+        a null window, just to prove they are not better, and searched again with the full window
+        when they are (fail-high). It pays off when the first move is usually the best one, so
+        move ordering and transposition tables (see AlphaBetaAgent) help it the most.
+
+        If `fail_soft` is set, values outside the window are returned as found, which are tighter
+        bounds than the window limits returned by fail-hard searches.
+    """
+
+    def __init__(self, name="NegaScoutAgent", horizon=3, random=None, heuristic=None, transposition_table=None,
+                 time_limit=None, max_depth=None, move_ordering=None, fail_soft=True):
+        AlphaBetaAgent.__init__(self, name, horizon, random, heuristic, transposition_table, time_limit, max_depth,
+                                move_ordering)
+        self.fail_soft = fail_soft
+
+    def _root_search(self, moves, game):
+        """ The root moves are searched like the moves of any other node, in order if move ordering
+            is enabled, after shuffling them so ties are broken randomly. Values of moves that are
+            not chosen are upper bounds.
+        """
+        moves = list(moves)
+        self.random.shuffle(moves)
+        if self.move_ordering:
+            moves = self._order_moves(game, moves, 0)
+        alpha = -INFINITE
+        best_move = None
+        next_game_states = []
+        for index, move in enumerate(moves):
+            value = self._scout(self._next(game, move), 1, alpha, INFINITE, 1, index == 0)
+            self._undo(game)
+            next_game_states.append((move, value))
+            if best_move is None or alpha < value:
+                alpha = value
+                best_move = move
+        for ordering in self.move_ordering:
+            ordering.best(self, game, best_move, 0)
+        return next_game_states, best_move
+
+    def _minimax(self, game, depth, alpha=-INFINITE, beta=INFINITE):
+        return self._negascout(game, depth, alpha, beta, 1)
+
+    def _scout(self, game, depth, alpha, beta, sign, principal):
+        """ Searches a child with the full window if it is in the principal variation, else with a
+            null window first, searching again if it turns out to be better than alpha.
+        """
+        if principal:
+            return self._negascout(game, depth, alpha, beta, sign)
+        value = self._negascout(game, depth, alpha, next_float(alpha), sign)
+        if alpha < value < beta:  # Fail-high.
+            value = self._negascout(game, depth, value if self.fail_soft else alpha, beta, sign)
+        return value
+
+    def _negascout(self, game, depth, alpha, beta, sign):
+        """ Returns the value of the game state for the agent (sign 1) or its opponent (sign -1),
+            with alpha and beta for the same side.
+        """
+        result = self.terminal_value(game, depth)
+        if result is not None:
+            return sign * result
+        if (1 if game.active_player() == self.player_type else -1) == sign:
+            return self._negamax(game, depth, alpha, beta, sign)
+        return -self._negamax(game, depth, -beta, -alpha, -sign)
+
+    def _negamax(self, game, depth, alpha, beta, sign):
+        """ Searches the moves of a non terminal game state, whose active player has the given sign.
+            Values stored in the transposition table are for the active player as well.
+        """
+        moves = game.moves()
+        ordered_moves = self._order_moves(game, moves, depth) if self.move_ordering else moves
+        table = self.transposition_table
+        if table is not None:
+            entry = table.probe(game)
+            if entry is not None:
+                self.search_stats.cache_hits += 1
+                if entry.depth >= self.horizon - depth:
+                    if entry.flag == EXACT:
+                        self._table_hit(entry)
+                        return entry.value
+                    if entry.flag == LOWER and entry.value >= beta:
+                        self._table_hit(entry)
+                        return entry.value if self.fail_soft else beta
+                    if entry.flag == UPPER and entry.value <= alpha:
+                        self._table_hit(entry)
+                        return entry.value if self.fail_soft else alpha
+                if entry.move in ordered_moves:  # The best move found before is tried first.
+                    ordered_moves = [entry.move] + [move for move in ordered_moves if move != entry.move]
+            reached = self._start_subtree()
+        alpha_0 = alpha
+        best, best_move = -INFINITE, None
+        for index, move in enumerate(ordered_moves):
+            value = self._scout(self._next(game, move), depth + 1, alpha, beta, sign, index == 0)
+            self._undo(game)
+            if best < value:
+                best = value
+                if alpha < value:
+                    alpha = value
+                    best_move = move
+                    if beta <= alpha:
+                        self._cutoff(game, move, depth, index)
+                        break
+        if not self.fail_soft:
+            best = min(max(best, alpha_0), beta)
+        if best_move is not None:
+            for ordering in self.move_ordering:
+                ordering.best(self, game, best_move, depth)
+        if table is not None:
+            flag = UPPER if best <= alpha_0 else LOWER if best >= beta else EXACT
+            table.store(game, best, self._subtree_draft(reached, self.horizon - depth), flag, best_move)
+        return best
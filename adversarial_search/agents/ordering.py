@@ -0,0 +1,123 @@
+class MoveOrdering(object):
+    """ Base class for move ordering strategies, used by AlphaBetaAgent to search the moves more
+        likely to cause a cutoff first. The default implementation sorts moves by their score,
+        highest first, keeping the previous order between moves with the same score.
+    """
+
+    def order(self, agent, game, moves, depth):
+        """ Returns the given moves in the order they should be searched.
+        """
+        return sorted(moves, key=lambda move: self.score(agent, game, move, depth), reverse=True)
+
+    def score(self, agent, game, move, depth):
+        """ Returns a number telling how promising the move is. Default is 0 for every move.
+        """
+        return 0
+
+    def cutoff(self, agent, game, move, depth):
+        """ Tells the strategy the move caused a cutoff in the given game state.
+        """
+        pass
+
+    def best(self, agent, game, move, depth):
+        """ Tells the strategy the move was the best found in the given game state.
+        """
+        pass
+
+    def clear(self):
+        """ Forgets all gathered information. Called when a new match begins.
+        """
+        pass
+
+
+class GameMoveOrdering(MoveOrdering):
+    """ Uses the `order_moves` method of the game.
+    """
+
+    def order(self, agent, game, moves, depth):
+        return game.order_moves(moves)
+
+
+class PVMoveOrdering(MoveOrdering):
+    """ Puts first the best move found in the previous search of the same game state. This way the
+        principal variation of the previous iteration of an iterative deepening search is explored
+        first. Best moves are kept for at most max_size game states.
+    """
+
+    def __init__(self, max_size=2 ** 16, key=hash):
+        self.max_size = max_size
+        self.key = key
+        self.best_moves = {}
+
+    def score(self, agent, game, move, depth):
+        return 1 if self.best_moves.get(self.key(game)) == move else 0
+
+    def order(self, agent, game, moves, depth):
+        best_move = self.best_moves.get(self.key(game))
+        if best_move is None or best_move not in moves:
+            return moves
+        return [best_move] + [move for move in moves if move != best_move]
+
+    def best(self, agent, game, move, depth):
+        key = self.key(game)
+        if key in self.best_moves or len(self.best_moves) < self.max_size:
+            self.best_moves[key] = move
+
+    def clear(self):
+        self.best_moves.clear()
+
+
+class KillerMoveOrdering(MoveOrdering):
+    """ Killer heuristic: moves that caused a cutoff in other game states at the same depth are
+        tried first. The latest `slots` killer moves are kept for each depth.
+    """
+
+    def __init__(self, slots=2):
+        self.slots = slots
+        self.killers = {}
+
+    def score(self, agent, game, move, depth):
+        killers = self.killers.get(depth, ())
+        return self.slots - killers.index(move) if move in killers else 0
+
+    def cutoff(self, agent, game, move, depth):
+        killers = self.killers.setdefault(depth, [])
+        if move in killers:
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[self.slots:]
+
+    def clear(self):
+        self.killers.clear()
+
+
+class HistoryMoveOrdering(MoveOrdering):
+    """ History heuristic: each move has a score for each player, increased every time the move
+        causes a cutoff by the square of the remaining search depth.
+    """
+
+    def __init__(self):
+        self.history = {}
+
+    def score(self, agent, game, move, depth):
+        return self.history.get((game.active_player(), move), 0)
+
+    def order(self, agent, game, moves, depth):
+        player = game.active_player()
+        history = self.history
+        return sorted(moves, key=lambda move: history.get((player, move), 0), reverse=True)
+
+    def cutoff(self, agent, game, move, depth):
+        key = (game.active_player(), move)
+        draft = agent.horizon - depth
+        self.history[key] = self.history.get(key, 0) + draft * draft
+
+    def clear(self):
+        self.history.clear()
+
+
+def default_move_ordering():
+    """ Returns a list with the usual move ordering strategies, by priority: principal variation,
+        killer moves, history heuristic and finally the game's own ordering.
+    """
+    return [PVMoveOrdering(), KillerMoveOrdering(), HistoryMoveOrdering(), GameMoveOrdering()]
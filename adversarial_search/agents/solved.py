@@ -0,0 +1,24 @@
+from .agent import Agent
+from ..tables import GameTable
+
+
+class SolvedAgent(Agent):
+    """ An agent that plays perfectly, looking up its moves in a table written by the solver (see
+        `adversarial_search.solver`). The table may be given as a GameTable or the path of its
+        file, which is memory mapped. Game states missing in the table are played randomly.
+    """
+
+    def __init__(self, table, name='SolvedAgent', random=None):
+        Agent.__init__(self, name)
+        self.table = GameTable(table) if isinstance(table, str) else table
+        # An instance of random.Random or equivalent is expected, else an
+        # integer seed or None to create a random.Random.
+        self.random = self.rand_gen(random)
+
+    def _decision(self, moves, game):
+        entry = self.table.get(game.canonical_key())
+        if entry is not None and entry.move >= 0:
+            move = game.original_move(entry.move)
+            if move in moves:
+                return move
+        return self.random.choice(moves)
@@ -0,0 +1,146 @@
+import time
+
+
+class SearchStats(object):
+    """ Statistics of the searches made by an agent, either for one decision or accumulated over
+        many. Counters are:
+
+        - decisions: number of moves chosen.
+        - nodes: game states visited.
+        - leaves: game states evaluated, either by their results or by the heuristic.
+        - heuristic_calls: calls to the heuristic.
+        - cutoffs: alpha-beta cutoffs.
+        - first_move_cutoffs: alpha-beta cutoffs caused by the first move searched.
+        - cache_hits: transposition table entries found.
+        - max_depth: deepest game state visited, relative to the decision's game state.
+
+        Times are in seconds. The total is the wall time of all decisions. The time spent in the
+        game's `moves`, `next` and `results` methods and in the heuristic is only measured if the
+        agent is profiling (see `Agent.profile`).
+    """
+    COUNTERS = ('decisions', 'nodes', 'leaves', 'heuristic_calls', 'cutoffs', 'first_move_cutoffs',
+                'cache_hits')
+    TIMERS = ('moves', 'next', 'results', 'heuristic')
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        for counter in self.COUNTERS:
+            setattr(self, counter, 0)
+        self.max_depth = 0
+        self.total_time = 0.0
+        self.times = dict.fromkeys(self.TIMERS, 0.0)
+
+    def depth(self, depth):
+        """ Registers a game state was visited at the given depth.
+        """
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    @property
+    def effective_branching_factor(self):
+        """ The branching factor of a uniform tree with the mean nodes per decision and the maximum
+            depth reached.
+        """
+        if not self.decisions or not self.max_depth:
+            return 0.0
+        return (self.nodes / float(self.decisions)) ** (1.0 / self.max_depth)
+
+    def add(self, other):
+        """ Accumulates the statistics of other into this object.
+        """
+        for counter in self.COUNTERS:
+            setattr(self, counter, getattr(self, counter) + getattr(other, counter))
+        self.depth(other.max_depth)
+        self.total_time += other.total_time
+        for timer in self.TIMERS:
+            self.times[timer] += other.times[timer]
+        return self
+
+    def as_dict(self):
+        result = {counter: getattr(self, counter) for counter in self.COUNTERS}
+        result.update(max_depth=self.max_depth, effective_branching_factor=self.effective_branching_factor,
+                      total_time=self.total_time)
+        result.update(('%s_time' % timer, value) for timer, value in self.times.items())
+        return result
+
+    def __str__(self):
+        return ', '.join('%s=%s' % item for item in sorted(self.as_dict().items()))
+
+
+class ProfiledGame(object):
+    """ A proxy for game states that measures the time spent in `moves`, `next` and `results`,
+        accumulating it in the given SearchStats. Applying and undoing moves counts as `next`.
+        States returned by `next` and `copy` are proxies too. Any other attribute is taken from the
+        proxied game state. Proxies can be pickled, e.g. to be searched in other processes.
+    """
+    __slots__ = ('game', 'stats')
+
+    def __init__(self, game, stats):
+        self.game = game
+        self.stats = stats
+
+    def moves(self):
+        start = time.perf_counter()
+        result = self.game.moves()
+        self.stats.times['moves'] += time.perf_counter() - start
+        return result
+
+    def results(self):
+        start = time.perf_counter()
+        result = self.game.results()
+        self.stats.times['results'] += time.perf_counter() - start
+        return result
+
+    def next(self, move):
+        start = time.perf_counter()
+        result = self.game.next(move)
+        self.stats.times['next'] += time.perf_counter() - start
+        return None if result is None else ProfiledGame(result, self.stats)
+
+    def apply(self, move):
+        start = time.perf_counter()
+        self.game.apply(move)
+        self.stats.times['next'] += time.perf_counter() - start
+        return self
+
+    def undo(self):
+        start = time.perf_counter()
+        self.game.undo()
+        self.stats.times['next'] += time.perf_counter() - start
+
+    def copy(self):
+        return ProfiledGame(self.game.copy(), self.stats)
+
+    def supports_apply(self):
+        return self.game.supports_apply()
+
+    def active_player(self):
+        return self.game.active_player()
+
+    def order_moves(self, moves):
+        return self.game.order_moves(moves)
+
+    def key(self):
+        return self.game.key()
+
+    def __getattr__(self, name):
+        if name in ProfiledGame.__slots__ or name.startswith('__'):  # Not set yet, e.g. while unpickling.
+            raise AttributeError(name)
+        return getattr(self.game, name)
+
+    def __getstate__(self):
+        return (self.game, self.stats)
+
+    def __setstate__(self, state):
+        self.game, self.stats = state
+
+    def __hash__(self):
+        return hash(self.game)
+
+    def __str__(self):
+        return str(self.game)
+
+    def __repr__(self):
+        return repr(self.game)
@@ -0,0 +1,112 @@
+from collections import namedtuple
+
+EXACT, LOWER, UPPER = 0, 1, 2
+COMPLETE = float('inf')  # Draft of entries whose search reached the end of the game in every line.
+
+TTEntry = namedtuple('TTEntry', 'key value depth flag move')
+
+
+def always_replace(stored, entry):
+    """ Replacement scheme that always overwrites the stored entry.
+    """
+    return True
+
+
+def depth_preferred(stored, entry):
+    """ Replacement scheme that keeps the stored entry if it was searched deeper than the new one,
+        unless both belong to the same position.
+    """
+    return stored.key == entry.key or entry.depth >= stored.depth
+
+
+def canonical_key(game):
+    """ Key for tables shared by symmetric game states (see `Game.canonical_key`). The active player
+        is part of it, since symmetries may swap the players and stored values are not symmetric.
+    """
+    return hash((game.canonical_key(), game.active_player()))
+
+
+REPLACEMENT_SCHEMES = {
+    'always': always_replace,
+    'depth': depth_preferred,
+}
+
+
+class TranspositionTable(object):
+    """ A size-bounded transposition table for search agents. Entries are stored in a fixed number
+        of slots indexed by the key of the game state. When two states compete for the same slot,
+        the replacement scheme decides which one stays. It may be given by name (see
+        `REPLACEMENT_SCHEMES`) or as a function `(stored_entry, new_entry) -> bool`.
+
+        Each entry holds the value found for the state, the depth searched below it (draft), a flag
+        telling if the value is EXACT, a LOWER bound or an UPPER bound, and the best move found.
+        The draft is COMPLETE if no line of the search was cut by the horizon, so the value holds
+        for searches of any depth.
+
+        If canonical is true, symmetric game states share their entries, and moves are stored as
+        their codes (see `Game.canonical_move`) and translated back for the probed game state.
+    """
+
+    def __init__(self, size=2 ** 16, replacement='depth', key=hash, canonical=False):
+        if size < 1:
+            raise ValueError('Transposition table size must be positive, not %r.' % (size,))
+        self.size = size
+        self.replacement = REPLACEMENT_SCHEMES[replacement] if isinstance(replacement, str) else replacement
+        self.canonical = canonical
+        self.key = canonical_key if canonical and key is hash else key
+        self._slots = [None] * size
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def clear(self):
+        """ Removes all entries, keeping the counters.
+        """
+        self._slots = [None] * self.size
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def probe(self, game):
+        """ Returns the entry stored for the given game state, or None if there is none.
+        """
+        key = self.key(game)
+        entry = self._slots[key % self.size]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            if self.canonical and entry.move is not None:
+                return entry._replace(move=game.original_move(entry.move))
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, game, value, depth, flag=EXACT, move=None):
+        """ Stores the search result for the given game state, if the replacement scheme allows it.
+            Returns True if the entry was stored.
+        """
+        key = self.key(game)
+        index = key % self.size
+        if self.canonical and move is not None:
+            move = game.canonical_move(move)
+        entry = TTEntry(key, value, depth, flag, move)
+        stored = self._slots[index]
+        if stored is not None:
+            if not self.replacement(stored, entry):
+                return False
+            if stored.key != key:
+                self.evictions += 1
+        self._slots[index] = entry
+        self.stores += 1
+        return True
+
+    def counters(self):
+        """ Returns a dict with the usage counters of the table.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'stores': self.stores, 'evictions': self.evictions}
+
+    def __len__(self):
+        return sum(1 for entry in self._slots if entry is not None)
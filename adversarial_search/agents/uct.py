@@ -0,0 +1,149 @@
+from math import inf, log, sqrt
+
+from .mcts import MCTSAgent
+
+
+class UCTNode(object):
+    """ A node of the UCT search tree. Its total is the sum of the results of all playouts that
+        went through the node, for the player that made the move leading to it.
+    """
+    __slots__ = ('game', 'move', 'player', 'parent', 'children', 'untried', 'visits', 'total')
+
+    def __init__(self, game, move=None, player=None, parent=None, untried=None):
+        self.game = game
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children = []
+        self.untried = list(game.moves() or ()) if untried is None else list(untried)
+        self.visits = 0
+        self.total = 0.0
+
+    def mean(self):
+        return self.total / self.visits if self.visits else 0.0
+
+    def child(self, move):
+        """ Returns the child for the given move, or None if it has not been expanded.
+        """
+        for child in self.children:
+            if child.move == move:
+                return child
+        return None
+
+
+class UCTAgent(MCTSAgent):
+    """ An agent implementing Monte Carlo Tree Search with the UCT (Upper Confidence bounds applied
+        to Trees) selection policy.
+        <https://en.wikipedia.org/wiki/Monte_Carlo_tree_search>
+
+        Each decision runs `simulation_count` iterations for each available move, so the playout
+        budget matches the one of MCTSAgent. The expansion policy may be 'single' (one new node
+        per iteration) or 'full' (all children of a node at once). The final move is the most
+        visited child ('robust') or the one with the best mean result ('max'). If `reuse_tree` is
+        set, the subtree under the moves actually played is kept for the following decisions.
+        Root parallel searches (see MCTSAgent) build independent trees that are not kept.
+    """
+
+    def __init__(self, name="UCTAgent", simulation_count=3, random=None, heuristic=None, exploration=sqrt(2),
+                 expansion='single', final_selection='robust', reuse_tree=True, workers=None):
+        MCTSAgent.__init__(self, name, simulation_count, random, heuristic, workers)
+        if expansion not in ('single', 'full'):
+            raise ValueError('Unknown expansion policy %r.' % (expansion,))
+        if final_selection not in ('robust', 'max'):
+            raise ValueError('Unknown final selection %r.' % (final_selection,))
+        self.exploration = exploration
+        self.expansion = expansion
+        self.final_selection = final_selection
+        self.reuse_tree = reuse_tree
+        self.root = None
+
+    def match_begins(self, player, game):
+        MCTSAgent.match_begins(self, player, game)
+        self.root = None
+
+    def match_moves(self, before, move, after):
+        """ Moves the root of the tree to the node of the move played, discarding the rest.
+        """
+        root = self.root
+        self.root = None
+        if self.reuse_tree and root is not None and self._same_state(root.game, before):
+            child = root.child(move)
+            if child is not None:
+                child.parent = None
+                self.root = child
+
+    def match_ends(self, game, results=None):
+        self.root = None
+
+    @staticmethod
+    def _same_state(game1, game2):
+        return game1 is game2 or repr(game1) == repr(game2)
+
+    def _root_statistics(self, moves, game):
+        """ Runs the UCT iterations from the root for the given game state, reusing the retained
+            tree if possible. Returns a list with a tuple `(visits, results_sum)` for each move.
+        """
+        root = self.root
+        if root is None or not self._same_state(root.game, game):
+            root = UCTNode(game, untried=moves)
+        self.root = root
+        for _ in range(self.simulationCount * len(moves)):
+            node, depth = root, 0
+            while not node.untried and node.children:  # Selection.
+                node = self._select_child(node)
+                depth += 1
+            if node.untried:  # Expansion.
+                node = self._expand(node)
+                depth += 1
+            results = self.playout(node.game, depth)
+            while node is not None:  # Backpropagation.
+                node.visits += 1
+                if node.player is not None:
+                    node.total += results[node.player]
+                node = node.parent
+        children = [root.child(move) for move in moves]
+        return [(0, 0.0) if child is None else (child.visits, child.total) for child in children]
+
+    def _select_child(self, node):
+        """ Returns the child with the highest upper confidence bound. Unvisited children go first.
+        """
+        log_visits = log(node.visits)
+        best_child, best_ucb = None, None
+        for child in node.children:
+            if not child.visits:
+                return child
+            ucb = child.total / child.visits + self.exploration * sqrt(log_visits / child.visits)
+            if best_ucb is None or ucb > best_ucb:
+                best_child, best_ucb = child, ucb
+        return best_child
+
+    def _expand(self, node):
+        """ Adds children to the node according to the expansion policy, and returns one of them.
+        """
+        player = node.game.active_player()
+        if self.expansion == 'full':
+            self.random.shuffle(node.untried)
+            moves, node.untried = node.untried, []
+        else:
+            moves = [node.untried.pop(self.random.randrange(len(node.untried)))]
+        for move in moves:
+            node.children.append(UCTNode(node.game.next(move), move, player, node))
+        self.search_stats.nodes += len(moves)
+        return node.children[-1]
+
+    def _final_move(self, moves, statistics):
+        """ Chooses the most visited move ('robust') or the one with the best mean ('max').
+        """
+        if self.final_selection == 'robust':
+            values = [visits for (visits, _) in statistics]
+        else:
+            values = [total / visits if visits else -inf for (visits, total) in statistics]
+        best = max(values)
+        return self.random.choice([move for move, value in zip(moves, values) if value == best])
+
+    def __getstate__(self):
+        """ The tree is not pickled, so root parallel workers start their own.
+        """
+        state = dict(self.__dict__)
+        state['root'] = None
+        return state
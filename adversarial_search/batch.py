@@ -0,0 +1,101 @@
+""" Batches of game states stored as NumPy arrays, so many random playouts can be played at once
+    with vectorized operations. NumPy is optional: without it `NUMPY_AVAILABLE` is False, games
+    return None from `Game.batch` and Monte Carlo agents play their playouts one by one.
+"""
+from abc import ABC, abstractmethod
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional.
+    numpy = None
+
+NUMPY_AVAILABLE = numpy is not None
+
+
+class BatchGame(ABC):
+    """ Base class for batches of game states of the same game, usually created with `Game.batch`.
+        Moves are identified by integers from 0 to the number of moves of the game minus one. The
+        `plies` array counts the moves played in each game state of the batch.
+    """
+
+    def __init__(self, players, count):
+        if numpy is None:
+            raise ImportError('NumPy is required for batches of game states.')
+        self.players = players
+        self.count = count
+        self.plies = numpy.zeros(count, dtype=numpy.int32)
+
+    @abstractmethod
+    def legal_moves(self):
+        """ Returns a boolean array with a row for each game state and a column for each move,
+            telling which moves are valid. Rows of finished game states are all False.
+        """
+        pass
+
+    @abstractmethod
+    def play(self, moves, rows):
+        """ Applies the given moves, an integer array with a move for each game state, to the game
+            states selected by rows, a boolean array. They must be counted in `plies`.
+        """
+        pass
+
+    @abstractmethod
+    def results(self):
+        """ Returns an array with a row for each game state and a column for each player, with the
+            results of finished game states (see `Game.results`). Rows of the other game states
+            are undefined.
+        """
+        pass
+
+    def playouts(self, seed=None):
+        """ Plays all game states randomly until they end, and returns their results.
+        """
+        rng = numpy.random.default_rng(seed)
+        legal = self.legal_moves()
+        active = legal.any(axis=1)
+        while active.any():
+            moves = numpy.where(legal, rng.random(legal.shape), -1.0).argmax(axis=1)
+            self.play(moves, active)
+            legal = self.legal_moves()
+            active = legal.any(axis=1)
+        return self.results()
+
+
+class PlacementBatchGame(BatchGame):
+    """ Batch for two player games where each move places a mark in an empty square of the board,
+        like TicTacToe or Cuanteti. The boards are stored as an array with a row for each game
+        state, where squares are 0 if empty, 1 for the first player's marks and 2 for the other
+        player's. The game state must have the `board` and `enabled` attributes, with marks in the
+        board being the initials of the players. Subclasses must implement `_values`.
+    """
+
+    def __init__(self, game, count):
+        BatchGame.__init__(self, game.players, count)
+        codes = {player[0]: index + 1 for index, player in enumerate(game.players)}
+        board = numpy.array([codes.get(square, 0) for square in game.board], dtype=numpy.int8)
+        self.boards = numpy.tile(board, (count, 1))
+        self.enabled = numpy.full(count, game.enabled, dtype=numpy.int8)
+        self._update()
+
+    def _update(self):
+        self.values, self.finished = self._values(self.boards)
+
+    @abstractmethod
+    def _values(self, boards):
+        """ Returns the results of the first player for the given boards, and a boolean array
+            telling which game states are finished.
+        """
+        pass
+
+    def legal_moves(self):
+        return (self.boards == 0) & ~self.finished[:, None]
+
+    def play(self, moves, rows):
+        rows = numpy.flatnonzero(rows)
+        self.boards[rows, moves[rows]] = self.enabled[rows] + 1
+        self.enabled[rows] ^= 1
+        self.plies[rows] += 1
+        self._update()
+
+    def results(self):
+        return numpy.stack([self.values, -self.values], axis=1)
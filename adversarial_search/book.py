@@ -0,0 +1,68 @@
+""" Opening books: the moves chosen by deep searches for all game states in the first plies of a
+    game, computed offline and stored in a table file (see `tables.GameTable`). Agents wrapped in a
+    `agents.BookAgent` look them up instead of searching. Build a book from the command line with:
+
+        python -m adversarial_search.book module:GameClass output_file --plies 3 --horizon 6
+            [--agent module:AgentClass] [constructor arguments]
+
+    The agent (AlphaBetaAgent by default) is called with the horizon and a fixed random seed.
+    Constructor arguments of the game are Python literals.
+"""
+import argparse
+import sys
+
+from .solver import literal, load_class, load_game
+from .tables import GameTable
+
+
+def build_book(game, agent, plies, progress=None):
+    """ Returns the book entries for all game states reachable in less than the given number of
+        plies from the given one, as a dict `{key: (value, move, depth)}`, keyed by
+        `Game.canonical_key`. The move is the code of the agent's choice (see
+        `Game.canonical_move`) and the depth is the ply of the game state. Values
+        are not searched for, so they are NaN. If given, progress is called with the ply and the
+        number of game states for every ply.
+    """
+    entries = {}
+    states = [game]
+    for ply in range(plies):
+        if progress is not None:
+            progress(ply, len(states))
+        next_states = {}
+        for state in states:
+            moves = state.moves()
+            key = state.canonical_key()
+            if not moves or key in entries:
+                continue
+            agent.match_begins(state.active_player(), state)
+            move = agent.select_move(state)
+            agent.match_ends(state)
+            entries[key] = (float('nan'), state.canonical_move(move), ply)
+            for move in moves:
+                next_state = state.next(move)
+                next_states.setdefault(next_state.canonical_key(), next_state)
+        states = list(next_states.values())
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('game', help='game class, as module:GameClass')
+    parser.add_argument('output', help='book file to write')
+    parser.add_argument('args', nargs='*', type=literal, help='arguments for the game class')
+    parser.add_argument('--plies', type=int, default=2, help='plies covered by the book (default 2)')
+    parser.add_argument('--horizon', type=int, default=4, help='horizon of the searches (default 4)')
+    parser.add_argument('--agent', default='adversarial_search.agents:AlphaBetaAgent',
+                        help='agent class, as module:AgentClass (default AlphaBetaAgent)')
+    args = parser.parse_args(argv)
+    game = load_game(args.game, args.args)
+    agent = load_class(args.agent)(horizon=args.horizon, random=0)
+    entries = build_book(game, agent, args.plies,
+                         lambda ply, count: sys.stderr.write('Ply %d: %d game states.\n' % (ply, count)))
+    GameTable.write(args.output, entries)
+    print('%d game states in the book.' % len(entries))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,12 @@
+import asyncio
+import collections
+import hashlib
+import inspect
+import time
 from abc import ABC, abstractmethod
+from random import Random
+
+from .utils import game_result
 
 
 class Game(ABC):
@@ -45,11 +53,142 @@ class Game(ABC):
         """
         pass
 
+    def apply(self, move):
+        """ Applies the given move to this game state in place, returning the game state itself. It
+            is an optional and faster alternative to `next`, together with `undo` and `copy`. Search
+            agents use it if the game implements it (see `supports_apply`), else they use `next`.
+
+            Agents only apply moves to copies of the game states they are given, and undo them in
+            reverse order. Cached values (like the moves) must be updated, and the key changes with
+            the game state, so it must not be used in caches while moves are applied.
+        """
+        raise NotImplementedError('%s does not support applying moves in place.' % type(self).__name__)
+
+    def undo(self):
+        """ Reverts the last move applied with `apply`.
+        """
+        raise NotImplementedError('%s does not support applying moves in place.' % type(self).__name__)
+
+    def copy(self):
+        """ Returns a copy of the game state, to apply moves to it. By default it is a shallow copy
+            without the cached values (see `__getstate__`), so attributes that moves change should
+            be immutable (like strings, tuples or ints) or this method must be overridden.
+        """
+        result = object.__new__(type(self))
+        result.__dict__.update(self.__getstate__())
+        return result
+
+    def supports_apply(self):
+        """ Returns whether the game implements `apply`, `undo` and `copy`.
+        """
+        return type(self).apply is not Game.apply
+
+    def batch(self, count):
+        """ Returns a batch with count copies of this game state (see `batch.BatchGame`), so Monte
+            Carlo agents can play many random playouts at once with NumPy. By default it is None,
+            meaning the game does not support batches.
+        """
+        return None
+
+    def order_moves(self, moves):
+        """ Returns the given moves sorted by how promising they look, best first. Search agents may
+            use it to improve pruning. By default the moves are returned unchanged.
+        """
+        return moves
+
+    def key(self):
+        """ Returns a 64 bit integer identifying the game state. Unlike `hash`, it must be the same
+            in every process, so it can be stored in files. By default it is derived from the
+            representation of the game state, which is slow. Games should rather implement Zobrist
+            hashing (see `utils.ZobristTable`), updating the key incrementally in `next`, and use
+            it in `__hash__` as well. This way all caches of game states get O(1) keys.
+        """
+        return int.from_bytes(hashlib.blake2b(repr(self).encode('utf-8'), digest_size=8).digest(), 'little')
+
+    def canonical_key(self):
+        """ Returns a key (see `key`) that is the same for all game states that are equivalent by
+            symmetry, so tables of game states need to store only one of them. Moves must then be
+            stored as codes given by `canonical_move`, which are the same for equivalent moves of
+            equivalent game states. By default there are no symmetries: it is the key, and codes
+            are the indexes of the moves in `moves()`. See `utils.canonical_board`.
+        """
+        return self.key()
+
+    def canonical_move(self, move):
+        """ Returns the integer code of the move, as a move of the canonical form of the game state
+            (see `canonical_key`).
+        """
+        return list(self.moves()).index(move)
+
+    def original_move(self, code):
+        """ Returns the move of this game state for the given code (see `canonical_move`).
+        """
+        return self.moves()[code]
+
     def __hash__(self):
         return hash(repr(self))
 
+    def __getstate__(self):
+        """ Cached values (attributes named like `__name__`, as used by the decorators in `utils`) are
+            not pickled, so game states can be sent to other processes without their explored
+            children.
+        """
+        return {k: v for k, v in self.__dict__.items() if not (k.startswith('__') and k.endswith('__'))}
+
+
+MoveTiming = collections.namedtuple('MoveTiming', 'player elapsed time_left timeout')
 
-def match(game, *agents_list, **agents):
+
+class TimeControl(object):
+    """ Time control for matches (see `match`), in seconds. Agents may have a limit for every move
+        (move_time), a clock with the total time for the match (total_time), to which increment
+        is added after every move, or both. Agents get the time they have left for the move (the
+        least of both limits) through `Agent.select_move`.
+
+        When an agent's move takes longer than it had left (a flag-fall), on_timeout decides what
+        happens: FORFEIT (the default) ends the match, with the others winning (+1) and the agent
+        losing as much as they win in total (see `utils.game_result`); RANDOM plays a random move
+        instead of the agent's; IGNORE only records it.
+        Synchronous agents cannot be interrupted, so flag-falls are detected after they move.
+    """
+    FORFEIT, RANDOM, IGNORE = 'forfeit', 'random', 'ignore'
+
+    def __init__(self, move_time=None, total_time=None, increment=0, on_timeout=FORFEIT, random=None):
+        if on_timeout not in (self.FORFEIT, self.RANDOM, self.IGNORE):
+            raise ValueError('Unknown timeout policy %r.' % (on_timeout,))
+        self.move_time = move_time
+        self.total_time = total_time
+        self.increment = increment
+        self.on_timeout = on_timeout
+        # Used to choose the moves played instead of late ones, with the RANDOM policy.
+        self.random = Random(random) if random is None or isinstance(random, int) else random
+
+    def clocks(self, players):
+        """ Returns the clocks for a new match, as a dict `{player: time left}`.
+        """
+        return {player: self.total_time for player in players}
+
+    def time_left(self, clocks, player):
+        """ Returns the time the player has left for its next move, or None if it is unlimited.
+        """
+        limits = [limit for limit in (self.move_time, clocks[player]) if limit is not None]
+        return min(limits) if limits else None
+
+    def record(self, clocks, player, elapsed):
+        """ Updates the player's clock after a move that took elapsed seconds. Returns its timing.
+        """
+        time_left = self.time_left(clocks, player)
+        if clocks[player] is not None:
+            clocks[player] = max(clocks[player] - elapsed, 0) + self.increment
+        return MoveTiming(player, elapsed, time_left, time_left is not None and elapsed > time_left)
+
+    def forfeit(self, game, player):
+        """ Returns the results of a match the player lost on time, which add up to zero.
+        """
+        return game_result(player, game.players, -1)
+
+
+def match(game, *agents_list, time_control=None, **agents):
     """ A match controller in the form of a generator. Participating agents can be specified either
         as a list (agents_list) or pairs player=agent. If the list is used, agents are assigned in
         the same order as the game players.
@@ -58,32 +197,139 @@ def match(game, *agents_list, **agents):
         `(move_number, move, game state)` for each move. Finally `(None, results, final game state)`.
         The generator handles the match, asking the enabled agents to move, keeping track of game states
         and notifying all agents as needed.
+
+        If a time control is given (see `TimeControl`), agents are timed and the tuples have a fourth
+        item: the `MoveTiming` of each move, None for the first tuple, and None for the last one unless
+        the match ended by a flag-fall, in which case it is the timing of the late move. Agents are
+        told the results of a forfeited match in `Agent.match_ends`, since the game is not finished.
     """
     for player, agent in zip(game.players, agents_list):
         agents[player] = agent
     for player, agent in agents.items():  # Tells all agents the match begins.
         agent.match_begins(player, game)
     move_num = 0
-    yield (move_num, agents, game)
+    clocks = None if time_control is None else time_control.clocks(game.players)
+    timing = None
+    yield (move_num, agents, game) if time_control is None else (move_num, agents, game, timing)
     results = game.results()
     while not results:  # Game is not over.
-        chosen_move = agents[game.active_player()].select_move(game)
+        player = game.active_player()
+        if time_control is None:
+            chosen_move = agents[player].select_move(game)
+        else:
+            start = time.perf_counter()
+            chosen_move = agents[player].select_move(game, time_left=time_control.time_left(clocks, player))
+            timing = time_control.record(clocks, player, time.perf_counter() - start)
+            chosen_move, results = _timeout(time_control, timing, game, chosen_move)
+            if results:  # Forfeit.
+                break
         next_game = game.next(chosen_move)
         for player, agent in agents.items():  # Tells all agents about the moves.
             agent.match_moves(game, chosen_move, next_game)
         game = next_game
         move_num += 1
-        yield (move_num, chosen_move, game)
+        yield (move_num, chosen_move, game) if time_control is None else (move_num, chosen_move, game, timing)
+        timing = None
         results = game.results()
+    forfeit = timing is not None  # The match ended by a flag-fall.
     for player, agent in agents.items():  # Tells all agents the match ends.
-        agent.match_ends(game)
-    yield (None, results, game)
+        if forfeit:
+            agent.match_ends(game, results)
+        else:
+            agent.match_ends(game)
+    yield (None, results, game) if time_control is None else (None, results, game, timing)
+
+
+def _timeout(time_control, timing, game, move):
+    """ Applies the time control's policy to a move. Returns the move to play and the results of the
+        match if it is forfeited.
+    """
+    if timing.timeout:
+        if time_control.on_timeout == TimeControl.FORFEIT:
+            return move, time_control.forfeit(game, timing.player)
+        if time_control.on_timeout == TimeControl.RANDOM:
+            return time_control.random.choice(list(game.moves())), {}
+    return move, {}
 
 
-def run_match(game, *agents_list, **agents):
+def run_match(game, *agents_list, time_control=None, **agents):
     """ Runs a full match returning the results and final game state.
     """
-    for m, d, g in match(game, *agents_list, **agents):
-        if m is None:  # Game over.
-            return (d, g)
+    for step in match(game, *agents_list, time_control=time_control, **agents):
+        if step[0] is None:  # Game over.
+            return (step[1], step[2])
+    return (None, game)  # Should not happen.
+
+
+async def _resolve(value):
+    """ Awaits the value if it is awaitable, so agents' methods may be coroutines or not.
+    """
+    if inspect.isawaitable(value):
+        value = await value
+    return value
+
+
+async def async_match(game, *agents_list, time_control=None, **agents):
+    """ Asynchronous version of `match`, as an async generator returning the same tuples. The agents'
+        methods (`select_move`, `match_begins`, `match_moves` and `match_ends`) may be coroutines,
+        which are awaited, so other matches in the same event loop go on while an agent is waiting,
+        e.g. for an engine in another process. Methods that are not coroutines are just called, and
+        block the event loop until they return. With a time control, coroutines of agents that run
+        out of time are cancelled, unless late moves are ignored.
+    """
+    for player, agent in zip(game.players, agents_list):
+        agents[player] = agent
+    for player, agent in agents.items():  # Tells all agents the match begins.
+        await _resolve(agent.match_begins(player, game))
+    move_num = 0
+    clocks = None if time_control is None else time_control.clocks(game.players)
+    timing = None
+    yield (move_num, agents, game) if time_control is None else (move_num, agents, game, timing)
+    results = game.results()
+    while not results:  # Game is not over.
+        player = game.active_player()
+        if time_control is None:
+            chosen_move = await _resolve(agents[player].select_move(game))
+        else:
+            time_left = time_control.time_left(clocks, player)
+            start = time.perf_counter()
+            chosen_move = agents[player].select_move(game, time_left=time_left)
+            cancelled = False
+            if inspect.isawaitable(chosen_move):
+                if time_left is None or time_control.on_timeout == TimeControl.IGNORE:
+                    chosen_move = await chosen_move
+                else:
+                    try:
+                        chosen_move = await asyncio.wait_for(chosen_move, time_left)
+                    except asyncio.TimeoutError:
+                        chosen_move, cancelled = None, True
+            timing = time_control.record(clocks, player, time.perf_counter() - start)
+            if cancelled:  # It ran out of time, even if the timer says otherwise.
+                timing = timing._replace(timeout=True)
+            chosen_move, results = _timeout(time_control, timing, game, chosen_move)
+            if results:  # Forfeit.
+                break
+        next_game = game.next(chosen_move)
+        for player, agent in agents.items():  # Tells all agents about the moves.
+            await _resolve(agent.match_moves(game, chosen_move, next_game))
+        game = next_game
+        move_num += 1
+        yield (move_num, chosen_move, game) if time_control is None else (move_num, chosen_move, game, timing)
+        timing = None
+        results = game.results()
+    forfeit = timing is not None  # The match ended by a flag-fall.
+    for player, agent in agents.items():  # Tells all agents the match ends.
+        if forfeit:
+            await _resolve(agent.match_ends(game, results))
+        else:
+            await _resolve(agent.match_ends(game))
+    yield (None, results, game) if time_control is None else (None, results, game, timing)
+
+
+async def async_run_match(game, *agents_list, time_control=None, **agents):
+    """ Asynchronous version of `run_match`, returning the results and final game state.
+    """
+    async for step in async_match(game, *agents_list, time_control=time_control, **agents):
+        if step[0] is None:  # Game over.
+            return (step[1], step[2])
     return (None, game)  # Should not happen.
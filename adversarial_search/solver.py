@@ -0,0 +1,104 @@
+""" Exact solver for games small enough to search completely, like TicTacToe, Cuanteti or small
+    ToadsFrogs boards. It searches all game states reachable from the initial one, remembering the
+    ones already solved, and writes the results to a table file (see `tables.GameTable`) that
+    `agents.SolvedAgent` uses to play perfectly. Run it from the command line with:
+
+        python -m adversarial_search.solver module:GameClass output_file [constructor arguments]
+
+    For example `python -m adversarial_search.solver examples.toads_and_frogs:ToadsFrogs tf.table
+    None 0 3 3`. Constructor arguments are Python literals.
+"""
+import argparse
+import ast
+import importlib
+import sys
+
+from .tables import GameTable
+
+
+def solve(game):
+    """ Solves the game from the given state. Returns a dict `{key: (value, move, depth)}` with an
+        entry for every reachable game state that is not finished: the result of perfect play for
+        the active player, the code of the best move (see `Game.canonical_move`) and the number of
+        moves left until the end. Among the best moves, the quickest victories and the slowest
+        defeats are preferred. Game states are keyed by `Game.canonical_key`, so symmetric game
+        states are solved only once. If the game supports it (see `Game.apply`), moves are applied
+        in place to a copy of the game state.
+    """
+    solution = {}
+    in_place = game.supports_apply()
+    _solve(game.copy() if in_place else game, in_place, {}, solution)
+    return solution
+
+
+def _solve(game, in_place, memo, solution):
+    """ Returns the results of perfect play from the game state, as a tuple in the order of the game
+        players, and the number of moves left until the end. The memo keeps the results rotated so
+        they start with the active player's, because symmetric game states may swap the players.
+    """
+    key = game.canonical_key()
+    player = game.players.index(game.active_player())
+    known = memo.get(key)
+    if known is None:
+        results = game.results()
+        if results:
+            values, depth = tuple(results[name] for name in game.players), 0
+        else:
+            best = None
+            for move in game.moves():
+                child = game.apply(move) if in_place else game.next(move)
+                child_values, child_depth = _solve(child, in_place, memo, solution)
+                if in_place:
+                    game.undo()
+                rank = (child_values[player], -child_depth if child_values[player] > 0 else child_depth)
+                if best is None or rank > best[0]:
+                    best = (rank, move, child_values, child_depth + 1)
+            _, move, values, depth = best
+            solution[key] = (values[player], game.canonical_move(move), depth)
+        memo[key] = known = (values[player:] + values[:player], depth)
+    values, depth = known
+    return values[-player:] + values[:-player] if player else values, depth
+
+
+def load_class(spec):
+    """ Returns the class given by a specification like 'module:ClassName'.
+    """
+    module_name, _, class_name = spec.partition(':')
+    if not class_name:
+        raise ValueError('Class must be given as module:ClassName, not %r.' % (spec,))
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def load_game(spec, args=()):
+    """ Builds a game state from a specification like 'module:GameClass', calling the class with the
+        given arguments.
+    """
+    return load_class(spec)(*args)
+
+
+def literal(text):
+    """ Parses a Python literal, leaving it as a string if it is not one.
+    """
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('game', help='game class, as module:GameClass')
+    parser.add_argument('output', help='table file to write')
+    parser.add_argument('args', nargs='*', type=literal, help='arguments for the game class')
+    args = parser.parse_args(argv)
+    game = load_game(args.game, args.args)
+    solution = solve(game)
+    GameTable.write(args.output, solution)
+    value, _, depth = solution.get(game.canonical_key(), (0, -1, 0))
+    print('%d game states solved. Value for %s: %s in %d moves.' % (len(solution), game.active_player(), value,
+                                                                  depth))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
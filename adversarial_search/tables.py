@@ -0,0 +1,100 @@
+""" Compact on-disk tables of game states, used to store solved games and opening books.
+
+    A table file maps game state keys (see `Game.key`) to a value, a move and a depth. It has a
+    header followed by an open addressing hash table of fixed size records, with linear probing.
+    Tables are written once and then memory mapped for reading, so lookups take constant time and
+    only the pages actually used are loaded.
+"""
+import collections
+import mmap
+import struct
+
+TableEntry = collections.namedtuple('TableEntry', 'value move depth')
+
+# Magic, version, slots (a power of 2), entries.
+HEADER = struct.Struct('<4sHxxQQ8x')
+# Key, value, move (index in `game.moves()`, -1 if none), depth plus one (0 for empty slots).
+RECORD = struct.Struct('<QfhH')
+MAGIC = b'ASGT'
+VERSION = 1
+MAX_DEPTH = 2 ** 16 - 2
+
+
+class GameTable(object):
+    """ A read-only table of game states, memory mapped from the given file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as in_file:
+            self._map = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.slots, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError('%r is not a game table (version %d).' % (path, VERSION))
+        self._mask = self.slots - 1
+
+    def get(self, key, default=None):
+        """ Returns the TableEntry for the given key, or default if there is none.
+        """
+        index = key & self._mask
+        while True:
+            stored_key, value, move, depth = RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)
+            if not depth:
+                return default
+            if stored_key == key:
+                return TableEntry(value, move, depth - 1)
+            index = (index + 1) & self._mask
+
+    def __getitem__(self, key):
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._map.close()
+
+    def __getstate__(self):
+        """ Tables are pickled as the path of their file, which is mapped again when unpickled.
+        """
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def write(path, entries):
+        """ Writes a table file with the given entries, a dict `{key: (value, move, depth)}` or an
+            iterable of `(key, (value, move, depth))` pairs. Keys must be unsigned 64 bit integers,
+            moves must fit in 16 signed bits and depths must be between 0 and MAX_DEPTH. At most
+            half of the slots are used, to keep probe sequences short.
+        """
+        entries = dict(entries)
+        slots = 1
+        while slots < 2 * len(entries):
+            slots *= 2
+        mask = slots - 1
+        data = bytearray(HEADER.size + slots * RECORD.size)
+        HEADER.pack_into(data, 0, MAGIC, VERSION, slots, len(entries))
+        for key, (value, move, depth) in entries.items():
+            if not 0 <= depth <= MAX_DEPTH:
+                raise ValueError('Depth %r out of range for key %r.' % (depth, key))
+            index = key & mask
+            while RECORD.unpack_from(data, HEADER.size + index * RECORD.size)[3]:
+                index = (index + 1) & mask
+            RECORD.pack_into(data, HEADER.size + index * RECORD.size, key, value, move, depth + 1)
+        with open(path, 'wb') as out_file:
+            out_file.write(data)
@@ -1,4 +1,11 @@
 # -*- coding: utf-8 -*-
+import atexit
+import collections
+import concurrent.futures
+import operator
+import random
+import struct
+import weakref
 
 __COLUMNS__ = 'abcdefghijklmnopqrstuvwxyz'
 
@@ -19,6 +26,58 @@ def print_board(board, rows, cols, row_sep='', col_sep='', joint_sep='', row_fmt
     return row_sep.join([row_fmt % col_sep.join(board[row * cols:(row + 1) * cols]) for row in range(rows)])
 
 
+BoardLines = collections.namedtuple('BoardLines', 'rows columns positive_diagonals negative_diagonals')
+
+__BOARD_LINES__ = {}
+__BOARD_LINE_GETTERS__ = {}
+__BOARD_LINE_CONTENT_GETTERS__ = {}
+
+
+def board_line_indexes(rows, cols):
+    """ Returns the lines of a board as tuples of square indexes, grouped in a `BoardLines` of rows,
+        columns, positive diagonals and negative diagonals. They are computed once for every size
+        of board, so the other board functions do not have to.
+    """
+    result = __BOARD_LINES__.get((rows, cols))
+    if result is None:
+        squares = range(rows * cols)
+        result = BoardLines(
+            tuple(tuple(range(row * cols, (row + 1) * cols)) for row in range(rows)),
+            tuple(tuple(range(col, rows * cols, cols)) for col in range(cols)),
+            tuple(tuple(i for i in squares if i // cols + i % cols == s) for s in range(rows + cols - 1)),
+            tuple(tuple(i for i in squares if i % cols - i // cols == s) for s in range(1 - rows, cols)),
+        )
+        __BOARD_LINES__[(rows, cols)] = result
+    return result
+
+
+def _board_line_getters(rows, cols):
+    """ Returns a `BoardLines` with an `operator.itemgetter` for every line of a board, which takes
+        the squares of the line from the board in a single call.
+    """
+    result = __BOARD_LINE_GETTERS__.get((rows, cols))
+    if result is None:
+        result = BoardLines(*(tuple(operator.itemgetter(*line) for line in group)
+                              for group in board_line_indexes(rows, cols)))
+        __BOARD_LINE_GETTERS__[(rows, cols)] = result
+    return result
+
+
+def board_line_contents(board, rows, cols, min_length=1):
+    """ Returns a list with the contents of the lines of the given board, in the same order as
+        `board_lines`, skipping lines shorter than min_length. Faster than `board_lines`, because
+        the squares of every line are precomputed (see `board_line_indexes`).
+    """
+    key = (rows, cols, min_length)
+    getters = __BOARD_LINE_CONTENT_GETTERS__.get(key)
+    if getters is None:
+        getters = tuple(operator.itemgetter(*line) for group in board_line_indexes(rows, cols)
+                        for line in group if len(line) >= min_length)
+        __BOARD_LINE_CONTENT_GETTERS__[key] = getters
+    join = ''.join
+    return [join(getter(board)) for getter in getters]
+
+
 def board_rows(board, rows, cols):
     """ Returns a list of row of the given board.
     """
@@ -28,7 +87,7 @@ def board_rows(board, rows, cols):
 def board_columns(board, rows, cols):
     """ Returns a list of columns of the given board.
     """
-    return [''.join([board[row * cols + col] for row in range(rows)]) for col in range(cols)]
+    return [''.join(getter(board)) for getter in _board_line_getters(rows, cols).columns]
 
 
 def board_indexed(board, rows, cols):
@@ -40,13 +99,13 @@ def board_indexed(board, rows, cols):
 def board_positive_diagonals(board, rows, cols):
     """ Returns a list of positive diagonals of the given board.
     """
-    return [''.join([b for r, c, b in board_indexed(board, rows, cols) if s == r + c]) for s in range(rows + cols - 1)]
+    return [''.join(getter(board)) for getter in _board_line_getters(rows, cols).positive_diagonals]
 
 
 def board_negative_diagonals(board, rows, cols):
     """ Returns a list of negative diagonals of the given board.
     """
-    return [''.join([b for r, c, b in board_indexed(board, rows, cols) if s == c - r]) for s in range(1 - rows, cols)]
+    return [''.join(getter(board)) for getter in _board_line_getters(rows, cols).negative_diagonals]
 
 
 def board_diagonals(board, rows, cols):
@@ -70,12 +129,122 @@ def board_orthogonals(board, rows, cols):
 def board_lines(board, rows, cols):
     """ Returns a list of lines of the given board. Lines can be horizontal, vertical or diagonal.
     """
-    for x in board_orthogonals(board, rows, cols):
-        yield x
-    for x in board_diagonals(board, rows, cols):
+    for x in board_line_contents(board, rows, cols):
         yield x
 
 
+def board_line_squares(rows, cols):
+    """ Returns the lines of a board, in the same order as `board_lines`, as tuples of square
+        indexes. Useful to precompute masks for bitboards.
+    """
+    return [line for group in board_line_indexes(rows, cols) for line in group]
+
+
+__BOARD_SYMMETRIES__ = {}
+
+
+def board_symmetries(rows, cols):
+    """ Returns the symmetries of a board as permutations of its squares: tuples where item i is
+        the index of the square that the symmetry moves to square i. Square boards have 8 of them
+        (rotations and reflections) and other boards have 4. The first one is the identity.
+    """
+    result = __BOARD_SYMMETRIES__.get((rows, cols))
+    if result is None:
+        maps = [
+            lambda r, c: (r, c),
+            lambda r, c: (r, cols - 1 - c),
+            lambda r, c: (rows - 1 - r, c),
+            lambda r, c: (rows - 1 - r, cols - 1 - c),
+        ]
+        if rows == cols:
+            maps += [
+                lambda r, c: (c, r),
+                lambda r, c: (c, cols - 1 - r),
+                lambda r, c: (rows - 1 - c, r),
+                lambda r, c: (rows - 1 - c, cols - 1 - r),
+            ]
+        result = []
+        for square_map in maps:
+            symmetry = tuple(row * cols + col for row, col in
+                             (square_map(r, c) for r in range(rows) for c in range(cols)))
+            if symmetry not in result:
+                result.append(symmetry)
+        __BOARD_SYMMETRIES__[(rows, cols)] = result
+    return result
+
+
+def transform_board(board, symmetry):
+    """ Returns the board transformed by the given symmetry (see `board_symmetries`). Strings are
+        returned as strings and other sequences as tuples.
+    """
+    squares = [board[square] for square in symmetry]
+    return ''.join(squares) if isinstance(board, str) else tuple(squares)
+
+
+def inverse_symmetry(symmetry):
+    """ Returns the symmetry that undoes the given one.
+    """
+    result = [0] * len(symmetry)
+    for square, source in enumerate(symmetry):
+        result[source] = square
+    return tuple(result)
+
+
+def canonical_board(board, rows, cols):
+    """ Returns the canonical form of the board, the least of all its symmetric boards, and the
+        symmetry that transforms the board into it. All symmetric boards have the same canonical
+        form. Square i of the canonical board is square `symmetry[i]` of the given one, and
+        `inverse_symmetry(symmetry)` transforms the canonical board back.
+    """
+    return min((transform_board(board, symmetry), symmetry) for symmetry in board_symmetries(rows, cols))
+
+
+def bit_count(x):
+    """ Returns the number of bits set in the integer x (population count).
+    """
+    return bin(x).count('1')
+
+
+def next_float(x):
+    """ Returns the least float greater than x, like `math.nextafter(x, math.inf)` (Python 3.9+).
+        Used to build null windows for searches with float values.
+    """
+    if x != x or x == float('inf'):
+        return x
+    if x == 0:
+        return 5e-324  # The least positive subnormal, for both 0.0 and -0.0.
+    bits = struct.unpack('<q', struct.pack('<d', x))[0]
+    return struct.unpack('<d', struct.pack('<q', bits + 1 if x > 0 else bits - 1))[0]
+
+
+class ZobristTable(object):
+    """ Random 64 bit keys for every piece in every square of a board, and for every player, used
+        for Zobrist hashing <https://en.wikipedia.org/wiki/Zobrist_hashing>. The hash of a game
+        state is the xor of the keys of its pieces and its active player, so a move updates it
+        by xoring the keys of the changed squares. Keys are generated from the seed, hence the
+        same game gets the same table in every process.
+    """
+
+    def __init__(self, squares, pieces, players=(), seed=None):
+        rnd = random.Random(seed)
+        self.squares = tuple({piece: rnd.getrandbits(64) for piece in pieces} for _ in range(squares))
+        self.players = {player: rnd.getrandbits(64) for player in players}
+
+    def hash(self, board, player=None):
+        """ Calculates the hash of the board from scratch. Squares with unknown pieces are
+            considered empty.
+        """
+        key = self.players.get(player, 0)
+        for square, piece in zip(self.squares, board):
+            key ^= square.get(piece, 0)
+        return key
+
+    def turn(self, player1, player2):
+        """ Returns the key to xor when the active player changes from player1 to player2.
+        """
+        return self.players[player1] ^ self.players[player2]
+
+
 # Game results #####################################################################################
 
 def game_result(player, players, value=1):
@@ -130,3 +299,132 @@ def cached_indexed_property(cache_name):
         return decorated
 
     return decorator
+
+
+class CacheInfo(collections.namedtuple('CacheInfo', 'hits misses maxsize currsize')):
+    """ Usage counters of the caches of `lru_indexed_property` and `weak_indexed_property`.
+    """
+
+    @property
+    def hit_rate(self):
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+
+def lru_indexed_property(maxsize=1024):
+    """ Decorator for methods with one parameter that caches the returned values in a least
+        recently used cache, shared by all the instances and keyed by instance and parameter.
+        Unlike `cached_indexed_property`, memory is bounded: at most maxsize values are kept, so
+        a game state does not keep alive every child it ever created. The decorated method has
+        the functions `cache_info()`, `cache_clear()` and `cache_resize(maxsize)`.
+    """
+
+    def decorator(f):
+        cache = collections.OrderedDict()
+        hits = misses = 0
+
+        def decorated(self, *args, **kargs):
+            nonlocal hits, misses
+            key = (self, args[0])
+            value = cache.get(key, cache)
+            if value is cache:
+                misses += 1
+                value = f(self, *args, **kargs)
+                cache[key] = value
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+            else:
+                hits += 1
+                cache.move_to_end(key)
+            return value
+
+        def cache_info():
+            return CacheInfo(hits, misses, maxsize, len(cache))
+
+        def cache_clear():
+            nonlocal hits, misses
+            cache.clear()
+            hits = misses = 0
+
+        def cache_resize(new_maxsize):
+            nonlocal maxsize
+            maxsize = new_maxsize
+            while len(cache) > maxsize:
+                cache.popitem(last=False)
+
+        decorated.cache_info = cache_info
+        decorated.cache_clear = cache_clear
+        decorated.cache_resize = cache_resize
+        return decorated
+
+    return decorator
+
+
+def weak_indexed_property(cache_name):
+    """ Decorator for methods with one parameter that caches the returned values like
+        `cached_indexed_property`, but keeping only weak references to them. Values are reused
+        while something else keeps them alive (e.g. a search still exploring them), without
+        retaining the whole explored tree. The decorated method has the functions `cache_info()`
+        and `cache_clear()`, the latter only resetting the counters.
+    """
+
+    def decorator(f):
+        hits = misses = 0
+
+        def decorated(self, *args, **kargs):
+            nonlocal hits, misses
+            cache = getattr(self, cache_name, None)
+            if cache is None:
+                cache = weakref.WeakValueDictionary()
+                setattr(self, cache_name, cache)
+            index = args[0]
+            value = cache.get(index)
+            if value is None:
+                misses += 1
+                value = f(self, *args, **kargs)
+                cache[index] = value
+            else:
+                hits += 1
+            return value
+
+        def cache_info():
+            return CacheInfo(hits, misses, None, None)
+
+        def cache_clear():
+            nonlocal hits, misses
+            hits = misses = 0
+
+        decorated.cache_info = cache_info
+        decorated.cache_clear = cache_clear
+        return decorated
+
+    return decorator
+
+
+# Parallelism ######################################################################################
+
+__PROCESS_POOLS__ = {}
+
+
+def process_pool(workers):
+    """ Returns a pool of processes with the given number of workers. Pools are created once and
+        shared, so the cost of starting the processes is paid only the first time. Pools broken by
+        a worker that died are replaced.
+    """
+    pool = __PROCESS_POOLS__.get(workers)
+    if pool is not None and getattr(pool, '_broken', False):
+        pool.shutdown(wait=False)
+        pool = None
+    if pool is None:
+        pool = concurrent.futures.ProcessPoolExecutor(workers)
+        __PROCESS_POOLS__[workers] = pool
+    return pool
+
+
+@atexit.register
+def shutdown_process_pools():
+    """ Shuts down all pools created by `process_pool`.
+    """
+    while __PROCESS_POOLS__:
+        _, pool = __PROCESS_POOLS__.popitem()
+        pool.shutdown()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+""" Benchmark suite for the search agents. Every agent configuration makes decisions on a fixed set
+    of positions of TicTacToe, Cuanteti and ToadsFrogs, measuring game states generated per second,
+    time to move percentiles and peak memory. Run it from the repository root with:
+
+        python -m benchmarks.agents run [--output results.json] [--quick]
+        python -m benchmarks.agents compare baseline.json [results.json] [--threshold 0.15]
+
+    The compare command flags cases slower or bigger than the baseline by more than the threshold
+    (a fraction), and measurements that are zero or missing in any of the results, exiting with
+    status 1 if there is any. If no results file is given, the suite is run first.
+"""
+import argparse
+import datetime
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from adversarial_search.agents import AlphaBetaAgent, MCTSAgent, MiniMaxAgent, NegaScoutAgent, RandomAgent
+from examples.cuanteti import Cuanteti
+from examples.tictactoe import TicTacToe
+from examples.toads_and_frogs import ToadsFrogs
+
+# Game name: (game class, initial state factory, heuristic, plies of the positions).
+GAMES = {
+    'TicTacToe': (TicTacToe, TicTacToe, TicTacToe.simple_heuristic, (0, 2, 4)),
+    'Cuanteti': (Cuanteti, Cuanteti, None, (2, 6, 10)),
+    'ToadsFrogs': (ToadsFrogs, lambda: ToadsFrogs(None, 0, 5, 4), None, (0, 4, 8)),
+}
+
+# Agent configurations: (name, agent factory, games, quick). Quick cases are the only ones run with
+# the --quick option.
+AGENTS = [
+    ('RandomAgent', lambda h: RandomAgent(random=1), GAMES, True),
+    ('MiniMaxAgent(horizon=2)', lambda h: MiniMaxAgent(horizon=2, random=1, heuristic=h), GAMES, True),
+    ('MiniMaxAgent(horizon=4)', lambda h: MiniMaxAgent(horizon=4, random=1, heuristic=h), ('TicTacToe', 'ToadsFrogs'),
+     False),
+    ('AlphaBetaAgent(horizon=3)', lambda h: AlphaBetaAgent(horizon=3, random=1, heuristic=h), GAMES, True),
+    ('AlphaBetaAgent(horizon=5)', lambda h: AlphaBetaAgent(horizon=5, random=1, heuristic=h), GAMES, False),
+    ('NegaScoutAgent(horizon=3)', lambda h: NegaScoutAgent(horizon=3, random=1, heuristic=h), GAMES, True),
+    ('NegaScoutAgent(horizon=5)', lambda h: NegaScoutAgent(horizon=5, random=1, heuristic=h), GAMES, False),
+    ('MCTSAgent(simulation_count=5)', lambda h: MCTSAgent(simulation_count=5, random=1), GAMES, True),
+    ('MCTSAgent(simulation_count=20)', lambda h: MCTSAgent(simulation_count=20, random=1), GAMES, False),
+]
+
+# Agent configurations that choose moves without searching, so they have no game states per second.
+UNSEARCHED = {'RandomAgent'}
+
+
+def positions(game_name, count=2, seed=0):
+    """ Returns the fixed positions of a game: for every number of plies, count game states reached
+        playing randomly from the initial state with a fixed seed.
+    """
+    _, initial, _, plies_list = GAMES[game_name]
+    rnd = random.Random('%s/%s' % (game_name, seed))
+    result = []
+    for plies in plies_list:
+        for _ in range(count):
+            game = initial()
+            for _ in range(plies):
+                if not game.moves():
+                    break
+                game = game.next(rnd.choice(game.moves()))
+            if game.moves():
+                result.append(game)
+    return result
+
+
+def clear_caches(game_class):
+    """ Clears the child state cache of the game class, if any, so every decision starts cold.
+    """
+    cache_clear = getattr(game_class.next, 'cache_clear', None)
+    if cache_clear is not None:
+        cache_clear()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(p / 100.0 * (len(values) - 1)))))
+    return values[index]
+
+
+def run_case(agent_factory, game_name, repeat=3, searches=True):
+    """ Runs one agent configuration on all positions of a game, returning its measurements. Game
+        states are counted by the agents themselves (see `SearchStats.nodes`), however they expand
+        them. Agents that do not search have no game states per second (None).
+    """
+    game_class, _, heuristic, _ = GAMES[game_name]
+    times = []
+    nodes = 0
+    for game in positions(game_name):
+        for _ in range(repeat):
+            agent = agent_factory(heuristic)
+            agent.match_begins(game.active_player(), game)
+            clear_caches(game_class)
+            start = time.perf_counter()
+            agent.select_move(game)
+            times.append(time.perf_counter() - start)
+            nodes += agent.search_stats.nodes
+    peak_memory = 0
+    for game in positions(game_name):  # Memory is measured apart, since tracing slows everything.
+        agent = agent_factory(heuristic)
+        agent.match_begins(game.active_player(), game)
+        clear_caches(game_class)
+        tracemalloc.start()
+        agent.select_move(game)
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    total_time = sum(times)
+    return {
+        'decisions': len(times),
+        'nodes': nodes,
+        'nodes_per_second': (nodes / total_time if total_time else 0.0) if searches else None,
+        'time_to_move_ms': {'p50': percentile(times, 50) * 1000, 'p90': percentile(times, 90) * 1000,
+                            'p99': percentile(times, 99) * 1000, 'max': max(times) * 1000},
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def run_suite(quick=False, repeat=3, out=sys.stderr):
+    results = {}
+    for agent_name, agent_factory, game_names, is_quick in AGENTS:
+        if quick and not is_quick:
+            continue
+        for game_name in game_names:
+            case = '%s/%s' % (game_name, agent_name)
+            out.write('%s...\n' % case)
+            results[case] = run_case(agent_factory, game_name, repeat, agent_name not in UNSEARCHED)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': datetime.datetime.now().isoformat(),
+            'quick': quick,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def measure(case_results, *keys):
+    """ Returns the measurement of a case found following the keys, or 0 if it is missing.
+    """
+    for key in keys:
+        if not isinstance(case_results, dict) or key not in case_results:
+            return 0
+        case_results = case_results[key]
+    return case_results
+
+
+def compare(baseline, current, threshold=0.15):
+    """ Compares two benchmark results, returning a list of regression descriptions. Measurements
+        that are zero or missing in any of them are regressions too, since nothing can be compared.
+        Measurements that do not apply to a case (None) must be None in both. Cases missing in any
+        of them are ignored.
+    """
+    regressions = []
+    for case, base in sorted(baseline['results'].items()):
+        curr = current['results'].get(case)
+        if curr is None:
+            continue
+        checks = [
+            ('nodes/s', ('nodes_per_second',), False),
+            ('p50 time to move', ('time_to_move_ms', 'p50'), True),
+            ('p90 time to move', ('time_to_move_ms', 'p90'), True),
+            ('peak memory', ('peak_memory_bytes',), True),
+        ]
+        for measure_name, keys, lower_is_better in checks:
+            base_value, curr_value = measure(base, *keys), measure(curr, *keys)
+            if base_value is None and curr_value is None:  # Not applicable to the case.
+                continue
+            if not base_value or not curr_value:
+                regressions.append('%s: %s is zero or missing (%r -> %r)' % (case, measure_name, base_value,
+                                                                             curr_value))
+                continue
+            change = (curr_value - base_value) / float(base_value)
+            if (change if lower_is_better else -change) > threshold:
+                regressions.append('%s: %s %.4g -> %.4g (%+.1f%%)'
+                                   % (case, measure_name, base_value, curr_value, change * 100))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command')
+    run_parser = commands.add_parser('run', help='run the benchmark suite')
+    run_parser.add_argument('--output', '-o', help='file to write the JSON results (default stdout)')
+    compare_parser = commands.add_parser('compare', help='compare results against a baseline')
+    compare_parser.add_argument('baseline', help='JSON results to compare against')
+    compare_parser.add_argument('results', nargs='?', help='JSON results to check (default: run the suite)')
+    compare_parser.add_argument('--threshold', type=float, default=0.15, help='tolerated change (default 0.15)')
+    for command_parser in (run_parser, compare_parser):
+        command_parser.add_argument('--quick', action='store_true', help='run only the quick cases')
+        command_parser.add_argument('--repeat', type=int, default=3, help='decisions per position (default 3)')
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        results = run_suite(args.quick, args.repeat)
+        if args.output:
+            with open(args.output, 'w') as out_file:
+                json.dump(results, out_file, indent=2, sort_keys=True)
+        else:
+            json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        return 0
+    elif args.command == 'compare':
+        with open(args.baseline) as in_file:
+            baseline = json.load(in_file)
+        if args.results:
+            with open(args.results) as in_file:
+                results = json.load(in_file)
+        else:
+            results = run_suite(args.quick, args.repeat)
+        regressions = compare(baseline, results, args.threshold)
+        for regression in regressions:
+            print('REGRESSION %s' % regression)
+        print('%d regressions found.' % len(regressions))
+        return 1 if regressions else 0
+    parser.print_help()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
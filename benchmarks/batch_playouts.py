@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+""" Compares the speed of random playouts played one by one (as `MCTSAgent.playout` does) and in
+    NumPy batches (see `adversarial_search.batch`), in playouts per second. Run it from the
+    repository root with:
+
+        python -m benchmarks.batch_playouts [--sizes 1 100 1000 10000] [--repeat N]
+"""
+import argparse
+import sys
+import time
+
+from adversarial_search.agents import MCTSAgent
+from adversarial_search.batch import NUMPY_AVAILABLE
+from examples.cuanteti import Cuanteti, BitboardCuanteti
+from examples.tictactoe import TicTacToe, BitboardTicTacToe
+
+GAMES = [
+    ('TicTacToe', TicTacToe),
+    ('BitboardTicTacToe', BitboardTicTacToe),
+    ('Cuanteti', Cuanteti),
+    ('BitboardCuanteti', BitboardCuanteti),
+]
+
+
+def scalar_rate(game_class, count, repeat):
+    """ Returns the best rate of `repeat` runs of count playouts, played one by one.
+    """
+    agent = MCTSAgent(random=0, batch=False)
+    game = game_class()
+    agent.match_begins(game.active_player(), game)
+    best = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(count):
+            agent.playout(game)
+        best = max(best, count / (time.perf_counter() - start))
+    return best
+
+
+def batch_rate(game_class, count, repeat):
+    """ Returns the best rate of `repeat` runs of count playouts, played in one batch.
+    """
+    best = 0
+    for seed in range(repeat):
+        start = time.perf_counter()
+        game_class().batch(count).playouts(seed)
+        best = max(best, count / (time.perf_counter() - start))
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 1000, 10000], help='batch sizes')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measure, keeping the best')
+    args = parser.parse_args(argv)
+    if not NUMPY_AVAILABLE:
+        print('NumPy is not installed, batches are not available.')
+        return 1
+    print('%-18s %8s %14s %14s %8s' % ('Game', 'Size', 'Scalar (p/s)', 'Batch (p/s)', 'Speedup'))
+    for name, game_class in GAMES:
+        scalar = scalar_rate(game_class, min(max(args.sizes), 1000), args.repeat)
+        for size in args.sizes:
+            batch = batch_rate(game_class, size, args.repeat)
+            print('%-18s %8d %14.0f %14.0f %7.1fx' % (name, size, scalar, batch, batch / scalar))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+""" Compares the speed of the string and bitboard implementations of TicTacToe and Cuanteti, in
+    game states visited per second. Run it from the repository root with:
+
+        python -m benchmarks.bitboards [--depth N] [--repeat N]
+"""
+import argparse
+import time
+
+from examples.cuanteti import Cuanteti, BitboardCuanteti
+from examples.tictactoe import TicTacToe, BitboardTicTacToe
+
+GAMES = [
+    ('TicTacToe', TicTacToe, BitboardTicTacToe),
+    ('Cuanteti', Cuanteti, BitboardCuanteti),
+]
+
+
+def perft(game, depth):
+    """ Visits all game states up to the given depth, checking results and moves in each one as a
+        search would. Returns the number of game states visited.
+    """
+    nodes = 1
+    if depth > 0 and not game.results():
+        for move in game.moves():
+            nodes += perft(game.next(move), depth - 1)
+    return nodes
+
+
+def nodes_per_second(game_class, depth, repeat):
+    """ Returns the best rate of `repeat` runs. A new initial state is used every time, so no
+        cached children are reused.
+    """
+    best = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        nodes = perft(game_class(), depth)
+        best = max(best, nodes / (time.perf_counter() - start))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depth', type=int, default=4, help='plies to explore from the initial state')
+    parser.add_argument('--repeat', type=int, default=3, help='runs for each game, the best one is reported')
+    args = parser.parse_args()
+    print('%-10s %16s %16s %8s' % ('game', 'string nodes/s', 'bitboard nodes/s', 'speedup'))
+    for name, string_class, bitboard_class in GAMES:
+        string_rate = nodes_per_second(string_class, args.depth, args.repeat)
+        bitboard_rate = nodes_per_second(bitboard_class, args.depth, args.repeat)
+        print('%-10s %16.0f %16.0f %7.2fx' % (name, string_rate, bitboard_rate, bitboard_rate / string_rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+""" Compares the speed of extracting all lines of a board by scanning every square for every
+    diagonal (as `utils.board_lines` used to) and with the precomputed line indexes of
+    `utils.board_line_contents`, in boards per second. Run it from the repository root with:
+
+        python -m benchmarks.board_lines [--sizes 3 4 8 13 19] [--boards N] [--repeat N]
+"""
+import argparse
+import random
+import time
+
+from adversarial_search.utils import board_indexed, board_line_contents, board_rows
+
+
+def scanned_lines(board, rows, cols):
+    """ Returns the lines of the board like `board_lines` did before line indexes were precomputed.
+    """
+    lines = board_rows(board, rows, cols)
+    lines += [''.join([board[row * cols + col] for row in range(rows)]) for col in range(cols)]
+    lines += [''.join([b for r, c, b in board_indexed(board, rows, cols) if s == r + c])
+              for s in range(rows + cols - 1)]
+    lines += [''.join([b for r, c, b in board_indexed(board, rows, cols) if s == c - r])
+              for s in range(1 - rows, cols)]
+    return lines
+
+
+def boards_per_second(function, boards, size, repeat):
+    """ Returns the best rate of `repeat` runs of the function over all boards.
+    """
+    best = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for board in boards:
+            function(board, size, size)
+        best = max(best, len(boards) / (time.perf_counter() - start))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3, 4, 8, 13, 19], help='sides of the square boards')
+    parser.add_argument('--boards', type=int, default=200, help='random boards for each size')
+    parser.add_argument('--repeat', type=int, default=3, help='runs for each size, the best one is reported')
+    args = parser.parse_args()
+    rnd = random.Random(0)
+    print('%-6s %16s %16s %8s' % ('board', 'scanned boards/s', 'indexed boards/s', 'speedup'))
+    for size in args.sizes:
+        boards = [''.join(rnd.choice('XO.') for _ in range(size * size)) for _ in range(args.boards)]
+        assert all(scanned_lines(board, size, size) == board_line_contents(board, size, size) for board in boards)
+        scanned = boards_per_second(scanned_lines, boards, size, args.repeat)
+        indexed = boards_per_second(board_line_contents, boards, size, args.repeat)
+        print('%-6s %16.0f %16.0f %7.2fx' % ('%dx%d' % (size, size), scanned, indexed, indexed / scanned))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,24 @@
 # -*- coding: utf-8 -*-
 from adversarial_search import Game
-from adversarial_search.utils import coord_id, board_lines, print_board, game_result, cached_property, \
-    cached_indexed_property
+from adversarial_search.batch import NUMPY_AVAILABLE, PlacementBatchGame, numpy
+from adversarial_search.utils import coord_id, board_line_contents, print_board, game_result, cached_property, \
+    lru_indexed_property, ZobristTable, board_line_squares, canonical_board, bit_count
 
 
 class Cuanteti(Game):
     """ Game component for Cuanteti.
     """
     PLAYERS = ('Xs', 'Os')
+    # Number of lines of 3 or more squares each square belongs to, used to order moves.
+    SQUARE_LINES = (3, 3, 3, 3, 3, 4, 4, 3, 3, 4, 4, 3, 3, 3, 3, 3)
 
-    def __init__(self, board=None, enabled=0):
+    def __init__(self, board=None, enabled=0, key=None):
+        """ The key is the Zobrist hash of the game state, if it is already known.
+        """
         Game.__init__(self, *Cuanteti.PLAYERS)
         self.board = board if board else '.' * 16
         self.enabled = enabled
+        self._key = ZOBRIST.hash(self.board, self.players[enabled]) if key is None else key
 
     class _Move(int):
         def __str__(self):
@@ -27,24 +33,192 @@ class Cuanteti(Game):
 
     def results(self):
         if not self.moves():
+            lines = board_line_contents(self.board, 4, 4, 3)
             result_xs = sum(len(ln) - 2 if ln == 'X' * len(ln) else 1
-                            for ln in board_lines(self.board, 4, 4)
-                            if len(ln) > 2 and (ln == 'X' * len(ln) or 'XXX' in ln))
+                            for ln in lines if ln == 'X' * len(ln) or 'XXX' in ln)
             result_os = sum(len(ln) - 2 if ln == 'O' * len(ln) else 1
-                            for ln in board_lines(self.board, 4, 4)
-                            if len(ln) > 2 and (ln == 'O' * len(ln) or 'OOO' in ln))
-            # print (list(board_lines(self.board, 4, 4)))
+                            for ln in lines if ln == 'O' * len(ln) or 'OOO' in ln)
+            # print (lines)
             # print (result_xs, result_os)
             return game_result('Xs', self.players, result_xs - result_os)
         else:
             return None
 
-    @cached_indexed_property('__next__')
+    def order_moves(self, moves):
+        return sorted(moves, key=self.SQUARE_LINES.__getitem__, reverse=True)
+
+    def batch(self, count):
+        return BatchCuanteti(self, count) if NUMPY_AVAILABLE else None
+
+    @lru_indexed_property(maxsize=2 ** 14)
     def next(self, move):
         board_list = list(self.board)
         enabled_player = self.players[self.enabled]
         board_list[move] = enabled_player[0]
-        return Cuanteti(''.join(board_list), (self.enabled + 1) % 2)
+        key = self._key ^ ZOBRIST.squares[move][enabled_player[0]] ^ ZOBRIST_TURN
+        return Cuanteti(''.join(board_list), (self.enabled + 1) % 2, key)
+
+    def apply(self, move):
+        mark = self.players[self.enabled][0]
+        self.__dict__.setdefault('__undo__', []).append((self.board, self._key))
+        self.__dict__.pop('__moves__', None)
+        self.__dict__.pop('__canonical__', None)
+        self.board = self.board[:move] + mark + self.board[move + 1:]
+        self._key ^= ZOBRIST.squares[move][mark] ^ ZOBRIST_TURN
+        self.enabled = (self.enabled + 1) % 2
+        return self
+
+    def undo(self):
+        self.board, self._key = self.__dict__['__undo__'].pop()
+        self.enabled = (self.enabled + 1) % 2
+        self.__dict__.pop('__moves__', None)
+        self.__dict__.pop('__canonical__', None)
+
+    def key(self):
+        return self._key
+
+    @cached_property('__canonical__')
+    def _canonical(self):
+        """ Returns the canonical key and the symmetry that transforms the board into its canonical
+            form. Move codes are squares of the canonical board.
+        """
+        board, symmetry = canonical_board(self.board, 4, 4)
+        return ZOBRIST.hash(board, self.players[self.enabled]), symmetry
+
+    def canonical_key(self):
+        return self._canonical()[0]
+
+    def canonical_move(self, move):
+        return self._canonical()[1].index(move)
+
+    def original_move(self, code):
+        return self._Move(self._canonical()[1][code])
+
+    def __hash__(self):
+        return self._key
+
+    def __str__(self):
+        return print_board(self.board.replace('.', ' '), 4, 4, '-', '|', '+')
+
+    def __repr__(self):
+        return '%s[%s]' % (self.players[self.enabled][0], self.board)
+
+
+def _mask(squares):
+    return sum(1 << square for square in squares)
+
+
+class BitboardCuanteti(Game):
+    """ Cuanteti with the board stored as an integer bit mask for each player, where bit i is set if
+        the player has marked square i. It has the same interface as Cuanteti, but it is faster.
+    """
+    PLAYERS = Cuanteti.PLAYERS
+    SQUARE_LINES = Cuanteti.SQUARE_LINES
+    FULL_MASK = (1 << 16) - 1
+    # Lines of 3 or more squares, as tuples (line mask, line length, masks of 3 consecutive squares).
+    LINES = tuple((_mask(line), len(line), tuple(_mask(line[i:i + 3]) for i in range(len(line) - 2)))
+                  for line in board_line_squares(4, 4) if len(line) > 2)
+    MOVES = tuple(Cuanteti._Move(square) for square in range(16))
+
+    def __init__(self, board=None, enabled=0, key=None, masks=None):
+        """ The board can be given as a string, like in Cuanteti, or as a tuple with the masks of
+            both players.
+        """
+        Game.__init__(self, *BitboardCuanteti.PLAYERS)
+        if masks is None:
+            board = board if board else '.' * 16
+            masks = tuple(sum(1 << square for square, mark in enumerate(board) if mark == player[0])
+                          for player in self.players)
+        self.masks = masks
+        self.enabled = enabled
+        self._key = ZOBRIST.hash(self.board, self.players[enabled]) if key is None else key
+
+    @property
+    def board(self):
+        xs, os = self.masks
+        return ''.join('X' if xs >> square & 1 else 'O' if os >> square & 1 else '.' for square in range(16))
+
+    def active_player(self):
+        return self.players[self.enabled]
+
+    @cached_property('__moves__')
+    def moves(self):
+        free = ~(self.masks[0] | self.masks[1])
+        return [move for move in self.MOVES if free >> move & 1]
+
+    @classmethod
+    def score(cls, marks):
+        """ Returns the score for the given mask of a player's marks. A full line of length n scores
+            n - 2, and a line with 3 consecutive marks scores 1.
+        """
+        score = 0
+        for line, length, triplets in cls.LINES:
+            count = bit_count(marks & line)
+            if count == length:
+                score += length - 2
+            elif count >= 3 and [t for t in triplets if marks & t == t]:
+                score += 1
+        return score
+
+    def results(self):
+        xs, os = self.masks
+        if xs | os == self.FULL_MASK:
+            return game_result('Xs', self.players, self.score(xs) - self.score(os))
+        else:
+            return None
+
+    def order_moves(self, moves):
+        return sorted(moves, key=self.SQUARE_LINES.__getitem__, reverse=True)
+
+    def batch(self, count):
+        return BatchCuanteti(self, count) if NUMPY_AVAILABLE else None
+
+    def next(self, move):
+        square = 1 << move
+        xs, os = self.masks
+        masks = (xs | square, os) if not self.enabled else (xs, os | square)
+        key = self._key ^ ZOBRIST.squares[move][self.players[self.enabled][0]] ^ ZOBRIST_TURN
+        return BitboardCuanteti(None, (self.enabled + 1) % 2, key, masks)
+
+    def apply(self, move):
+        square = 1 << move
+        xs, os = self.masks
+        self.__dict__.setdefault('__undo__', []).append((self.masks, self._key))
+        self.__dict__.pop('__moves__', None)
+        self.__dict__.pop('__canonical__', None)
+        self.masks = (xs | square, os) if not self.enabled else (xs, os | square)
+        self._key ^= ZOBRIST.squares[move][self.players[self.enabled][0]] ^ ZOBRIST_TURN
+        self.enabled = (self.enabled + 1) % 2
+        return self
+
+    def undo(self):
+        self.masks, self._key = self.__dict__['__undo__'].pop()
+        self.enabled = (self.enabled + 1) % 2
+        self.__dict__.pop('__moves__', None)
+        self.__dict__.pop('__canonical__', None)
+
+    def key(self):
+        return self._key
+
+    @cached_property('__canonical__')
+    def _canonical(self):
+        """ Returns the canonical key and the symmetry that transforms the board into its canonical
+            form. Move codes are squares of the canonical board.
+        """
+        board, symmetry = canonical_board(self.board, 4, 4)
+        return ZOBRIST.hash(board, self.players[self.enabled]), symmetry
+
+    def canonical_key(self):
+        return self._canonical()[0]
+
+    def canonical_move(self, move):
+        return self._canonical()[1].index(move)
+
+    def original_move(self, code):
+        return self.MOVES[self._canonical()[1][code]]
+
+    def __hash__(self):
+        return self._key
 
     def __str__(self):
         return print_board(self.board.replace('.', ' '), 4, 4, '-', '|', '+')
@@ -53,6 +227,37 @@ class Cuanteti(Game):
         return '%s[%s]' % (self.players[self.enabled][0], self.board)
 
 
+class BatchCuanteti(PlacementBatchGame):
+    """ A batch of Cuanteti game states, to play many random playouts at once with NumPy (see
+        `adversarial_search.batch`).
+    """
+    # Lines of 3 or more squares.
+    LINES = tuple(tuple(line) for line in board_line_squares(4, 4) if len(line) > 2)
+
+    def _values(self, boards):
+        finished = (boards != 0).all(axis=1)
+        if not finished.any():
+            return numpy.zeros(len(boards), dtype=numpy.int32), finished
+        return self._score(boards == 1) - self._score(boards == 2), finished
+
+    @classmethod
+    def _score(cls, marks):
+        """ Returns the score for the given boolean array of a player's marks (see
+            `BitboardCuanteti.score`).
+        """
+        score = numpy.zeros(len(marks), dtype=numpy.int32)
+        for line in cls.LINES:
+            triplets = numpy.zeros(len(marks), dtype=bool)
+            for i in range(len(line) - 2):
+                triplets |= marks[:, line[i:i + 3]].all(axis=1)
+            score += numpy.where(marks[:, line].all(axis=1), len(line) - 2, triplets)
+        return score
+
+
+ZOBRIST = ZobristTable(16, 'XO', Cuanteti.PLAYERS, Cuanteti.__name__)
+ZOBRIST_TURN = ZOBRIST.turn(*Cuanteti.PLAYERS)
+
+
 # Quick test #######################################################################################
 
 def run_test_game(agent1=None, agent2=None):
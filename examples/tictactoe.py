@@ -1,18 +1,24 @@
 # -*- coding: utf-8 -*-
 from adversarial_search import Game
-from adversarial_search.utils import coord_id, board_lines, print_board, game_result, cached_property, \
-    cached_indexed_property
+from adversarial_search.batch import NUMPY_AVAILABLE, PlacementBatchGame
+from adversarial_search.utils import coord_id, board_line_contents, print_board, game_result, cached_property, \
+    lru_indexed_property, ZobristTable, board_line_squares, canonical_board
 
 
 class TicTacToe(Game):
     """ Game component for TicTacToe.
     """
     PLAYERS = ('Xs', 'Os')
+    # Number of lines each square belongs to, used to order moves.
+    SQUARE_LINES = (3, 2, 3, 2, 4, 2, 3, 2, 3)
 
-    def __init__(self, board=None, enabled=0):
+    def __init__(self, board=None, enabled=0, key=None):
+        """ The key is the Zobrist hash of the game state, if it is already known.
+        """
         Game.__init__(self, *TicTacToe.PLAYERS)
         self.board = board if board else '.' * 9
         self.enabled = enabled
+        self._key = ZOBRIST.hash(self.board, self.players[enabled]) if key is None else key
 
     class _Move(int):
         def __str__(self):
@@ -28,18 +34,64 @@ class TicTacToe(Game):
         return [self._Move(square) for square in range(9) if self.board[square] == '.']
 
     def results(self):
-        lines = [ln for ln in board_lines(self.board, 3, 3) if len(ln) == 3]
+        lines = board_line_contents(self.board, 3, 3, 3)
         result_xs = len([ln for ln in lines if ln == 'XXX']) - len([ln for ln in lines if ln == 'OOO'])
         if not result_xs and [ln for ln in lines if '.' in ln]:
             result_xs = None
         return game_result('Xs', self.players, result_xs)
 
-    @cached_indexed_property('__next__')
+    def order_moves(self, moves):
+        return sorted(moves, key=self.SQUARE_LINES.__getitem__, reverse=True)
+
+    def batch(self, count):
+        return BatchTicTacToe(self, count) if NUMPY_AVAILABLE else None
+
+    @lru_indexed_property(maxsize=2 ** 14)
     def next(self, move):
         board_list = list(self.board)
         enabled_player = self.players[self.enabled]
         board_list[move] = enabled_player[0]
-        return TicTacToe(''.join(board_list), (self.enabled + 1) % 2)
+        key = self._key ^ ZOBRIST.squares[move][enabled_player[0]] ^ ZOBRIST_TURN
+        return TicTacToe(''.join(board_list), (self.enabled + 1) % 2, key)
+
+    def apply(self, move):
+        mark = self.players[self.enabled][0]
+        self.__dict__.setdefault('__undo__', []).append((self.board, self._key))
+        self.__dict__.pop('__moves__', None)
+        self.__dict__.pop('__canonical__', None)
+        self.board = self.board[:move] + mark + self.board[move + 1:]
+        self._key ^= ZOBRIST.squares[move][mark] ^ ZOBRIST_TURN
+        self.enabled = (self.enabled + 1) % 2
+        return self
+
+    def undo(self):
+        self.board, self._key = self.__dict__['__undo__'].pop()
+        self.enabled = (self.enabled + 1) % 2
+        self.__dict__.pop('__moves__', None)
+        self.__dict__.pop('__canonical__', None)
+
+    def key(self):
+        return self._key
+
+    @cached_property('__canonical__')
+    def _canonical(self):
+        """ Returns the canonical key and the symmetry that transforms the board into its canonical
+            form. Move codes are squares of the canonical board.
+        """
+        board, symmetry = canonical_board(self.board, 3, 3)
+        return ZOBRIST.hash(board, self.players[self.enabled]), symmetry
+
+    def canonical_key(self):
+        return self._canonical()[0]
+
+    def canonical_move(self, move):
+        return self._canonical()[1].index(move)
+
+    def original_move(self, code):
+        return self._Move(self._canonical()[1][code])
+
+    def __hash__(self):
+        return self._key
 
     def __str__(self):
         return print_board(self.board.replace('.', ' '), 3, 3, '-', '|', '+')
@@ -55,6 +107,127 @@ class TicTacToe(Game):
         return board_value if agent.player_type == 'Xs' else -board_value
 
 
+class BitboardTicTacToe(Game):
+    """ TicTacToe with the board stored as an integer bit mask for each player, where bit i is set if
+        the player has marked square i. It has the same interface as TicTacToe, but it is faster.
+    """
+    PLAYERS = TicTacToe.PLAYERS
+    SQUARE_LINES = TicTacToe.SQUARE_LINES
+    FULL_MASK = (1 << 9) - 1
+    WIN_MASKS = tuple(sum(1 << square for square in line) for line in board_line_squares(3, 3) if len(line) == 3)
+    MOVES = tuple(TicTacToe._Move(square) for square in range(9))
+
+    def __init__(self, board=None, enabled=0, key=None, masks=None):
+        """ The board can be given as a string, like in TicTacToe, or as a tuple with the masks of
+            both players.
+        """
+        Game.__init__(self, *BitboardTicTacToe.PLAYERS)
+        if masks is None:
+            board = board if board else '.' * 9
+            masks = tuple(sum(1 << square for square, mark in enumerate(board) if mark == player[0])
+                          for player in self.players)
+        self.masks = masks
+        self.enabled = enabled
+        self._key = ZOBRIST.hash(self.board, self.players[enabled]) if key is None else key
+
+    @property
+    def board(self):
+        xs, os = self.masks
+        return ''.join('X' if xs >> square & 1 else 'O' if os >> square & 1 else '.' for square in range(9))
+
+    def active_player(self):
+        return self.players[self.enabled]
+
+    @cached_property('__moves__')
+    def moves(self):
+        if self.results():  # In order to avoid returning both moves and results.
+            return None
+        free = ~(self.masks[0] | self.masks[1])
+        return [move for move in self.MOVES if free >> move & 1]
+
+    def results(self):
+        xs, os = self.masks
+        result_xs = len([m for m in self.WIN_MASKS if xs & m == m]) - len([m for m in self.WIN_MASKS if os & m == m])
+        if not result_xs and xs | os != self.FULL_MASK:
+            result_xs = None
+        return game_result('Xs', self.players, result_xs)
+
+    def order_moves(self, moves):
+        return sorted(moves, key=self.SQUARE_LINES.__getitem__, reverse=True)
+
+    def batch(self, count):
+        return BatchTicTacToe(self, count) if NUMPY_AVAILABLE else None
+
+    def next(self, move):
+        square = 1 << move
+        xs, os = self.masks
+        masks = (xs | square, os) if not self.enabled else (xs, os | square)
+        key = self._key ^ ZOBRIST.squares[move][self.players[self.enabled][0]] ^ ZOBRIST_TURN
+        return BitboardTicTacToe(None, (self.enabled + 1) % 2, key, masks)
+
+    def apply(self, move):
+        square = 1 << move
+        xs, os = self.masks
+        self.__dict__.setdefault('__undo__', []).append((self.masks, self._key))
+        self.__dict__.pop('__moves__', None)
+        self.__dict__.pop('__canonical__', None)
+        self.masks = (xs | square, os) if not self.enabled else (xs, os | square)
+        self._key ^= ZOBRIST.squares[move][self.players[self.enabled][0]] ^ ZOBRIST_TURN
+        self.enabled = (self.enabled + 1) % 2
+        return self
+
+    def undo(self):
+        self.masks, self._key = self.__dict__['__undo__'].pop()
+        self.enabled = (self.enabled + 1) % 2
+        self.__dict__.pop('__moves__', None)
+        self.__dict__.pop('__canonical__', None)
+
+    def key(self):
+        return self._key
+
+    @cached_property('__canonical__')
+    def _canonical(self):
+        """ Returns the canonical key and the symmetry that transforms the board into its canonical
+            form. Move codes are squares of the canonical board.
+        """
+        board, symmetry = canonical_board(self.board, 3, 3)
+        return ZOBRIST.hash(board, self.players[self.enabled]), symmetry
+
+    def canonical_key(self):
+        return self._canonical()[0]
+
+    def canonical_move(self, move):
+        return self._canonical()[1].index(move)
+
+    def original_move(self, code):
+        return self.MOVES[self._canonical()[1][code]]
+
+    def __hash__(self):
+        return self._key
+
+    def __str__(self):
+        return print_board(self.board.replace('.', ' '), 3, 3, '-', '|', '+')
+
+    def __repr__(self):
+        return '%s[%s]' % (self.players[self.enabled][0], self.board)
+
+
+class BatchTicTacToe(PlacementBatchGame):
+    """ A batch of TicTacToe game states, to play many random playouts at once with NumPy (see
+        `adversarial_search.batch`).
+    """
+    LINES = tuple(tuple(line) for line in board_line_squares(3, 3) if len(line) == 3)
+
+    def _values(self, boards):
+        lines = boards[:, self.LINES]
+        values = (lines == 1).all(axis=2).sum(axis=1) - (lines == 2).all(axis=2).sum(axis=1)
+        return values, (values != 0) | (boards != 0).all(axis=1)
+
+
+ZOBRIST = ZobristTable(9, 'XO', TicTacToe.PLAYERS, TicTacToe.__name__)
+ZOBRIST_TURN = ZOBRIST.turn(*TicTacToe.PLAYERS)
+
+
 # Quick test #######################################################################################
 
 def run_test_game(agent1=None, agent2=None):
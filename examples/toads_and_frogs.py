@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from adversarial_search import Game
-from adversarial_search.utils import coord_id, print_board, game_result
+from adversarial_search.utils import coord_id, print_board, game_result, cached_property, ZobristTable
 
 
 class ToadsFrogs(Game):
@@ -9,13 +9,16 @@ class ToadsFrogs(Game):
 
     PLAYERS = ('Toads', 'Frogs')
 
-    def __init__(self, board=None, enabled=0, chips_per_player=3, empty_spaces=2):
+    def __init__(self, board=None, enabled=0, chips_per_player=3, empty_spaces=2, key=None):
+        """ The key is the Zobrist hash of the game state, if it is already known.
+        """
         Game.__init__(self, *ToadsFrogs.PLAYERS)
         if board:
             self.board = board
         else:
             self.board = 'T' * chips_per_player + '_' * empty_spaces + 'F' * chips_per_player
         self.enabled = enabled
+        self._key = zobrist_table(len(self.board)).hash(self.board, self.players[enabled]) if key is None else key
 
     def active_player(self):
         return self.players[self.enabled]
@@ -53,7 +56,57 @@ class ToadsFrogs(Game):
         else:  # A frog moves
             position = move - 1 if board_list[move - 1] == '_' else move - 2
         board_list[position] = enabled_player[0]
-        return ToadsFrogs(''.join(board_list), (self.enabled + 1) % 2)
+        zobrist = zobrist_table(len(self.board))
+        piece = enabled_player[0]
+        key = self._key ^ zobrist.squares[move][piece] ^ zobrist.squares[position][piece] ^ zobrist.turn(*self.players)
+        return ToadsFrogs(''.join(board_list), (self.enabled + 1) % 2, key=key)
+
+    def apply(self, move):
+        piece = self.players[self.enabled][0]
+        if not self.enabled:  # A toad moves
+            position = move + 1 if self.board[move + 1] == '_' else move + 2
+        else:  # A frog moves
+            position = move - 1 if self.board[move - 1] == '_' else move - 2
+        self.__dict__.setdefault('__undo__', []).append((self.board, self._key))
+        self.__dict__.pop('__canonical__', None)
+        board_list = list(self.board)
+        board_list[move], board_list[position] = '_', piece
+        self.board = ''.join(board_list)
+        zobrist = zobrist_table(len(self.board))
+        self._key ^= zobrist.squares[move][piece] ^ zobrist.squares[position][piece] ^ zobrist.turn(*self.players)
+        self.enabled = (self.enabled + 1) % 2
+        return self
+
+    def undo(self):
+        self.board, self._key = self.__dict__['__undo__'].pop()
+        self.enabled = (self.enabled + 1) % 2
+        self.__dict__.pop('__canonical__', None)
+
+    def key(self):
+        return self._key
+
+    @cached_property('__canonical__')
+    def _canonical(self):
+        """ Returns the canonical key and whether the canonical form is the mirror of the game state:
+            the board reversed, with toads and frogs swapped, and the other player enabled. Move
+            codes are positions in the canonical board.
+        """
+        mirror = self.board[::-1].translate(MIRROR)
+        if (mirror, 1 - self.enabled) < (self.board, self.enabled):
+            return zobrist_table(len(self.board)).hash(mirror, self.players[1 - self.enabled]), True
+        return self._key, False
+
+    def canonical_key(self):
+        return self._canonical()[0]
+
+    def canonical_move(self, move):
+        return len(self.board) - 1 - move if self._canonical()[1] else int(move)
+
+    def original_move(self, code):
+        return self._Move(len(self.board) - 1 - code if self._canonical()[1] else code)
+
+    def __hash__(self):
+        return self._key
 
     def __str__(self):
         return print_board(self.board, 1, len(self.board) + 1)
@@ -62,6 +115,22 @@ class ToadsFrogs(Game):
         return '%s[%s]' % (self.players[self.enabled][0], self.board)
 
 
+# Swaps toads and frogs, to mirror boards.
+MIRROR = str.maketrans('TF', 'FT')
+
+__ZOBRIST_TABLES__ = {}
+
+
+def zobrist_table(length):
+    """ Returns the Zobrist table for boards of the given length.
+    """
+    table = __ZOBRIST_TABLES__.get(length)
+    if table is None:
+        table = ZobristTable(length, 'TF', ToadsFrogs.PLAYERS, '%s/%d' % (ToadsFrogs.__name__, length))
+        __ZOBRIST_TABLES__[length] = table
+    return table
+
+
 # Quick test #######################################################################################
 
 def run_test_game(agent1=None, agent2=None):
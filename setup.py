@@ -28,5 +28,8 @@ setuptools.setup(
         "Topic :: Scientific/Engineering :: Artificial Intelligence",
         "Topic :: Software Development :: Libraries :: Python Modules",
     ],
-    python_requires='>=3.5',
+    python_requires='>=3.7',
+    extras_require={
+        'batch': ['numpy'],  # Batch playouts for Monte Carlo agents.
+    },
 )
@@ -1,6 +1,7 @@
 """ Test cases for module agents.
 """
 import random
+import time
 from itertools import combinations
 from unittest.mock import patch, call, MagicMock
 
@@ -13,13 +14,20 @@ Agent = a_s.agents.Agent
 RandomAgent = a_s.agents.RandomAgent
 MiniMaxAgent = a_s.agents.MiniMaxAgent
 AlphaBetaAgent = a_s.agents.AlphaBetaAgent
+NegaScoutAgent = a_s.agents.NegaScoutAgent
 MCTSAgent = a_s.agents.MCTSAgent
+UCTAgent = a_s.agents.UCTAgent
+TranspositionTable = a_s.agents.TranspositionTable
+ordering = a_s.agents.ordering
+SearchStats = a_s.agents.SearchStats
 
 AGENTS = [
     RandomAgent,
     MiniMaxAgent,
     AlphaBetaAgent,
+    NegaScoutAgent,
     MCTSAgent,
+    UCTAgent,
 ]
 
 
@@ -296,6 +304,451 @@ class TestAlphaBetaAgent:
         mock__minimax.assert_has_calls(expected_calls)
 
 
+class TestNegaScoutAgent:
+    @pytest.mark.parametrize('fail_soft', [True, False])
+    @pytest.mark.parametrize('table_size', [None, 2 ** 12])
+    def test_same_values(self, fail_soft, table_size):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe('X.O......', 0)
+        minimax = MiniMaxAgent(horizon=4, heuristic=TicTacToe.simple_heuristic)
+        negascout = NegaScoutAgent(horizon=4, heuristic=TicTacToe.simple_heuristic, fail_soft=fail_soft,
+                                   transposition_table=table_size and TranspositionTable(table_size),
+                                   move_ordering=ordering.default_move_ordering())
+        minimax.match_begins('Xs', game)
+        negascout.match_begins('Xs', game)
+        for move in game.moves():
+            assert minimax._minimax(game.next(move), 1) == negascout._minimax(game.next(move), 1)
+
+    @pytest.mark.parametrize('fail_soft', [True, False])
+    def test_window(self, fail_soft):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe('XX.OO....', 1)  # Os to move, Xs win if they do not block.
+        agent = NegaScoutAgent(horizon=2, heuristic=TicTacToe.simple_heuristic, fail_soft=fail_soft)
+        agent.match_begins('Xs', game)
+        exact = agent._minimax(game, 0)
+        assert exact == agent._minimax(game, 0, exact - 1, exact + 1)
+        low = agent._minimax(game, 0, exact + 1, exact + 2)  # Fails low.
+        assert low <= exact + 1
+        if not fail_soft:
+            assert low == exact + 1
+
+    def test_winning_move(self):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe('XX.OO....', 0)
+        agent = NegaScoutAgent(horizon=3, random=1)
+        agent.match_begins('Xs', game)
+        assert agent.select_move(game) == 2
+
+    def test_node_reduction(self):
+        from examples.cuanteti import Cuanteti
+
+        def heuristic(agent, game, depth):
+            value = sum(ln.count('XX') - ln.count('OO') for ln in a_s.utils.board_lines(game.board, 4, 4))
+            return value if agent.player_type == 'Xs' else -value
+
+        game = Cuanteti('X....O....X..O..', 0)
+        agents = [AlphaBetaAgent(horizon=4, heuristic=heuristic, random=1),
+                  NegaScoutAgent(horizon=4, heuristic=heuristic, random=1, fail_soft=False),
+                  NegaScoutAgent(horizon=4, heuristic=heuristic, random=1)]
+        for agent in agents:
+            agent.match_begins('Xs', game)
+            agent.select_move(game)
+        alphabeta, fail_hard, fail_soft = [agent.search_stats.nodes for agent in agents]
+        assert fail_soft <= fail_hard < alphabeta
+
+
+class TestApplyUndo:
+    @pytest.mark.parametrize('agent_class', [MiniMaxAgent, AlphaBetaAgent, NegaScoutAgent, MCTSAgent, UCTAgent])
+    def test_same_decisions(self, agent_class):
+        """ Agents must decide the same whether moves are applied in place or not, without changing
+            the game state they are given.
+        """
+        from examples.cuanteti import Cuanteti
+
+        class CuantetiNext(Cuanteti):
+            apply = a_s.Game.apply
+
+        decisions = []
+        for game in (Cuanteti('X....O....X..O..', 0), CuantetiNext('X....O....X..O..', 0)):
+            agent = agent_class(random=1)
+            agent.match_begins('Xs', game)
+            decisions.append((agent.select_move(game), agent.search_stats.nodes))
+            assert repr(game) == 'X[X....O....X..O..]' and game.key() == Cuanteti(game.board).key()
+            assert not hasattr(game, '__undo__')
+        assert decisions[0] == decisions[1]
+
+
+class TestUCTAgent:
+    def test_init(self):
+        agent = UCTAgent('test agent', 5, 1)
+        assert isinstance(agent, MCTSAgent)
+        assert agent.simulationCount == 5
+        with pytest.raises(ValueError):
+            UCTAgent(expansion='none')
+        with pytest.raises(ValueError):
+            UCTAgent(final_selection='min')
+
+    @pytest.mark.parametrize('expansion, final_selection', [
+        ('single', 'robust'), ('single', 'max'), ('full', 'robust'), ('full', 'max')])
+    def test_winning_move(self, expansion, final_selection):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe('XX.OO....', 0)
+        agent = UCTAgent(simulation_count=50, random=1, expansion=expansion, final_selection=final_selection)
+        agent.match_begins('Xs', game)
+        assert agent.select_move(game) == 2
+
+    def test_tree_reuse(self):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe()
+        agent = UCTAgent(simulation_count=20, random=1)
+        agent.match_begins('Xs', game)
+        move = agent.select_move(game)
+        child = agent.root.child(move)
+        visits = child.visits
+        agent.match_moves(game, move, game.next(move))
+        assert agent.root is child
+        assert child.parent is None
+        reply = game.next(move).moves()[0]
+        grandchild = child.child(reply)
+        agent.match_moves(game.next(move), reply, game.next(move).next(reply))
+        assert agent.root is grandchild
+        agent.select_move(grandchild.game)
+        assert agent.root is grandchild
+        assert visits > 0
+
+    def test_no_tree_reuse(self):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe()
+        agent = UCTAgent(simulation_count=2, random=1, reuse_tree=False)
+        agent.match_begins('Xs', game)
+        move = agent.select_move(game)
+        agent.match_moves(game, move, game.next(move))
+        assert agent.root is None
+
+
+class TestRootParallel:
+    @pytest.mark.parametrize('agent_class', [MCTSAgent, UCTAgent])
+    def test_winning_move(self, agent_class):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe('XX.OO....', 0)
+        agent = agent_class(simulation_count=30, random=1, workers=2)
+        agent.match_begins('Xs', game)
+        assert agent.select_move(game) == 2
+        assert a_s.utils.process_pool(2) is a_s.utils.process_pool(2)
+
+    @pytest.mark.parametrize('agent_class', [MCTSAgent, UCTAgent])
+    def test_profile(self, agent_class):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe('XX.OO....', 0)
+        agent = agent_class(simulation_count=10, random=1, workers=2)
+        agent.profile = True
+        agent.match_begins('Xs', game)
+        assert agent.select_move(game) in game.moves()
+        assert agent.search_stats.times['next'] > 0  # Measured in the workers.
+
+    @patch('adversarial_search.agents.mcts.process_pool')
+    def test_merge(self, mock_process_pool):
+        mock_process_pool.return_value.submit.side_effect = [
+            MagicMock(**{'result.return_value': ([(3, 1), (3, 2)], SearchStats())}),
+            MagicMock(**{'result.return_value': ([(3, 2), (3, -2)], SearchStats())}),
+        ]
+        agent = MCTSAgent(workers=2)
+        assert agent._parallel_root_statistics(['1', '2'], TEST_GAME) == [(6, 3), (6, 0)]
+        mock_process_pool.assert_called_once_with(2)
+
+    def test_pickling(self):
+        import pickle
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe()
+        agent = UCTAgent(simulation_count=2, random=1)
+        agent.match_begins('Xs', game)
+        agent.select_move(game)
+        assert game.__moves__
+        assert pickle.loads(pickle.dumps(agent)).root is None
+        assert not hasattr(pickle.loads(pickle.dumps(game)), '__moves__')
+
+
+class TestIterativeDeepening:
+    @pytest.mark.parametrize('agent_class', [MiniMaxAgent, AlphaBetaAgent])
+    def test_time_limit(self, agent_class):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe()
+        agent = agent_class(time_limit=0.05, random=1)
+        agent.match_begins('Xs', game)
+        start = time.perf_counter()
+        move = agent.select_move(game)
+        assert time.perf_counter() - start < 1
+        assert move in game.moves()
+        assert agent.horizon == 3
+        assert agent._deadline is None
+
+    @pytest.mark.parametrize('agent_class', [MiniMaxAgent, AlphaBetaAgent])
+    def test_max_depth(self, agent_class):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe('XX.OO....', 0)  # Xs win playing a3.
+        agent = agent_class(time_limit=60, max_depth=2, random=1)
+        agent.match_begins('Xs', game)
+        with patch.object(agent, '_minimax', side_effect=agent._minimax) as mock__minimax:
+            assert agent.select_move(game) == 2
+        root_calls = [c for c in mock__minimax.call_args_list if c[0][1] == 1]
+        assert len(root_calls) == 2 * len(game.moves())
+
+    def test_time_left(self):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe()
+        agent = MiniMaxAgent(time_limit=60, random=1)
+        agent.match_begins('Xs', game)
+        start = time.perf_counter()
+        move = agent.select_move(game, time_left=0.1)  # The time left for the move caps the time limit.
+        assert time.perf_counter() - start < 1
+        assert move in game.moves()
+        assert agent.time_left == 0.1
+
+    @pytest.mark.parametrize('agent_class', [MiniMaxAgent, AlphaBetaAgent, NegaScoutAgent])
+    def test_transposition_table_depth(self, agent_class):
+        from examples.cuanteti import Cuanteti
+
+        game = Cuanteti()
+        rnd = random.Random(0)
+        while len(game.moves()) > 12:
+            game = game.next(rnd.choice(game.moves()))
+        depths = []
+        for table in (None, TranspositionTable()):
+            agent = agent_class(time_limit=60, max_depth=3, random=1, transposition_table=table)
+            agent.match_begins(game.active_player(), game)
+            for _ in range(2):  # Entries of the first decision are hits in the second.
+                with patch.object(agent, '_root_search', side_effect=agent._root_search) as mock__root_search:
+                    agent.select_move(game)
+                depths.append(mock__root_search.call_count)
+        assert depths == [3, 3, 3, 3]  # Hits do not hide the horizon from iterative deepening.
+
+    def test_complete_search(self):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe('XOX.O....', 0)  # Xs must block at b3.
+        agent = AlphaBetaAgent(time_limit=60, random=1)
+        agent.match_begins('Xs', game)
+        assert agent.select_move(game) == 7
+        agent = AlphaBetaAgent(time_limit=60, random=1, transposition_table=TranspositionTable())
+        agent.match_begins('Xs', game)
+        start = time.perf_counter()
+        assert agent.select_move(game) == agent.select_move(game) == 7  # Complete entries end the search too.
+        assert time.perf_counter() - start < 1
+        assert agent.transposition_table.probe(game.next(7)).depth == a_s.agents.transposition.COMPLETE
+
+
+class TestMoveOrdering:
+    def test_killer_moves(self):
+        killers = ordering.KillerMoveOrdering(slots=2)
+        for move in ['1', '2', '1', '3']:
+            killers.cutoff(None, TEST_GAME, move, 2)
+        assert killers.killers == {2: ['3', '1']}
+        assert killers.order(None, TEST_GAME, ['0', '1', '2', '3'], 2) == ['3', '1', '0', '2']
+        assert killers.order(None, TEST_GAME, ['0', '1', '2', '3'], 1) == ['0', '1', '2', '3']
+
+    @patch.object(DummyGame, 'active_player', return_value='A')
+    def test_history(self, mock_active_player):
+        agent = AlphaBetaAgent(horizon=4)
+        history = ordering.HistoryMoveOrdering()
+        history.cutoff(agent, TEST_GAME, '2', 3)
+        history.cutoff(agent, TEST_GAME, '3', 1)
+        assert history.order(agent, TEST_GAME, ['1', '2', '3'], 2) == ['3', '2', '1']
+        history.clear()
+        assert history.order(agent, TEST_GAME, ['1', '2', '3'], 2) == ['1', '2', '3']
+
+    def test_pv(self):
+        pv = ordering.PVMoveOrdering(max_size=1, key=id)
+        pv.best(None, TEST_GAME, '3', 1)
+        pv.best(None, DummyGame(), '2', 1)  # Table is full.
+        assert pv.order(None, TEST_GAME, ['1', '2', '3'], 1) == ['3', '1', '2']
+        assert pv.order(None, DummyGame(), ['1', '2', '3'], 1) == ['1', '2', '3']
+
+    def test_game_ordering(self):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe()
+        assert ordering.GameMoveOrdering().order(None, game, game.moves(), 1)[:5] == [4, 0, 2, 6, 8]
+
+    def test_node_reduction(self):
+        from examples.cuanteti import Cuanteti
+
+        def heuristic(agent, game, depth):
+            value = sum(ln.count('XX') - ln.count('OO') for ln in a_s.utils.board_lines(game.board, 4, 4))
+            return value if agent.player_type == 'Xs' else -value
+
+        game = Cuanteti('X....O....X..O..', 0)
+        plain = AlphaBetaAgent(horizon=4, heuristic=heuristic, random=1)
+        ordered = AlphaBetaAgent(horizon=4, heuristic=heuristic, random=1,
+                                 move_ordering=ordering.default_move_ordering())
+        for agent in (plain, ordered):
+            agent.match_begins('Xs', game)
+            agent.select_move(game)
+        assert ordered.search_stats.nodes * 2 < plain.search_stats.nodes
+        assert ordered.search_stats.cutoffs > 0
+        rates = [agent.search_stats.first_move_cutoffs / agent.search_stats.cutoffs for agent in (plain, ordered)]
+        assert rates[0] < rates[1]
+
+
+class TestTranspositionTable:
+    def setup_method(self):
+        self.table = TranspositionTable(4, key=int)
+
+    def test_init(self):
+        with pytest.raises(ValueError):
+            TranspositionTable(0)
+        assert len(self.table) == 0
+
+    def test_probe_store(self):
+        assert self.table.probe(1) is None
+        assert self.table.store(1, 0.5, 2, a_s.agents.transposition.LOWER, 'm')
+        entry = self.table.probe(1)
+        assert (entry.value, entry.depth, entry.flag, entry.move) == (0.5, 2, a_s.agents.transposition.LOWER, 'm')
+        assert self.table.counters() == {'hits': 1, 'misses': 1, 'stores': 1, 'evictions': 0}
+
+    def test_depth_preferred(self):
+        self.table.store(1, 0.5, 3)
+        assert not self.table.store(5, 0.1, 2)  # Same slot, shallower search.
+        assert self.table.probe(1).value == 0.5
+        assert self.table.store(5, 0.1, 3)
+        assert self.table.probe(1) is None
+        assert self.table.probe(5).value == 0.1
+        assert self.table.evictions == 1
+
+    def test_always_replace(self):
+        table = TranspositionTable(4, replacement='always', key=int)
+        table.store(1, 0.5, 3)
+        assert table.store(5, 0.1, 0)
+        assert table.probe(5).value == 0.1
+        assert table.evictions == 1
+
+    def test_clear(self):
+        self.table.store(1, 0.5, 3)
+        self.table.clear()
+        assert len(self.table) == 0
+        assert self.table.probe(1) is None
+
+    def test_canonical(self):
+        from examples.tictactoe import TicTacToe
+
+        table = TranspositionTable(2 ** 8, canonical=True)
+        table.store(TicTacToe('X........', 1), -0.5, 2, move=4)
+        table.store(TicTacToe('.X.......', 1), 0.0, 2, move=0)
+        entry = table.probe(TicTacToe('..X......', 1))  # Symmetric to the first game state.
+        assert (entry.value, entry.move) == (-0.5, 4)
+        assert table.probe(TicTacToe('...X.....', 1)).move in (0, 6)  # A corner next to the edge.
+        assert table.probe(TicTacToe('X........', 0)) is None
+
+    @pytest.mark.parametrize('canonical', [False, True])
+    @pytest.mark.parametrize('agent_class', [MiniMaxAgent, AlphaBetaAgent])
+    def test_same_values(self, agent_class, canonical):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe('X.O......', 0)
+        plain = agent_class(horizon=4, heuristic=TicTacToe.simple_heuristic)
+        cached = agent_class(horizon=4, heuristic=TicTacToe.simple_heuristic,
+                             transposition_table=TranspositionTable(2 ** 12, canonical=canonical))
+        plain.match_begins('Xs', game)
+        cached.match_begins('Xs', game)
+        for move in game.moves():
+            assert plain._minimax(game.next(move), 1) == cached._minimax(game.next(move), 1)
+        assert cached.transposition_table.hits > 0
+
+
+class TestSearchStats:
+    def test_add(self):
+        stats1, stats2 = SearchStats(), SearchStats()
+        stats1.nodes, stats1.max_depth, stats1.times['next'] = 10, 2, 0.5
+        stats2.nodes, stats2.max_depth, stats2.times['next'] = 5, 3, 0.25
+        stats1.add(stats2)
+        assert (stats1.nodes, stats1.max_depth, stats1.times['next']) == (15, 3, 0.75)
+        stats1.clear()
+        assert stats1.nodes == 0 and stats1.times['next'] == 0.0
+
+    def test_effective_branching_factor(self):
+        stats = SearchStats()
+        assert stats.effective_branching_factor == 0.0
+        stats.decisions, stats.nodes, stats.max_depth = 2, 128, 3
+        assert stats.effective_branching_factor == pytest.approx(4.0)
+        assert stats.as_dict()['effective_branching_factor'] == pytest.approx(4.0)
+
+    @pytest.mark.parametrize('agent_class', AGENTS[1:])
+    def test_agents(self, agent_class):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe('X.O......', 0)
+        agent = agent_class(random=1)
+        agent.match_begins('Xs', game)
+        agent.select_move(game)
+        first = agent.search_stats
+        agent.select_move(game)
+        stats = agent.search_stats
+        assert stats is not first
+        assert stats.decisions == 1
+        assert stats.nodes >= stats.leaves > 0
+        assert stats.max_depth > 0
+        assert stats.total_time > 0
+        assert agent.match_stats.decisions == 2
+        assert agent.match_stats.nodes == first.nodes + stats.nodes
+        agent.match_begins('Xs', game)
+        assert agent.match_stats.decisions == 0
+
+    def test_minimax(self):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe('X.O......', 0)
+        agent = MiniMaxAgent(horizon=2, random=1, heuristic=TicTacToe.simple_heuristic)
+        agent.match_begins('Xs', game)
+        agent.select_move(game)
+        # 7 moves at depth 1 and 7 * 6 at depth 2, all of them evaluated by the heuristic.
+        assert agent.search_stats.nodes == 49
+        assert agent.search_stats.leaves == agent.search_stats.heuristic_calls == 42
+        assert agent.search_stats.max_depth == 2
+
+    @pytest.mark.parametrize(
+        "active_player_returns, terminal_value_returns, call_args, cutoffs, first_move_cutoffs", [
+            (['A', ], [None, 5], [-INF, 3], 1, 1),
+            (['A', ], [None, 2, 5], [-INF, 3], 1, 0),
+            (['A', 'B', 'A', 'A', 'B', 'A'], [None, None, None, -1, 3, None, 5, None, None, -6, -4], [-INF, INF], 2, 2),
+        ], ids=['first_move', 'second_move', 'tree'])
+    @patch.object(DummyGame, 'active_player')
+    @patch.object(DummyGame, 'next', return_value=TEST_GAME)
+    @patch.object(DummyGame, 'moves', return_value=('1', '2'))
+    @patch.object(MiniMaxAgent, 'terminal_value')
+    def test_cutoffs(self, mock_terminal_value, mock_moves, mock_next, mock_active_player,
+                     active_player_returns, terminal_value_returns, call_args, cutoffs, first_move_cutoffs):
+        mock_active_player.side_effect = active_player_returns
+        mock_terminal_value.side_effect = terminal_value_returns
+        agent = AlphaBetaAgent()
+        agent.player_type = 'A'
+        agent._minimax(TEST_GAME, 1, *call_args)
+        assert agent.search_stats.cutoffs == cutoffs
+        assert agent.search_stats.first_move_cutoffs == first_move_cutoffs
+
+    def test_profile(self):
+        from examples.tictactoe import TicTacToe
+
+        game = TicTacToe('X.O......', 0)
+        agent = AlphaBetaAgent(horizon=3, random=1, heuristic=TicTacToe.simple_heuristic)
+        agent.match_begins('Xs', game)
+        agent.select_move(game)
+        assert all(value == 0.0 for value in agent.search_stats.times.values())
+        agent.profile = True
+        assert agent.select_move(game) in game.moves()
+        assert all(value > 0.0 for value in agent.search_stats.times.values())
+
+
 class TestSanityAgents:
     """ Basic test cases for agents behaviour.
     """
@@ -324,7 +777,9 @@ class TestSanityAgents:
     @pytest.mark.parametrize('agent', [
         MiniMaxAgent,
         AlphaBetaAgent,
+        NegaScoutAgent,
         MCTSAgent,
+        UCTAgent,
     ])
     def test_agent_against_random(self, agent):
         # Statistically MiniMax based agents should beat random agents even without a proper heuristic.
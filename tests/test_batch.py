@@ -0,0 +1,73 @@
+""" Test cases for module batch and the batch implementations of the examples.
+"""
+import random
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from .context import adversarial_search as a_s  # noqa: E402
+from examples.cuanteti import Cuanteti, BitboardCuanteti  # noqa: E402
+from examples.tictactoe import TicTacToe, BitboardTicTacToe  # noqa: E402
+
+
+@pytest.mark.parametrize('game_class', [TicTacToe, Cuanteti, BitboardTicTacToe, BitboardCuanteti])
+def test_same_as_game(game_class):
+    """ Batches must behave exactly like the game states they copy.
+    """
+    rnd = random.Random(123)
+    count = 50
+    batch = game_class().batch(count)
+    games = [game_class() for _ in range(count)]
+    while True:
+        legal = batch.legal_moves()
+        for game, row in zip(games, legal):
+            assert sorted(game.moves() or []) == list(numpy.flatnonzero(row))
+        active = legal.any(axis=1)
+        if not active.any():
+            break
+        moves = numpy.zeros(count, dtype=int)
+        for i in numpy.flatnonzero(active):
+            moves[i] = rnd.choice(games[i].moves())
+            games[i] = games[i].next(moves[i])
+        batch.play(moves, active)
+    results = batch.results()
+    for game, row in zip(games, results):
+        assert [game.results()[player] for player in game.players] == list(row)
+    assert list(batch.plies) == [len(game.board) - game.board.count('.') for game in games]
+
+
+@pytest.mark.parametrize('game', [TicTacToe('XX.OO....', 0), Cuanteti('XOXOXOXOXOXOXOX.', 1)])
+def test_playouts(game):
+    batch = game.batch(100)
+    results = batch.playouts(seed=1)
+    assert results.shape == (100, 2)
+    assert (results.sum(axis=1) == 0).all()
+    assert (batch.plies >= 1).all()
+    assert not batch.legal_moves().any()
+    finished = game.next(game.moves()[0]).batch(10)  # Finished game states are left unchanged.
+    assert not finished.legal_moves().any()
+    assert (finished.playouts(seed=1) == finished.results()).all() and not finished.plies.any()
+
+
+def test_mcts():
+    game = TicTacToe('XX.OO....', 0)
+    agent = a_s.agents.MCTSAgent(simulation_count=200, random=1)
+    agent.match_begins('Xs', game)
+    assert agent.select_move(game) == 2
+    assert agent.search_stats.leaves == 200 * 5
+    assert agent.search_stats.max_depth > 1
+    scalar = a_s.agents.MCTSAgent(simulation_count=3, random=1, batch=False)
+    scalar.match_begins('Xs', game)
+    scalar.select_move(game)
+    assert scalar.search_stats.leaves == 3 * 5
+
+
+def test_unsupported():
+    from tests.test_game import Silly
+
+    assert Silly().batch(10) is None
+    game = Silly()
+    agent = a_s.agents.MCTSAgent(simulation_count=2, random=1)
+    agent.match_begins(game.active_player(), game)
+    assert agent.select_move(game) in game.moves()
@@ -0,0 +1,75 @@
+""" Test cases for module book and BookAgent.
+"""
+import math
+import pickle
+
+from .context import adversarial_search as a_s
+from examples.tictactoe import TicTacToe
+
+from adversarial_search import book
+from adversarial_search.tables import GameTable
+
+AlphaBetaAgent = a_s.agents.AlphaBetaAgent
+BookAgent = a_s.agents.BookAgent
+RandomAgent = a_s.agents.RandomAgent
+
+
+def build(path, plies=2):
+    GameTable.write(path, book.build_book(TicTacToe(), AlphaBetaAgent(horizon=4, random=1), plies))
+    return path
+
+
+class TestBook:
+    def test_build_book(self):
+        progress = []
+        entries = book.build_book(TicTacToe(), AlphaBetaAgent(horizon=2, random=1), 3,
+                                  lambda ply, count: progress.append((ply, count)))
+        assert progress == [(0, 1), (1, 3), (2, 12)]  # Symmetric game states count once.
+        assert len(entries) == 1 + 3 + 12
+        value, move, depth = entries[TicTacToe().canonical_key()]
+        assert math.isnan(value) and 0 <= move < 9 and depth == 0
+        assert entries[TicTacToe('X........', 1).canonical_key()][2] == 1
+        assert TicTacToe('..X......', 1).canonical_key() in entries
+
+    def test_main(self, tmp_path, capsys):
+        path = str(tmp_path / 'tictactoe.book')
+        assert book.main(['examples.tictactoe:TicTacToe', path, '--plies', '2', '--horizon', '2']) == 0
+        assert '4 game states in the book.' in capsys.readouterr().out
+        with GameTable(path) as table:
+            assert len(table) == 4
+
+
+class TestBookAgent:
+    def test_hits_misses(self, tmp_path):
+        agent = BookAgent(RandomAgent(random=1), build(str(tmp_path / 'tictactoe.book')))
+        assert agent.name == 'Book(RandomAgent)'
+        a_s.core.run_match(TicTacToe(), agent, RandomAgent(random=2))
+        assert agent.counters() == {'hits': 1, 'misses': agent.misses}
+        assert agent.misses >= 2  # Xs move at least three times.
+        a_s.core.run_match(TicTacToe(), RandomAgent(random=2), agent)
+        assert agent.hits == 2
+        assert agent.agent.player_type == agent.player_type == 'Os'
+
+    def test_book_moves(self, tmp_path):
+        path = build(str(tmp_path / 'tictactoe.book'))
+        with_book = BookAgent(AlphaBetaAgent(horizon=1, random=1), path)
+        game = TicTacToe('X........', 1)
+        with_book.match_begins('Os', game)
+        book_move = game.original_move(with_book.book[game.canonical_key()].move)
+        assert with_book.select_move(game) == book_move
+        other_moves = [move for move in game.moves() if move != book_move]
+        assert with_book.search_stats.nodes == 0
+        assert with_book.select_move(game, *other_moves) in other_moves  # The book move is not allowed.
+        assert with_book.counters() == {'hits': 1, 'misses': 1}
+        inner_stats = with_book.agent.search_stats
+        assert with_book.search_stats.nodes == inner_stats.nodes == len(other_moves)
+        assert with_book.search_stats.decisions == 1
+        assert with_book.search_stats.total_time >= inner_stats.total_time
+        assert with_book.match_stats.nodes == inner_stats.nodes and with_book.match_stats.decisions == 2
+
+    def test_pickling(self, tmp_path):
+        agent = BookAgent(RandomAgent(random=1), build(str(tmp_path / 'tictactoe.book'), 1))
+        agent = pickle.loads(pickle.dumps(agent))
+        agent.match_begins('Xs', TicTacToe())
+        agent.select_move(TicTacToe())
+        assert agent.hits == 1
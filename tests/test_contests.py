@@ -0,0 +1,520 @@
+""" Test cases for module _contests.
+"""
+import asyncio
+import csv
+import gzip
+import io
+import json
+import math
+import pickle
+import random
+import statistics
+import time
+
+import pytest
+
+from .context import adversarial_search as a_s
+from examples.tictactoe import TicTacToe
+
+from adversarial_search import _contests
+
+RandomAgent = a_s.agents.RandomAgent
+MCTSAgent = a_s.agents.MCTSAgent
+
+
+class Lottery(a_s.Game):
+    """ Three player game for testing purposes: each player picks a number once, and the highest
+        one wins. Ties are draws.
+    """
+
+    def __init__(self, picks=()):
+        a_s.Game.__init__(self, 'A', 'B', 'C')
+        self.picks = picks
+
+    def active_player(self):
+        return self.players[len(self.picks) % 3]
+
+    def moves(self):
+        return [] if len(self.picks) == 3 else [0, 1, 2]
+
+    def results(self):
+        if len(self.picks) < 3:
+            return {}
+        best = max(self.picks)
+        if self.picks.count(best) > 1:
+            return {player: 0 for player in self.players}
+        return {player: 1 if pick == best else -1 for player, pick in zip(self.players, self.picks)}
+
+    def next(self, move):
+        return Lottery(self.picks + (move,))
+
+    def __repr__(self):
+        return 'Lottery%r' % (self.picks,)
+
+
+class HighestAgent(a_s.agents.Agent):
+    """ Agent that always picks the highest move.
+    """
+
+    def _decision(self, moves, game=None):
+        return max(moves)
+
+
+def make_agents():
+    return [RandomAgent('Random_%d' % i, i) for i in range(3)] + [MCTSAgent('MCTS', 1, 7)]
+
+
+def totals(stats):
+    return {stats.keys[key]: (stats.matches_played[key], stats.matches_won[key], stats.result_sum[key])
+            for key in stats.keys}
+
+
+class TestContest:
+
+    def test_all_against_all(self):
+        agents = make_agents()
+        contest = _contests.AllAgainstAll_Contest(TicTacToe(), agents, 2)
+        steps = list(contest.run())
+        match_nums = [m for m, _, _, _ in steps[:-1]]
+        assert match_nums == sorted(match_nums)
+        assert len(set(match_nums)) == 4 * 3 * 2
+        assert steps[-1][2] is contest.stats
+        assert sum(contest.stats.matches_played[agent] for agent in agents) == 4 * 3 * 2 * 2
+
+    def test_seeded_serial(self):
+        stats1 = _contests.complete(_contests.AllAgainstAll_Contest(TicTacToe(), make_agents(), 2, seed=42))
+        stats1 = totals(stats1)
+        stats2 = totals(_contests.complete(_contests.AllAgainstAll_Contest(TicTacToe(), make_agents(), 2, seed=42)))
+        assert stats1 == stats2
+
+    @pytest.mark.parametrize('ordered', [True, False])
+    def test_parallel(self, ordered):
+        serial = _contests.AllAgainstAll_Contest(TicTacToe(), make_agents(), 2, seed=42)
+        serial_steps = list(serial.run())
+        agents = make_agents()
+        parallel = _contests.AllAgainstAll_Contest(TicTacToe(), agents, 2, seed=42, workers=2, ordered=ordered)
+        parallel_steps = list(parallel.run())
+        assert totals(serial.stats) == totals(parallel.stats)
+        assert len(serial_steps) == len(parallel_steps)
+        if ordered:
+            assert [(m, n, repr(g)) for m, n, _, g in serial_steps[:-1]] == \
+                   [(m, n, repr(g)) for m, n, _, g in parallel_steps[:-1]]
+        for match_num, move_num, d, _ in parallel_steps:
+            if move_num == 0:  # The contest's agents are returned, not the workers' copies.
+                assert all(agent in agents for agent in d.values())
+        mcts = agents[-1]
+        assert parallel.stats.search_stats[mcts].decisions > 0
+        assert parallel.stats.search_stats[mcts].nodes == serial.stats.search_stats[serial.agents[-1]].nodes
+
+    def test_search_stats(self):
+        agents = make_agents()
+        stats = _contests.complete(_contests.AllAgainstAll_Contest(TicTacToe(), agents, 1, seed=42))
+        moves = stats.search_stats[agents[-1]].decisions
+        assert 3 * 2 * 3 <= moves <= 3 * 2 * 5  # Six matches, each one with three to five MCTS moves.
+        assert stats.search_stats[agents[-1]].nodes > 0
+        stats.clear()
+        assert not stats.search_stats
+
+    def test_sampling(self):
+        contest = _contests.Sampling_Contest(TicTacToe(), make_agents(), random=3, count=2)
+        stats = _contests.complete(contest)
+        assert sum(stats.matches_played[agent] for agent in contest.agents) > 0
+
+
+class TestTimedContest:
+
+    def test_move_times(self):
+        agents = make_agents()
+        contest = _contests.AllAgainstAll_Contest(TicTacToe(), agents, 1, seed=3,
+                                                  time_control=a_s.core.TimeControl(move_time=60))
+        steps = list(contest.run())
+        stats = contest.stats
+        assert all(len(step) == 4 for step in steps)  # Timings are not part of the contest steps.
+        moves = sum(1 for _, move_num, _, _ in steps if move_num)
+        assert sum(stats.move_times[agent].count for agent in agents) == moves
+        assert not stats.timeouts
+        assert stats.move_times[agents[-1]].mean > stats.move_times[agents[0]].mean  # MCTS thinks longer.
+        untimed = _contests.AllAgainstAll_Contest(TicTacToe(), make_agents(), 1, seed=3)
+        assert totals(_contests.complete(untimed)) == totals(stats)
+
+    def test_play_match(self):
+        time_control = a_s.core.TimeControl(move_time=60)
+        steps, _ = _contests._play_match(TicTacToe(), dict(zip(TicTacToe().players, make_agents())), 'seed',
+                                         time_control)
+        assert steps[0][1] is None and steps[0][3] is None
+        assert all(isinstance(step[3], a_s.core.MoveTiming) for step in steps[1:-1])
+        merged = _contests.Stats()
+        stats = _contests.Stats()
+        agent = RandomAgent('Timed', 1)
+        stats.keys[agent] = agent.name
+        for step in steps[1:-1]:
+            stats.process_timing(agent, step[3])
+        merged.merge(stats)
+        assert merged.move_times[agent].count == len(steps) - 2
+
+
+class TestRunningStat:
+
+    def test_push(self):
+        rnd = random.Random(1)
+        values = [rnd.uniform(-1, 1) for _ in range(100)]
+        stat = _contests.RunningStat()
+        for value in values:
+            stat.push(value)
+        assert stat.count == 100
+        assert stat.mean == pytest.approx(statistics.mean(values))
+        assert stat.variance == pytest.approx(statistics.variance(values))
+        low, high = stat.confidence_interval()
+        assert low < stat.mean < high
+        assert high - low == pytest.approx(2 * 1.96 * statistics.stdev(values) / 10)
+
+    def test_merge(self):
+        rnd = random.Random(2)
+        values = [1e9 + rnd.random() for _ in range(50)]  # Large offsets break naive sums of squares.
+        whole, part1, part2 = _contests.RunningStat(), _contests.RunningStat(), _contests.RunningStat()
+        for index, value in enumerate(values):
+            whole.push(value)
+            (part1 if index % 3 else part2).push(value)
+        merged = part1.merge(part2)
+        assert merged.count == whole.count
+        assert merged.mean == pytest.approx(whole.mean)
+        assert merged.variance == pytest.approx(whole.variance, rel=1e-6)
+        assert _contests.RunningStat().merge(_contests.RunningStat()).count == 0
+
+    def test_few_values(self):
+        stat = _contests.RunningStat()
+        stat.push(1)
+        assert stat.mean == 1
+        assert all(map(math.isnan, (stat.variance,) + stat.confidence_interval()))
+
+
+class TestStats:
+
+    def play(self, seed, count=2):
+        agents = [RandomAgent('Random_%d' % i, i) for i in range(2)] + [MCTSAgent('MCTS', 5, 7)]
+        return _contests.complete(_contests.AllAgainstAll_Contest(TicTacToe(), agents, count, seed=seed))
+
+    def test_summary(self):
+        stats = self.play(42)
+        summary = stats.summary()
+        assert set(summary) == {'Random_0', 'Random_1', 'MCTS', 'Xs', 'Os'}
+        for key, name in stats.keys.items():
+            assert summary[name]['count'] == stats.matches_played[key]
+            assert summary[name]['mean'] * summary[name]['count'] == pytest.approx(stats.result_sum[key])
+
+    def test_merge(self):
+        stats1, stats2 = self.play(1), pickle.loads(pickle.dumps(self.play(2)))  # Copies of the agents.
+        merged = _contests.Stats().merge(stats1).merge(stats2)
+        assert len(merged.keys) == 5
+        for key, name in merged.keys.items():
+            other = next(other_key for other_key, other_name in stats2.keys.items() if other_name == name)
+            assert merged.matches_played[key] == stats1.matches_played[key] + stats2.matches_played[other]
+            assert merged.result_stats[key].count == merged.matches_played[key]
+        mcts1, mcts2 = (next(key for key, name in stats.keys.items() if name == 'MCTS') for stats in (stats1, stats2))
+        assert merged.search_stats[mcts1].decisions == \
+            stats1.search_stats[mcts1].decisions + stats2.search_stats[mcts2].decisions
+        assert sum(merged.pairwise_scores.values()) == 2 * 6 * 2
+
+    def test_ratings(self):
+        stats = _contests.Stats()
+        agents = [RandomAgent('Random_%d' % i) for i in range(3)]
+        for agent1, agent2 in zip(agents, agents[1:]):  # Each agent wins 8 of 10 matches against the next.
+            for index in range(10):
+                result = 1 if index < 8 else -1
+                stats.process({'Xs': agent1, 'Os': agent2}, index, None, {'Xs': result, 'Os': -result}, None)
+        ratings = stats.ratings()
+        assert ratings[agents[0]] > ratings[agents[1]] > ratings[agents[2]]
+        assert sum(ratings.values()) / 3 == pytest.approx(1500)
+        assert stats.ratings() == pytest.approx(ratings)
+        assert stats.ratings(prior=0)[agents[0]] > ratings[agents[0]]  # The prior pulls ratings together.
+        assert _contests.Stats().ratings() == {}
+
+
+class TestLogs:
+
+    def setup_method(self):
+        self.agents = [RandomAgent('Random_%d' % i, i) for i in range(2)]
+        self.contest = _contests.AllAgainstAll_Contest(TicTacToe(), self.agents, 2, seed=42)
+
+    def test_log(self):
+        lines = list(self.contest.log())
+        assert lines[0] == '[0]: Xs:Random_0(Xs), Os:Random_1(Os)'
+        assert lines[-3].startswith('Agent,keys,matches_played,')
+        assert lines[-2].startswith('Random_0,Random_0,4,')
+
+    def test_abstract_writer(self):
+        class IncompleteLogWriter(_contests.LogWriter):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteLogWriter(io.StringIO())
+
+    @pytest.mark.parametrize('compact', [False, True])
+    def test_jsonl(self, tmp_path, compact):
+        path = str(tmp_path / 'contest.jsonl.gz')
+        with _contests.JSONLogWriter(path, compact=compact) as writer:
+            stats = writer.write(self.contest.run())
+        assert stats is self.contest.stats
+        with gzip.open(path, 'rt') as file:
+            records = [json.loads(line) for line in file]
+        assert records[0] == dict({'match': 0, 'move': 0, 'event': 'begin', 'data': {'Xs': 'Random_0', 'Os': 'Random_1'}},
+                                  **({} if compact else {'state': repr(TicTacToe())}))
+        ends = [record for record in records if record.get('event') == 'end']
+        assert len(ends) == 4
+        assert all(set(end['data']) == {'Xs', 'Os'} for end in ends)
+        assert records[-1]['stats']['matches_played'] == {'Random_0': 4, 'Random_1': 4, 'Xs': 4, 'Os': 4}
+        assert all(('state' in record) != compact for record in records[:-1])
+
+    def test_jsonl_replay(self):
+        file = io.StringIO()
+        _contests.JSONLogWriter(file, compact=True).write(self.contest.run())
+        game = None
+        for record in map(json.loads, file.getvalue().splitlines()[:-1]):
+            if record['event'] == 'begin':
+                game = TicTacToe()
+            elif record['event'] == 'move':
+                game = game.next(game.moves()[game.moves().index(record['data'])])
+            else:
+                assert game.results() == record['data']
+
+    def test_csv(self, tmp_path):
+        path = str(tmp_path / 'contest.csv')
+        with _contests.CSVLogWriter(path) as writer:
+            writer.write(self.contest.run())
+        with open(path, newline='') as file:
+            rows = list(csv.DictReader(file))
+        assert rows[0] == {'match': '0', 'move': '0', 'event': 'begin', 'data': 'Xs:Random_0;Os:Random_1',
+                           'state': repr(TicTacToe())}
+        assert sum(row['event'] == 'end' for row in rows) == 4
+        assert rows[-1]['move'] == ''
+
+
+class TestSortContest:
+
+    def make_agents(self):
+        return [RandomAgent('Random_%d' % i, i) for i in range(5)]
+
+    def test_sort(self):
+        agents = self.make_agents()
+        contest = _contests.Sort_Contest(TicTacToe(), agents, 2, seed=42)
+        steps = list(contest.run())
+        assert sorted(contest.agents, key=id) == sorted(agents, key=id)
+        for worse, better in zip(contest.agents, contest.agents[1:]):
+            comparison = contest.comparison(worse, better)
+            assert comparison is None or comparison <= 0
+        match_nums = {match_num for match_num, _, _, _ in steps[:-1]}
+        assert len(match_nums) == 2 * len(contest.comparisons)
+        assert sum(contest.stats.matches_played[agent] for agent in agents) == 2 * len(match_nums)
+        assert steps[-1][2] is contest.stats
+
+    def test_cached_pairs(self):
+        agents = self.make_agents()
+        contest = _contests.Sort_Contest(TicTacToe(), agents, 3, seed=1)
+        list(contest.run())
+        pairs = [frozenset(pair) for pair in contest.comparisons]
+        assert len(pairs) == len(set(pairs)) <= 5 * 4 // 2
+        agent1, agent2 = next(iter(contest.comparisons))
+        played = contest.stats.matches_played[agent1]
+        assert contest.comp_fun(agent2, agent1) == -contest.comparisons[(agent1, agent2)]
+        assert contest.stats.matches_played[agent1] == played  # No matches played again.
+
+    def test_streaming(self):
+        contest = _contests.Sort_Contest(TicTacToe(), self.make_agents(), 1, seed=42)
+        steps = contest.run()
+        next(steps)
+        assert contest.stats.matches_played == {}  # Matches are played as the steps are consumed.
+        assert not hasattr(contest, '__matches__')
+
+    def test_parallel(self):
+        serial = _contests.Sort_Contest(TicTacToe(), self.make_agents(), 2, seed=42)
+        parallel = _contests.Sort_Contest(TicTacToe(), self.make_agents(), 2, seed=42, workers=2)
+        assert [(m, n, repr(g)) for m, n, _, g in serial.run()] == [(m, n, repr(g)) for m, n, _, g in parallel.run()]
+        assert [agent.name for agent in serial.agents] == [agent.name for agent in parallel.agents]
+
+
+class TestPyramidContest:
+
+    def make_agents(self, count=6):
+        return [RandomAgent('Random_%d' % i, i) for i in range(count)]
+
+    def test_knockout(self):
+        agents = self.make_agents(6)
+        contest = _contests.Pyramid_Contest(TicTacToe(), agents, 2, seed=42)
+        steps = list(contest.run())
+        assert contest.winner in agents
+        assert [len(round_groups) for round_groups in contest.rounds] == [2, 2, 1]  # Two byes first.
+        assert all(agent not in group for agent in agents[:2] for group, _ in contest.rounds[0])
+        assert contest.rounds[-1][0][1] is contest.winner
+        assert all(winner in group for round_groups in contest.rounds for group, winner in round_groups)
+        match_nums = {match_num for match_num, _, _, _ in steps[:-1]}
+        assert 2 * 5 <= len(match_nums) <= 3 * 5  # Five pairings, with at most one tie break each.
+        assert steps[-1][2] is contest.stats
+
+    def test_tie_breaks(self):
+        agents = [HighestAgent('Highest_%d' % i) for i in range(3)]  # They always tie.
+        for tie_breaks in (0, 2):
+            contest = _contests.Pyramid_Contest(Lottery(), agents, 3, tie_breaks=tie_breaks, seed=1)
+            steps = list(contest.run())
+            assert len({match_num for match_num, _, _, _ in steps[:-1]}) == 3 + tie_breaks
+            assert contest.winner is agents[0]  # The seed breaks the tie.
+
+    def test_brackets(self):
+        contest = _contests.Pyramid_Contest(Lottery(), [])
+        byes, groups = contest.bracket(list(range(5)))
+        assert byes == [0, 1] and groups == [(2, 3, 4)]  # The next round has three agents.
+        agents = self.make_agents(2)
+        byes, [group] = contest.bracket(agents)
+        assert byes == [] and group[:2] == tuple(agents)
+        assert group[2] is not agents[0] and group[2].name == 'Random_0~1'  # A copy fills the third seat.
+        contest.game = TicTacToe()
+        assert contest.bracket(list(range(5))) == ([0, 1, 2], [(3, 4)])
+
+    def test_copies(self):
+        agents = [HighestAgent('Highest'), RandomAgent('Random', 1)]
+        contest = _contests.Pyramid_Contest(Lottery(), agents, 3, tie_breaks=0, seed=2)
+        list(contest.run())
+        [(group, winner)] = contest.rounds[0]
+        assert len(set(map(id, group))) == 3  # Every seat has an agent of its own.
+        assert winner is agents[0] is contest.winner  # Copies never advance.
+        assert contest.stats.keys[group[2]] == 'Highest~1'
+        assert contest.stats.matches_played[agents[0]] == contest.stats.matches_played[group[2]] == 3
+
+    def test_n_players(self):
+        agents = self.make_agents(7)
+        contest = _contests.Pyramid_Contest(Lottery(), agents, 3, seed=5)
+        list(contest.run())
+        assert contest.winner in agents
+        assert [len(round_groups) for round_groups in contest.rounds] == [2, 1]
+        assert all(contest.stats.matches_played[player] > 0 for player in 'ABC')
+
+    def test_parallel(self):
+        serial = _contests.Pyramid_Contest(TicTacToe(), self.make_agents(), 2, seed=42)
+        parallel = _contests.Pyramid_Contest(TicTacToe(), self.make_agents(), 2, seed=42, workers=2)
+        assert [(m, n, repr(g)) for m, n, _, g in serial.run()] == [(m, n, repr(g)) for m, n, _, g in parallel.run()]
+        assert serial.winner.name == parallel.winner.name
+
+
+class TestSwissContest:
+
+    def make_agents(self, count=7):
+        return [RandomAgent('Random_%d' % i, i) for i in range(count)]
+
+    def test_swiss(self):
+        agents = self.make_agents()
+        contest = _contests.Swiss_Contest(TicTacToe(), agents, count=2, seed=42)
+        steps = list(contest.run())
+        assert contest.rounds == 3
+        assert len({match_num for match_num, _, _, _ in steps[:-1]}) == 3 * 3 * 2
+        assert sum(contest.scores.values()) == 3 * (3 * 2 + 2)  # Two points per pairing, and the byes.
+        assert len(contest.byes) == 3
+        assert all(times == 1 for opponents in contest.opponents.values() for times in opponents.values())
+        standings = contest.standings()
+        assert [score for _, score, _ in standings] == sorted(contest.scores.values(), reverse=True)
+        assert steps[-1][2] is contest.stats
+
+    def test_pairings(self):
+        agents = self.make_agents(200)
+        contest = _contests.Swiss_Contest(TicTacToe(), agents)
+        assert contest.rounds == 8
+        contest.scores = {agent: index % 3 for index, agent in enumerate(agents)}
+        contest.opponents = {agent: {} for agent in agents}
+        pairs, bye = contest.pairings()
+        assert bye is None and len(pairs) == 100
+        assert len({agent for pair in pairs for agent in pair}) == 200
+        assert all(contest.scores[agent1] == contest.scores[agent2] for agent1, agent2 in pairs[:30])
+        contest.opponents[pairs[0][0]] = {pairs[0][1]: 1}
+        assert contest.pairings()[0][0] != pairs[0]  # Rematches are avoided.
+
+    def test_parallel(self):
+        serial = _contests.Swiss_Contest(TicTacToe(), self.make_agents(), seed=42)
+        parallel = _contests.Swiss_Contest(TicTacToe(), self.make_agents(), seed=42, workers=2)
+        assert [(m, n, repr(g)) for m, n, _, g in serial.run()] == [(m, n, repr(g)) for m, n, _, g in parallel.run()]
+        assert [(agent.name, score) for agent, score, _ in serial.standings()] == \
+               [(agent.name, score) for agent, score, _ in parallel.standings()]
+
+
+class SlowAgent(RandomAgent):
+    """ Random agent that waits before moving, like an engine in another process.
+    """
+
+    async def select_move(self, game, *moves, time_left=None):
+        await asyncio.sleep(0.01)
+        return RandomAgent.select_move(self, game, *moves, time_left=time_left)
+
+
+class TestAsyncContest:
+
+    def test_run_async(self):
+        agents = make_agents()
+        contest = _contests.AllAgainstAll_Contest(TicTacToe(), agents, 2, seed=42)
+        stats = asyncio.run(_contests.complete_async(contest, concurrency=5))
+        serial = _contests.AllAgainstAll_Contest(TicTacToe(), make_agents(), 2, seed=42)
+        assert totals(stats) == totals(_contests.complete(serial))
+        for agent, serial_agent in zip(agents, serial.agents):  # Search stats of every match, and only once.
+            search_stats, serial_stats = stats.search_stats[agent], serial.stats.search_stats[serial_agent]
+            assert (search_stats.decisions, search_stats.nodes) == (serial_stats.decisions, serial_stats.nodes)
+
+    def test_unseeded_copies(self):
+        agents = [RandomAgent('Random_%d' % i) for i in range(2)]
+        contest = _contests.AllAgainstAll_Contest(TicTacToe(), agents, 10)
+
+        async def final_states():
+            return {repr(g) async for match_num, move_num, _, g in contest.run_async()
+                    if match_num is not None and move_num is None}
+
+        assert len(asyncio.run(final_states())) > 2  # Every match's copies play differently.
+
+    def test_steps(self):
+        agents = make_agents()
+        contest = _contests.AllAgainstAll_Contest(TicTacToe(), agents, 1, seed=1)
+
+        async def steps():
+            return [step async for step in contest.run_async(concurrency=4)]
+
+        steps = asyncio.run(steps())
+        assert steps[-1] == (None, None, contest.stats, contest.game)
+        for match_num in range(12):
+            match_steps = [(move_num, d) for m, move_num, d, _ in steps if m == match_num]
+            assert [move_num for move_num, _ in match_steps] == list(range(len(match_steps) - 1)) + [None]
+            assert all(agent in agents for agent in match_steps[0][1].values())
+        assert [m for m, _, _, _ in steps[:-1]] != sorted(m for m, _, _, _ in steps[:-1])  # Interleaved.
+
+    def test_concurrency(self):
+        agents = [SlowAgent('Slow_%d' % i, i) for i in range(4)]
+        contest = _contests.AllAgainstAll_Contest(TicTacToe(), agents, 2)
+        start = time.perf_counter()
+        stats = asyncio.run(_contests.complete_async(contest, concurrency=24))
+        assert sum(stats.matches_played[agent] for agent in agents) == 4 * 3 * 2 * 2
+        assert time.perf_counter() - start < 24 * 5 * 0.01  # Much less than one match at a time.
+
+    def test_time_control(self):
+        agents = [SlowAgent('Slow_%d' % i, i) for i in range(2)]
+        time_control = a_s.core.TimeControl(move_time=0.001)
+        contest = _contests.AllAgainstAll_Contest(TicTacToe(), agents, 1, time_control=time_control)
+        stats = asyncio.run(_contests.complete_async(contest))
+        for agent in agents:  # Each agent runs out of time in the match it starts, and wins the other.
+            assert stats.timeouts[agent] == stats.move_times[agent].count == 1
+            assert stats.matches_won[agent] == 1
+
+    def test_errors(self):
+        contest = _contests.AllAgainstAll_Contest(TicTacToe(), [])
+
+        async def steps():
+            return [step async for step in contest.run_async([(TicTacToe(), {'Xs': None, 'Os': None})])]
+
+        with pytest.raises(AttributeError):
+            asyncio.run(steps())
+
+        class IncompleteContest(_contests.Contest):
+            pass
+
+        with pytest.raises(TypeError):  # Contests must tell their matches.
+            IncompleteContest(TicTacToe(), [])
+
+    @pytest.mark.parametrize('contest_class', [_contests.Sort_Contest, _contests.Swiss_Contest,
+                                               _contests.Pyramid_Contest])
+    def test_first_round(self, contest_class):
+        contest = contest_class(TicTacToe(), make_agents() + [RandomAgent('Random_4', 4)], count=2, seed=1)
+        first_round = [agents for _, agents in contest.matches()]
+        played = [d for _, move_num, d, _ in contest.run() if move_num == 0]
+        assert first_round and played[:len(first_round)] == first_round
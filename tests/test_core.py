@@ -1,3 +1,6 @@
+import asyncio
+import io
+import itertools
 from unittest.mock import patch, Mock
 
 import pytest
@@ -7,6 +10,18 @@ from .context import adversarial_search as a_s
 Game = a_s.Game
 
 
+def coroutine_mock(**kwargs):
+    """ Returns a coroutine function that calls a Mock, available as its `mock` attribute to check
+        the calls (unittest.mock.AsyncMock requires Python 3.8).
+    """
+    mock = Mock(**kwargs)
+
+    async def coroutine(*args, **kwargs):
+        return mock(*args, **kwargs)
+    coroutine.mock = mock
+    return coroutine
+
+
 class TestGame:
     @patch.object(Game, '__abstractmethods__', set())
     def setup(self):
@@ -90,3 +105,126 @@ class TestMatch:
 
         assert mock_match.call_count == 1
         assert result == ({'A': 3, 'B': -3}, dummy_game)
+
+    def test_async_match(self):
+        dummy_game = Mock()
+        dummy_agent_1 = Mock()
+        dummy_agent_2 = Mock()
+        dummy_agent_1.select_move = coroutine_mock(side_effect=['1', '2'])  # A coroutine.
+        dummy_agent_2.select_move.side_effect = ['1']  # A plain method.
+        dummy_agent_1.match_ends = coroutine_mock()
+        dummy_game.players = ['A', 'B']
+        dummy_game.results.side_effect = [{}, {}, {}, {'A': 3, 'B': -3}]
+        dummy_game.active_player.side_effect = ['A', 'B', 'A', 'B']
+        dummy_game.next.return_value = dummy_game
+
+        async def steps():
+            return [step async for step in a_s.core.async_match(dummy_game, dummy_agent_1, dummy_agent_2)]
+
+        result = asyncio.run(steps())
+
+        assert result == [
+            (0, {'A': dummy_agent_1, 'B': dummy_agent_2}, dummy_game),
+            (1, '1', dummy_game),
+            (2, '1', dummy_game),
+            (3, '2', dummy_game),
+            (None, {'A': 3, 'B': -3}, dummy_game)
+        ]
+        assert dummy_agent_1.select_move.mock.call_count == 2
+        assert dummy_agent_2.match_moves.call_count == 3
+        dummy_agent_1.match_ends.mock.assert_called_once_with(dummy_game)
+        dummy_agent_2.match_ends.assert_called_once_with(dummy_game)
+
+    def test_async_run_match(self):
+        from examples.tictactoe import TicTacToe
+
+        class SlowAgent(a_s.agents.RandomAgent):
+            async def select_move(self, game, *moves):
+                await asyncio.sleep(0)
+                return a_s.agents.RandomAgent.select_move(self, game, *moves)
+
+        async def matches():
+            return await asyncio.gather(*[a_s.core.async_run_match(TicTacToe(), SlowAgent(random=i),
+                                                                   a_s.agents.RandomAgent(random=i))
+                                          for i in range(5)])
+
+        for i, (results, game) in enumerate(asyncio.run(matches())):  # Same matches as synchronous ones.
+            expected_results, expected_game = a_s.core.run_match(TicTacToe(), a_s.agents.RandomAgent(random=i),
+                                                                 a_s.agents.RandomAgent(random=i))
+            assert (results, repr(game)) == (expected_results, repr(expected_game))
+
+
+class TestTimeControl:
+
+    def setup_method(self):
+        from examples.tictactoe import TicTacToe
+        self.game = TicTacToe()
+        self.agents = [a_s.agents.RandomAgent(random=1), a_s.agents.RandomAgent(random=2)]
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            a_s.core.TimeControl(1, on_timeout='draw')
+
+    @patch('adversarial_search.core.time')
+    def test_forfeit(self, mock_time):
+        mock_time.perf_counter.side_effect = [0, 0.5, 1, 3]
+        steps = list(a_s.core.match(self.game, *self.agents, time_control=a_s.core.TimeControl(move_time=1)))
+        MoveTiming = a_s.core.MoveTiming
+        assert [step[0] for step in steps] == [0, 1, None]
+        assert steps[0][3] is None
+        assert steps[1][3] == MoveTiming('Xs', 0.5, 1, False)
+        assert steps[2][1] == {'Xs': 1, 'Os': -1}
+        assert steps[2][3] == MoveTiming('Os', 2, 1, True)
+
+    @patch('adversarial_search.core.time')
+    def test_forfeit_match_ends(self, mock_time):
+        mock_time.perf_counter.side_effect = [0, 2]
+        out_file = io.StringIO()
+        file_agent = a_s.agents.FileAgent(io.StringIO(), out_file)
+        results, game = a_s.core.run_match(self.game, self.agents[0], file_agent,
+                                           time_control=a_s.core.TimeControl(move_time=1))
+        assert results == {'Xs': -1, 'Os': 1} and not game.results()  # The game is not finished.
+        assert 'ends the match with victory' in out_file.getvalue()
+        book_agent = a_s.agents.BookAgent(Mock(), {})
+        book_agent.match_ends(game)  # Results are only passed on if given.
+        book_agent.match_ends(game, results)
+        assert book_agent.agent.match_ends.call_args_list == [((game,),), ((game, results),)]
+
+    def test_forfeit_zero_sum(self):
+        game = Mock(players=('A', 'B', 'C'))
+        assert a_s.core.TimeControl(move_time=1).forfeit(game, 'B') == {'A': 1, 'B': -2, 'C': 1}
+
+    @patch('adversarial_search.core.time')
+    def test_clocks(self, mock_time):
+        mock_time.perf_counter.side_effect = itertools.chain([0, 4, 4, 6, 6, 14], itertools.count(14))
+        time_control = a_s.core.TimeControl(total_time=10, increment=1, on_timeout='ignore')
+        steps = list(a_s.core.match(self.game, *self.agents, time_control=time_control))
+        timings = [step[3] for step in steps[1:-1]]
+        assert timings[:3] == [('Xs', 4, 10, False), ('Os', 2, 10, False), ('Xs', 8, 7, True)]
+        assert timings[3].time_left == 9  # Os: 10 - 2 + 1.
+        assert timings[4].time_left == 1  # Xs ran out of time, so only the increment is left.
+        assert steps[-1][3] is None
+        last_xs_timing = [timing for timing in timings if timing.player == 'Xs'][-1]
+        assert self.agents[0].time_left == last_xs_timing.time_left  # Agents are told the time they have.
+
+    @patch('adversarial_search.core.time')
+    def test_random(self, mock_time):
+        mock_time.perf_counter.side_effect = itertools.count(0, 2)  # Every move takes 2 seconds.
+        time_control = a_s.core.TimeControl(move_time=1, on_timeout='random', random=7)
+        steps = list(a_s.core.match(self.game, *self.agents, time_control=time_control))
+        assert all(step[3].timeout for step in steps[1:-1])
+        assert steps[-1][2].results()
+        expected = a_s.core.TimeControl(random=7).random
+        for (_, move, game, _), (_, _, previous, _) in zip(steps[1:-1], steps):
+            assert move == expected.choice(list(previous.moves()))
+
+    def test_async_cancel(self):
+        class SleepyAgent(a_s.agents.RandomAgent):
+            async def select_move(self, game, *moves, time_left=None):
+                await asyncio.sleep(10)
+
+        time_control = a_s.core.TimeControl(move_time=0.05)
+        results, game = asyncio.run(a_s.core.async_run_match(self.game, self.agents[0], SleepyAgent(),
+                                                             time_control=time_control))
+        assert results == {'Xs': 1, 'Os': -1}
+        assert len(game.moves()) == 8
@@ -1,16 +1,136 @@
+import random
+
 import pytest
 
-from examples.tictactoe import TicTacToe
+from examples.cuanteti import Cuanteti, BitboardCuanteti
+from examples.tictactoe import TicTacToe, BitboardTicTacToe
 from examples.toads_and_frogs import ToadsFrogs
+from adversarial_search.utils import board_symmetries, transform_board
 from tests.test_game import GameTest
 
 
+@pytest.mark.parametrize("game, rebuild", [
+    (TicTacToe(), lambda game: TicTacToe(game.board, game.enabled)),
+    (Cuanteti(), lambda game: Cuanteti(game.board, game.enabled)),
+    (BitboardTicTacToe(), lambda game: BitboardTicTacToe(game.board, game.enabled)),
+    (BitboardCuanteti(), lambda game: BitboardCuanteti(game.board, game.enabled)),
+    (ToadsFrogs(None, 0, 5, 4), lambda game: ToadsFrogs(game.board, game.enabled)),
+], ids=['TicTacToe', 'Cuanteti', 'BitboardTicTacToe', 'BitboardCuanteti', 'ToadsFrogs'])
+def test_zobrist_keys(game, rebuild):
+    """ Keys updated incrementally by `next` must be equal to the ones calculated from scratch.
+    """
+    rnd = random.Random(123)
+    initial = game
+    for _ in range(20):
+        game = initial
+        keys = {game.key()}
+        while game.moves():
+            game = game.next(rnd.choice(game.moves()))
+            assert game.key() == rebuild(game).key()
+            assert hash(game) == hash(rebuild(game))
+            assert 0 <= game.key() < 2 ** 64
+            keys.add(game.key())
+        assert len(keys) > 1
+
+
+@pytest.mark.parametrize("game", [
+    TicTacToe(), Cuanteti(), BitboardTicTacToe(), BitboardCuanteti(), ToadsFrogs(None, 0, 5, 4),
+], ids=['TicTacToe', 'Cuanteti', 'BitboardTicTacToe', 'BitboardCuanteti', 'ToadsFrogs'])
+def test_apply_undo(game):
+    """ Applying moves in place must give the same game states as `next`, and undoing them must get
+        back to the initial one.
+    """
+    rnd = random.Random(123)
+    assert game.supports_apply()
+    for _ in range(20):
+        copy, states = game.copy(), [game]
+        while copy.moves():
+            move = rnd.choice(copy.moves())
+            states.append(states[-1].next(move))
+            assert copy.apply(move) is copy
+            assert (repr(copy), copy.key(), copy.moves(), copy.results()) == \
+                   (repr(states[-1]), states[-1].key(), states[-1].moves(), states[-1].results())
+        while len(states) > 1:
+            states.pop()
+            copy.undo()
+            assert (repr(copy), copy.key(), copy.moves()) == (repr(states[-1]), states[-1].key(), states[-1].moves())
+    assert not hasattr(game, '__undo__')
+
+
+@pytest.mark.parametrize("game, size", [
+    (TicTacToe(), 3), (Cuanteti(), 4), (BitboardTicTacToe(), 3), (BitboardCuanteti(), 4),
+], ids=['TicTacToe', 'Cuanteti', 'BitboardTicTacToe', 'BitboardCuanteti'])
+def test_canonical_keys(game, size):
+    """ Symmetric game states must share their canonical key, and equivalent moves must have the same
+        code and lead to symmetric game states.
+    """
+    rnd = random.Random(123)
+    cls, initial = type(game), game
+    for _ in range(20):
+        game = initial
+        for _ in range(rnd.randrange(size * size)):
+            game = game.next(rnd.choice(game.moves()))
+            if not game.moves():
+                break
+        for symmetry in board_symmetries(size, size):
+            other = cls(transform_board(game.board, symmetry), game.enabled)
+            assert other.canonical_key() == game.canonical_key()
+            for move in game.moves() or ():
+                code = game.canonical_move(move)
+                assert game.original_move(code) == move
+                assert other.next(other.original_move(code)).canonical_key() == game.next(move).canonical_key()
+        if game.moves():
+            copy = game.copy()
+            copy.apply(game.moves()[0])
+            assert copy.canonical_key() == game.next(game.moves()[0]).canonical_key()
+
+
+def test_canonical_keys_toads_frogs():
+    """ Mirrored ToadsFrogs boards, with the chips and players swapped, share their canonical key.
+    """
+    rnd = random.Random(123)
+    game = ToadsFrogs(None, 0, 5, 4)
+    while game.moves():
+        mirror = ToadsFrogs(game.board[::-1].translate(str.maketrans('TF', 'FT')), 1 - game.enabled)
+        assert mirror.canonical_key() == game.canonical_key()
+        for move in game.moves():
+            code = game.canonical_move(move)
+            assert game.original_move(code) == move
+            assert mirror.next(mirror.original_move(code)).canonical_key() == game.next(move).canonical_key()
+        game = game.next(rnd.choice(game.moves()))
+
+
+@pytest.mark.parametrize("string_class, bitboard_class", [
+    (TicTacToe, BitboardTicTacToe),
+    (Cuanteti, BitboardCuanteti),
+], ids=['TicTacToe', 'Cuanteti'])
+def test_bitboards(string_class, bitboard_class):
+    """ Bitboard implementations must behave exactly like the string ones.
+    """
+    rnd = random.Random(123)
+    for _ in range(100):
+        game1, game2 = string_class(), bitboard_class()
+        while True:
+            assert repr(game1) == repr(game2)
+            assert str(game1) == str(game2)
+            assert game1.key() == game2.key()
+            assert game1.results() == game2.results()
+            assert game1.moves() == game2.moves()
+            if not game1.moves():
+                break
+            move = rnd.choice(game1.moves())
+            game1, game2 = game1.next(move), game2.next(move)
+    board = ('XXOO' * 4)[:len(string_class().board)]
+    assert bitboard_class(board, 0).results() == string_class(board, 0).results()
+
+
 class TestTicTacToe(GameTest):
     """ TicTacToe test cases.
     """
 
     def test_basic(self):
         self.basic_test(TicTacToe)
+        self.basic_test(BitboardTicTacToe)
 
     @pytest.mark.parametrize("trace, results", [
         ("""
@@ -33,6 +153,7 @@ class TestTicTacToe(GameTest):
     ], ids=['Xs wins', 'Os wins'])
     def test_traces(self, trace, results):
         self.trace_test_text(TicTacToe(), trace, **results)
+        self.trace_test_text(BitboardTicTacToe(), trace, **results)
 
 
 class TestToadsFrogs(GameTest):
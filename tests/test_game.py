@@ -151,3 +151,25 @@ class TestGameSilly(GameTest):
                               ])
     def test_text(self, trace, results):
         self.trace_test_text(Silly(), trace, **results)
+
+    def test_key(self):
+        assert Silly().key() == Silly().key()
+        assert Silly().key() != Silly('B').key()
+        assert 0 <= Silly().key() < 2 ** 64
+
+    def test_apply_fallback(self):
+        game = Silly()
+        game.moves()
+        game.__moves__ = ['cached']
+        assert not game.supports_apply()
+        with pytest.raises(NotImplementedError):
+            game.apply('A')
+        copy = game.copy()
+        assert type(copy) is Silly and repr(copy) == repr(game)
+        assert not hasattr(copy, '__moves__')
+
+    def test_canonical_defaults(self):
+        game = Silly()
+        assert game.canonical_key() == game.key()
+        for move in game.moves():
+            assert game.original_move(game.canonical_move(move)) == move
@@ -0,0 +1,117 @@
+""" Test cases for modules solver and tables.
+"""
+import pickle
+import random
+
+import pytest
+
+from .context import adversarial_search as a_s
+from examples.tictactoe import TicTacToe, BitboardTicTacToe
+from examples.toads_and_frogs import ToadsFrogs
+
+from adversarial_search import solver
+from adversarial_search.tables import GameTable
+
+SolvedAgent = a_s.agents.SolvedAgent
+
+
+@pytest.fixture(scope='module')
+def tictactoe_table(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('tables') / 'tictactoe.table')
+    GameTable.write(path, solver.solve(TicTacToe()))
+    return path
+
+
+class TestGameTable:
+    def test_write_read(self, tmp_path):
+        path = str(tmp_path / 'test.table')
+        entries = {key * 7919: (key / 2.0, key % 5, key % 3) for key in range(100)}
+        GameTable.write(path, entries)
+        with GameTable(path) as table:
+            assert len(table) == 100
+            assert table.slots == 256
+            for key, (value, move, depth) in entries.items():
+                assert table[key] == (value, move, depth)
+            assert 7919 * 100 not in table
+            assert table.get(1, 'missing') == 'missing'
+            with pytest.raises(KeyError):
+                table[1]
+
+    def test_empty(self, tmp_path):
+        path = str(tmp_path / 'empty.table')
+        GameTable.write(path, {})
+        with GameTable(path) as table:
+            assert len(table) == 0
+            assert 0 not in table
+
+    def test_invalid(self, tmp_path):
+        path = tmp_path / 'invalid.table'
+        path.write_bytes(b'\0' * 64)
+        with pytest.raises(ValueError):
+            GameTable(str(path))
+        with pytest.raises(ValueError):
+            GameTable.write(str(path), {1: (0, 0, -1)})
+
+
+class TestSolver:
+    def test_tictactoe(self):
+        solution = solver.solve(TicTacToe())
+        assert len(solution) == 627  # Reachable game states that are not finished, up to symmetry.
+        assert solution[TicTacToe().canonical_key()][::2] == (0, 9)
+        game = TicTacToe('XX.OO....', 0)
+        value, move, depth = solution[game.canonical_key()]
+        assert (value, game.original_move(move), depth) == (1, 2, 1)  # Xs win immediately.
+        game = TicTacToe('XX.OO...X', 1)
+        value, move, depth = solution[game.canonical_key()]
+        assert (value, game.original_move(move), depth) == (1, 5, 1)  # Os win immediately too.
+        game = TicTacToe('XX.O.....', 1)
+        value, move, _ = solution[game.canonical_key()]
+        assert (value, game.original_move(move)) == (-1, 2)  # Os lose anyway, but blocking takes longer.
+        mirror = TicTacToe('.XX.OO...', 0)
+        assert solution[mirror.canonical_key()] == solution[TicTacToe('XX.OO....', 0).canonical_key()]
+
+    def test_same_solution(self):
+        assert solver.solve(TicTacToe()) == solver.solve(BitboardTicTacToe())
+
+    def test_toads_frogs(self):
+        for chips, empty_spaces, value in ((2, 1, 1), (3, 2, 1), (3, 3, -1)):
+            game = ToadsFrogs(None, 0, chips, empty_spaces)
+            assert solver.solve(game)[game.canonical_key()][0] == value
+            mirror = ToadsFrogs(game.board[::-1].translate(str.maketrans('TF', 'FT')), 1)
+            assert solver.solve(mirror)[mirror.canonical_key()][0] == value
+
+    def test_main(self, tmp_path, capsys):
+        path = str(tmp_path / 'tf.table')
+        assert solver.main(['examples.toads_and_frogs:ToadsFrogs', path, 'None', '0', '2', '1']) == 0
+        assert 'Value for Toads: 1' in capsys.readouterr().out
+        with GameTable(path) as table:
+            assert ToadsFrogs(None, 0, 2, 1).canonical_key() in table
+        with pytest.raises(ValueError):
+            solver.load_game('examples.toads_and_frogs')
+
+
+class TestSolvedAgent:
+    def test_never_loses(self, tictactoe_table):
+        solved = SolvedAgent(tictactoe_table, random=1)
+        for opponent in (a_s.agents.RandomAgent(random=2), a_s.agents.AlphaBetaAgent(horizon=2, random=3)):
+            for _ in range(5):
+                results, _ = a_s.core.run_match(TicTacToe(), solved, opponent)
+                assert results['Xs'] >= 0
+                results, _ = a_s.core.run_match(TicTacToe(), opponent, solved)
+                assert results['Os'] >= 0
+
+    def test_wins(self, tictactoe_table):
+        agent = SolvedAgent(tictactoe_table)
+        agent.match_begins('Os', None)
+        assert agent.select_move(TicTacToe('XX.OO...X', 1)) == 5
+
+    def test_missing(self, tictactoe_table):
+        agent = SolvedAgent(GameTable(tictactoe_table), random=random.Random(1))
+        game = ToadsFrogs(None, 0, 5, 4)
+        agent.match_begins('Toads', game)
+        assert agent.select_move(game) in game.moves()
+
+    def test_pickling(self, tictactoe_table):
+        agent = pickle.loads(pickle.dumps(SolvedAgent(tictactoe_table)))
+        agent.match_begins('Os', None)
+        assert agent.select_move(TicTacToe('XX.OO...X', 1)) == 5
@@ -1,3 +1,6 @@
+import math
+import sys
+
 import pytest
 
 from .context import adversarial_search as a_s
@@ -94,3 +97,125 @@ class TestUtils:
         """Test utils.board_lines(board, rows, cols)
         """
         assert list(a_s.utils.board_lines(board, rows, cols)) == expected_lines
+
+    @pytest.mark.parametrize("rows, cols", [(1, 1), (3, 3), (2, 5), (5, 2), (19, 19)])
+    def test_board_line_indexes(self, rows, cols):
+        """ Test utils.board_line_indexes(rows, cols) against the board functions
+        """
+        board = [chr(0x100 + square) for square in range(rows * cols)]
+        indexes = a_s.utils.board_line_indexes(rows, cols)
+        assert indexes is a_s.utils.board_line_indexes(rows, cols)
+        for group, function in [(indexes.rows, a_s.utils.board_rows), (indexes.columns, a_s.utils.board_columns),
+                                (indexes.positive_diagonals, a_s.utils.board_positive_diagonals),
+                                (indexes.negative_diagonals, a_s.utils.board_negative_diagonals)]:
+            assert [''.join(board[square] for square in line) for line in group] == function(board, rows, cols)
+        assert len(a_s.utils.board_line_squares(rows, cols)) == rows + cols + 2 * (rows + cols - 1)
+
+    @pytest.mark.parametrize("board, rows, cols, min_length", [
+        ('ABCDEFGHI', 3, 3, 1), ('ABCDEFGHI', 3, 3, 3), ('ABCDEF', 2, 3, 2), (list('ABCDEFGHIJKLMNOP'), 4, 4, 3),
+    ])
+    def test_board_line_contents(self, board, rows, cols, min_length):
+        """ Test utils.board_line_contents(board, rows, cols, min_length)
+        """
+        expected = [line for line in a_s.utils.board_lines(board, rows, cols) if len(line) >= min_length]
+        assert a_s.utils.board_line_contents(board, rows, cols, min_length) == expected
+
+    @pytest.mark.parametrize("rows, cols, count", [(3, 3, 8), (4, 4, 8), (2, 3, 4), (1, 5, 2), (1, 1, 1)])
+    def test_board_symmetries(self, rows, cols, count):
+        """ Test utils.board_symmetries(rows, cols)
+        """
+        symmetries = a_s.utils.board_symmetries(rows, cols)
+        assert len(symmetries) == count
+        assert symmetries[0] == tuple(range(rows * cols))
+        for symmetry in symmetries:
+            assert sorted(symmetry) == list(range(rows * cols))
+            inverse = a_s.utils.inverse_symmetry(symmetry)
+            assert inverse in symmetries
+            assert a_s.utils.transform_board(a_s.utils.transform_board('ABCDEFGHIJKLMNOP'[:rows * cols], symmetry),
+                                             inverse) == 'ABCDEFGHIJKLMNOP'[:rows * cols]
+
+    @pytest.mark.parametrize("board, rows, cols", [('XO.......', 3, 3), ('.X.OO.X..', 3, 3), ('ABCDEF', 2, 3),
+                                                   (['A', 'B', 'C', 'D'], 2, 2)])
+    def test_canonical_board(self, board, rows, cols):
+        """ Test utils.canonical_board(board, rows, cols)
+        """
+        canonical, symmetry = a_s.utils.canonical_board(board, rows, cols)
+        assert canonical == a_s.utils.transform_board(board, symmetry)
+        assert type(canonical) is (str if isinstance(board, str) else tuple)
+        for other in a_s.utils.board_symmetries(rows, cols):
+            transformed = a_s.utils.transform_board(board, other)
+            assert canonical <= transformed
+            assert a_s.utils.canonical_board(transformed, rows, cols)[0] == canonical
+
+    @pytest.mark.parametrize('x, expected', [(1.0, 1.0 + 2 ** -52), (-1.0, -1.0 + 2 ** -53), (0.0, 5e-324),
+                                             (-5e-324, -0.0), (-math.inf, -sys.float_info.max),
+                                             (sys.float_info.max, math.inf), (math.inf, math.inf)])
+    def test_next_float(self, x, expected):
+        assert a_s.utils.next_float(x) == expected
+        if hasattr(math, 'nextafter'):
+            assert a_s.utils.next_float(x) == math.nextafter(x, math.inf)
+
+
+class TestProcessPool:
+
+    def test_broken_pool(self):
+        import concurrent.futures
+        import os
+
+        pool = a_s.utils.process_pool(2)
+        with pytest.raises(concurrent.futures.process.BrokenProcessPool):
+            pool.submit(os._exit, 1).result()  # A worker dies.
+        new_pool = a_s.utils.process_pool(2)
+        assert new_pool is not pool
+        assert new_pool.submit(abs, -1).result() == 1
+        assert a_s.utils.process_pool(2) is new_pool
+
+
+class Node:
+    """ Minimal class for testing caching decorators.
+    """
+    calls = 0
+
+    def __init__(self, name):
+        self.name = name
+
+    @a_s.utils.lru_indexed_property(maxsize=2)
+    def lru_child(self, index):
+        Node.calls += 1
+        return Node(self.name + str(index))
+
+    @a_s.utils.weak_indexed_property('__children__')
+    def weak_child(self, index):
+        Node.calls += 1
+        return Node(self.name + str(index))
+
+
+class TestCachingDecorators:
+    """ Test cases for lru_indexed_property and weak_indexed_property.
+    """
+
+    def test_lru_indexed_property(self):
+        Node.lru_child.cache_clear()
+        node = Node('n')
+        child = node.lru_child(1)
+        assert node.lru_child(1) is child
+        assert Node('n').lru_child(1) is not child  # Keyed by instance.
+        node.lru_child(2)  # Evicts (node, 1), the least recently used.
+        assert node.lru_child(1) is not child
+        info = Node.lru_child.cache_info()
+        assert (info.hits, info.misses, info.maxsize, info.currsize) == (1, 4, 2, 2)
+        assert info.hit_rate == 0.2
+        Node.lru_child.cache_resize(1)
+        assert Node.lru_child.cache_info().currsize == 1
+
+    def test_weak_indexed_property(self):
+        Node.weak_child.cache_clear()
+        node = Node('n')
+        child = node.weak_child(1)
+        assert node.weak_child(1) is child
+        del child
+        calls = Node.calls
+        node.weak_child(1)  # The first child is not alive anymore.
+        assert Node.calls == calls + 1
+        info = Node.weak_child.cache_info()
+        assert (info.hits, info.misses) == (1, 2)